@@ -0,0 +1,120 @@
+# animation_timeline.py
+# ---------------------------------------------------------------------------
+# Compiles the raw (filename, duration) lists in config.ANIMATIONS into
+# compact, immutable timelines.
+#
+# What compiling does:
+#   - Merges consecutive identical frames. "idle" lists idle_open.png twice
+#     (600ms + 400ms) — that's one 1000ms frame, and one less repaint.
+#     A loop whose last frame matches its first is merged across the wrap
+#     too (the timeline then starts part-way into that frame — see phase_ms).
+#   - Marks frozen frames (duration >= FREEZE_FRAME_MS). The animation plays
+#     up to the first one and holds there; anything after it is unreachable.
+#   - Stores cumulative start offsets, so "which frame is showing t ms after
+#     the animation started?" is a binary search — the animation state can be
+#     derived from a clock instead of being stepped tick by tick.
+# ---------------------------------------------------------------------------
+
+from bisect import bisect_right
+from typing import NamedTuple
+
+import config
+
+
+class Timeline(NamedTuple):
+    """One compiled animation. Times are in ms since the animation started."""
+    name: str
+    sprites: tuple        # sprite file per frame, after merging
+    durations: tuple      # ms per frame
+    offsets: tuple        # start of each frame within one pass
+    total_ms: int         # length of one pass (up to the hold frame, if any)
+    hold_index: int       # frame the animation freezes on, or -1 if it loops forever
+    phase_ms: int         # how far into the pass t=0 is (from wrap-around merging)
+
+    @property
+    def is_static(self) -> bool:
+        """True if the picture never changes (one frame, or it starts on its hold frame)."""
+        return len(self.sprites) <= 1 or self.hold_index == 0
+
+    def frame_at(self, t_ms: int) -> int:
+        """Index of the frame showing t_ms after the animation started."""
+        if self.is_static:
+            return 0
+        t = t_ms + self.phase_ms
+        if self.hold_index >= 0:
+            if t >= self.offsets[self.hold_index]:
+                return self.hold_index
+        else:
+            t %= self.total_ms
+        return bisect_right(self.offsets, t) - 1
+
+    def next_change_ms(self, t_ms: int) -> int | None:
+        """Time (since start) of the next frame change after t_ms, or None if it never changes."""
+        if self.is_static:
+            return None
+        index = self.frame_at(t_ms)
+        if index == self.hold_index:
+            return None
+
+        t = t_ms + self.phase_ms
+        pass_start = 0 if self.hold_index >= 0 else (t // self.total_ms) * self.total_ms
+        return pass_start + self.offsets[index] + self.durations[index] - self.phase_ms
+
+
+def compile_animation(name: str, frames: list) -> Timeline:
+    """Compile one list of (filename, duration_ms) frames into a Timeline."""
+    sprites, durations = [], []
+    hold_index = -1
+
+    for filename, duration in frames:
+        if sprites and sprites[-1] == filename:
+            durations[-1] += duration
+        else:
+            sprites.append(filename)
+            durations.append(duration)
+
+        if duration >= config.FREEZE_FRAME_MS:
+            hold_index = len(sprites) - 1
+            break  # nothing after a frozen frame is ever shown
+
+    if not sprites:
+        sprites, durations = [name], [1000]
+
+    # Merge a looping animation's last frame into its first: [a, b, a] -> [a, b]
+    # starting phase_ms into the merged a, so the wrap doesn't cause a repaint.
+    phase_ms = 0
+    if hold_index < 0 and len(sprites) > 1 and sprites[0] == sprites[-1]:
+        phase_ms = durations.pop()
+        sprites.pop()
+        durations[0] += phase_ms
+
+    offsets, t = [], 0
+    for duration in durations:
+        offsets.append(t)
+        t += duration
+
+    return Timeline(
+        name=name,
+        sprites=tuple(sprites),
+        durations=tuple(durations),
+        offsets=tuple(offsets),
+        total_ms=t,
+        hold_index=hold_index,
+        phase_ms=phase_ms,
+    )
+
+
+def compile_animations(animations: dict) -> dict:
+    """Compile every animation in a config.ANIMATIONS-style dict."""
+    return {name: compile_animation(name, frames) for name, frames in animations.items()}
+
+
+_compiled = None
+
+
+def get_timeline(name: str) -> Timeline | None:
+    """Compiled timeline for an animation in config.ANIMATIONS, or None if unknown."""
+    global _compiled
+    if _compiled is None:
+        _compiled = compile_animations(config.ANIMATIONS)
+    return _compiled.get(name)
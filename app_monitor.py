@@ -3,18 +3,57 @@
 # Detects what application is currently active, cross-platform.
 # Windows: uses pywin32 (win32gui) to get the focused window title
 # Mac:     uses AppKit (NSWorkspace) to get the active app name
+# Linux:   reads EWMH properties over a persistent X11 connection (x11_backend.py)
+# The foreground window's program (PID → executable via the cached
+# ProcessResolver in process_identity.py, or the bundle id on Mac) is
+# matched exactly against the process rules first; otherwise the title is
+# matched against the keyword and regex rules. The rules (config tables plus
+# the REACTION_RULES_FILE, if any) are a compiled RuleSet from
+# reaction_rules.py; when the file changes, a new one is compiled in the
+# background and swapped in by set_rules().
+# focus_watcher emits focus_changed when the foreground window changes, so
+# check() can be called on change rather than on a timer (where supported).
+#
+# The OS lookups can block (GetWindowText waits on a hung app), so the GUI
+# doesn't call them itself: AppMonitorThread runs queries on a worker
+# QThread and delivers reactions back through a queued signal. A query that
+# takes longer than APP_QUERY_TIMEOUT_MS is abandoned and later queries go
+# to a fresh worker — the GUI never waits on a stuck backend.
 # ---------------------------------------------------------------------------
 
+import itertools
 import sys
+import time
+
+from PyQt6.QtCore import QCoreApplication, QObject, QThread, pyqtSignal, pyqtSlot
+
 import config
+from focus_watcher import FocusWatcher
+from perf_stats import QueryStats
+from process_identity import ProcessResolver, normalize_process_name
+from reaction_rules import ReactionRulesWatcher, RuleSet
 
 
 class AppMonitor:
     """Polls the active window and returns the matching reaction."""
 
-    def __init__(self):
-        self._last_title = ""
+    def __init__(self, proc_root: str = None, scheduler=None):
+        """
+        proc_root: where to look processes up on Linux (a fake /proc tree in tests).
+        scheduler: what the rules file watcher times its reloads on (default: the shared one).
+        """
+        self._last_window = ("", None)
         self._last_reaction = None
+        self._rules = RuleSet.from_config()
+        self._processes = ProcessResolver(proc_root)
+        # On Mac the "title" is the frontmost app's name (see _get_window_mac), so the
+        # app-name rules can't misfire on it the way they would on a document title
+        self.titles_are_app_names = sys.platform == "darwin"
+        self.focus_watcher = FocusWatcher()
+        self.rules_watcher = None
+        if config.REACTION_RULES_FILE:
+            self.rules_watcher = ReactionRulesWatcher(config.REACTION_RULES_FILE, scheduler)
+            self.rules_watcher.rules_loaded.connect(self.set_rules)
 
     # ------------------------------------------------------------------
     # Public
@@ -23,67 +62,256 @@ class AppMonitor:
         """
         Check the currently active window.
         Returns (animation_name, speech_text) if the app changed, else None.
+        Blocks on the OS lookup — the GUI uses AppMonitorThread instead.
         """
-        title = self._get_active_window_title()
+        window = self._get_active_window()
 
-        if title == self._last_title:
+        if window == self._last_window:
             return None
 
-        self._last_title = title
-        reaction = self._match_reaction(title)
+        self._last_window = window
+        reaction = self._match_reaction(*window)
         self._last_reaction = reaction
+        self._log(window, reaction)
+        return reaction
+
+    def query(self) -> tuple:
+        """
+        ((title, program), reaction) for the active window right now. Keeps no
+        state, so it's safe to call from more than one thread.
+        """
+        window = self._get_active_window()
+        return window, self._match_reaction(*window)
+
+    def set_rules(self, rules: RuleSet):
+        """
+        Switch to a new rule table. A single assignment: a query running on the
+        worker thread finishes with whichever table it started with.
+        """
+        self._rules = rules
 
+    @staticmethod
+    def _log(window: tuple, reaction: tuple | None):
+        title, program = window
+        source = f"'{title}' [{program}]" if program else f"'{title}'"
         if reaction:
-            print(f"[app_monitor] Active window: '{title}' → reaction: {reaction[0]}")
+            print(f"[app_monitor] Active window: {source} → reaction: {reaction[0]}")
         else:
-            print(f"[app_monitor] Active window: '{title}' → no match")
-
-        return reaction
+            print(f"[app_monitor] Active window: {source} → no match")
 
     # ------------------------------------------------------------------
     # Internal — platform-specific window detection
     # ------------------------------------------------------------------
-    def _get_active_window_title(self) -> str:
-        """Get the active window title, dispatches to platform-specific method."""
+    def _get_active_window(self) -> tuple:
+        """(title, program) of the active window; dispatches to the platform-specific method."""
         if sys.platform == "win32":
-            return self._get_title_windows()
+            return self._get_window_windows()
         elif sys.platform == "darwin":
-            return self._get_title_mac()
-        return ""
+            return self._get_window_mac()
+        elif sys.platform.startswith("linux"):
+            return self._get_window_linux()
+        return ("", None)
+
+    def _program(self, pid: int) -> str | None:
+        """Executable name for a PID (cached — the real lookup runs once per process)."""
+        process = self._processes.resolve(pid)
+        return process.name if process else None
 
-    def _get_title_windows(self) -> str:
-        """Windows: use win32gui to get focused window title."""
+    def _get_window_windows(self) -> tuple:
+        """Windows: use win32gui to get focused window title, win32process for its PID."""
         try:
             import win32gui
+            import win32process
             hwnd = win32gui.GetForegroundWindow()
             if hwnd == 0:
-                return ""
-            return win32gui.GetWindowText(hwnd)
+                return ("", None)
+            _, pid = win32process.GetWindowThreadProcessId(hwnd)
+            return (win32gui.GetWindowText(hwnd), self._program(pid))
         except Exception:
-            return ""
+            return ("", None)
 
-    def _get_title_mac(self) -> str:
-        """Mac: use AppKit NSWorkspace to get active application name."""
+    def _get_window_mac(self) -> tuple:
+        """Mac: use AppKit NSWorkspace to get active application name (as the title) and bundle id."""
         try:
             from AppKit import NSWorkspace
             active_app = NSWorkspace.sharedWorkspace().activeApplication()
-            return active_app.get("NSApplicationName", "")
+            bundle_id = active_app.get("NSApplicationBundleIdentifier")
+            program = (normalize_process_name(bundle_id) if bundle_id
+                       else self._program(active_app.get("NSApplicationProcessIdentifier", 0)))
+            return (active_app.get("NSApplicationName", ""), program)
         except Exception:
-            return ""
+            return ("", None)
+
+    def _get_window_linux(self) -> tuple:
+        """
+        Linux (X11): the active window's title and program (_NET_WM_PID). The
+        WM_CLASS app name is appended when the title doesn't mention it (e.g.
+        terminals titled "user@host: ~"), so title rules can still match the app.
+        """
+        try:
+            from x11_backend import get_active_window
+            window = get_active_window()
+        except Exception:
+            return ("", None)
+        if window is None:
+            return ("", None)
+        title = window.title
+        app = window.wm_class[1] if window.wm_class else ""
+        if app and app.casefold() not in title.casefold():
+            title = f"{title} — {app}" if title else app
+        return (title, self._program(window.pid))
 
     # ------------------------------------------------------------------
     # Internal — reaction matching
     # ------------------------------------------------------------------
-    def _match_reaction(self, title: str) -> tuple | None:
+    def _match_reaction(self, title: str, program: str = None) -> tuple | None:
         """
-        Compare the window title against APP_REACTIONS in config.
-        Case-insensitive. First match wins.
-        Returns (animation_name, speech_text) or None.
+        Look the program up in the process rules (exact); failing that, compare
+        the window title against the keyword and regex rules — and, only if
+        the program is unknown or the title is the app's name, the app-name rules.
+        Case-insensitive (casefolded, NFKC-normalized). First match wins.
+        Returns (animation_name, speech_text), or ("idle", None) if nothing matches.
         """
-        title_lower = title.lower()
+        return self._rules.match(title, program, self.titles_are_app_names) or ("idle", None)
+
+
+# ---------------------------------------------------------------------------
+# Off the GUI thread
+# ---------------------------------------------------------------------------
+class _QueryWorker(QObject):
+    """Runs AppMonitor.query() on the worker thread; reports back only when the window changed."""
+
+    finished = pyqtSignal(int, object, float)   # query id, (window, reaction) or None if unchanged, ms taken
+
+    def __init__(self, monitor: AppMonitor, last_window: tuple):
+        super().__init__()
+        self._monitor = monitor
+        self._last_window = last_window
+
+    @pyqtSlot(int)
+    def run_query(self, query_id: int):
+        started = time.perf_counter()
+        try:
+            window, reaction = self._monitor.query()
+        except Exception as error:
+            print(f"[app_monitor] Query failed: {error}")
+            window, reaction = self._last_window, None
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        change = None
+        if window != self._last_window:
+            self._last_window = window
+            change = (window, reaction)
+        self.finished.emit(query_id, change, elapsed_ms)
+
+
+class AppMonitorThread(QObject):
+    """
+    AppMonitor on a dedicated QThread. request_check() returns at once;
+    reaction_changed is emitted on the GUI thread, only when the reaction
+    differs from the last one; window_changed whenever the window does.
+    Query times go into self.stats.
+    """
+
+    reaction_changed = pyqtSignal(object)   # (animation_name, speech_text)
+    window_changed = pyqtSignal(object)     # (title, program), on every foreground-window change
+    _query = pyqtSignal(int)                # to the worker: run query #n
+
+    def __init__(self, monitor: AppMonitor, scheduler=None, timeout_ms: int = None):
+        super().__init__()
+        from scheduler import get_scheduler   # here, so app_monitor stays importable without Qt timers
+
+        self.monitor = monitor
+        self.scheduler = scheduler or get_scheduler()
+        self.timeout_ms = config.APP_QUERY_TIMEOUT_MS if timeout_ms is None else timeout_ms
+        self.stats = QueryStats()
+
+        self._ids = itertools.count(1)
+        self._pending = None        # id of the query in flight, if any
+        self._last_window = ("", None)
+        self._last_reaction = None
+        self._hung = {}             # query id -> (thread, worker) abandoned after a timeout
+        self._thread = self._worker = None
+        self._start_worker()
+
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop)
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+    def request_check(self):
+        """Ask the worker to look at the active window. No-op while a query is already out."""
+        if self._pending is not None or self._thread is None:
+            return
+        if len(self._hung) >= config.APP_QUERY_MAX_HUNG:
+            return  # the backend keeps hanging — wait until a stuck query comes back
+        self._pending = next(self._ids)
+        self.scheduler.schedule("timeout", self.timeout_ms, self._on_timeout, owner=self)
+        self._query.emit(self._pending)
+
+    def stop(self):
+        """Shut the worker threads down (on quit)."""
+        self.scheduler.cancel_owner(self)
+        if self._thread is not None:
+            self._retire(self._thread)
+            self._thread = self._worker = None
+        for thread, _worker in self._hung.values():
+            # Still blocked in the OS after the app has quit — nothing else will unblock it
+            self._retire(thread)
+        self._hung.clear()
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+    def _start_worker(self):
+        self._thread = QThread()
+        self._thread.setObjectName("app-monitor")
+        self._worker = _QueryWorker(self.monitor, self._last_window)
+        self._worker.moveToThread(self._thread)
+        self._query.connect(self._worker.run_query)
+        self._worker.finished.connect(self._on_finished)
+        # Deleted by its own thread as that finishes — not before, while a query may still be running
+        self._thread.finished.connect(self._worker.deleteLater)
+        self._thread.start()
+
+    @staticmethod
+    def _retire(thread: QThread, wait_ms: int = 100):
+        """Stop a worker thread; one still stuck in a query after wait_ms is terminated."""
+        thread.quit()
+        if not thread.wait(wait_ms):
+            thread.terminate()
+            thread.wait()
+
+    def _on_finished(self, query_id: int, change, elapsed_ms: float):
+        """A query came back (queued onto the GUI thread)."""
+        self.stats.record(elapsed_ms)
+        if query_id in self._hung:
+            # Came back after we gave up on it — the answer is stale, but the thread is free to go
+            self.stats.late += 1
+            thread, _worker = self._hung.pop(query_id)
+            self._retire(thread)
+            return
+        if query_id != self._pending:
+            return
 
-        for keyword, animation, speech in config.APP_REACTIONS:
-            if keyword.lower() in title_lower:
-                return (animation, speech)
+        self._pending = None
+        self.scheduler.cancel("timeout", owner=self)
+        if change is None:
+            return
+        self._last_window, reaction = change
+        self.monitor._log(self._last_window, reaction)
+        self.window_changed.emit(self._last_window)
+        if reaction != self._last_reaction:
+            self._last_reaction = reaction
+            self.reaction_changed.emit(reaction)
 
-        return ("idle", None)
+    def _on_timeout(self):
+        """The query in flight missed its deadline: abandon its worker and start a fresh one."""
+        self.stats.timeouts += 1
+        print(f"[app_monitor] Query took over {self.timeout_ms}ms — abandoning it ({self.stats.summary()})")
+        self._query.disconnect(self._worker.run_query)
+        self._hung[self._pending] = (self._thread, self._worker)
+        self._pending = None
+        self._start_worker()
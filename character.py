@@ -3,20 +3,36 @@
 # Manages the character's sprite and animation.
 #
 # How animation works:
-#   - An animation is a list of (image, duration) frames defined in config.py.
-#   - A QTimer ticks every ANIMATION_TICK_MS (100ms).
-#   - Each tick we check: has enough time passed to move to the next frame?
-#     If yes, advance. If no, stay on the current frame.
-#   - This lets each frame have its OWN duration (e.g. eyes-open lasts 600ms,
-#     blink lasts 150ms) while still checking smoothly.
-#   - When the last frame is reached, it loops back to frame 0.
+#   - An animation is a list of (image, duration) frames defined in config.py,
+#     compiled once into an immutable Timeline (animation_timeline.py):
+#     repeated frames merged, frozen frames marked, start offsets precomputed.
+#   - The frame on screen is derived from the clock: timeline.frame_at(time
+#     since the animation started). Nothing is stepped tick by tick.
+#   - A one-shot job on the shared scheduler (scheduler.py) is set for the
+#     exact moment the picture next changes (timeline.next_change_ms). When it
+#     runs we repaint and schedule it again. Deadlines come from the timeline, not from when the timer
+#     fired, so lateness never accumulates.
+#   - Static animations (one frame) and frozen frames (duration >=
+#     FREEZE_FRAME_MS) don't schedule anything — the process doesn't wake.
+#   - How late each wakeup fires is recorded in frame_jitter.
+#
+# Scaled frames come from the shared SpriteCache (sprite_cache.py), so
+# switching back to a recently shown animation costs no disk I/O or scaling.
+# Frames that aren't cached yet are decoded in the background by the
+# SpriteLoader (sprite_loader.py); until they arrive we keep showing the
+# previous frame (or a placeholder), so the GUI thread never waits on disk.
 # ---------------------------------------------------------------------------
 
 import os
-from PyQt6.QtGui import QPixmap, QColor, QPainter
-from PyQt6.QtCore import Qt, QTimer, QElapsedTimer
+from PyQt6.QtGui import QPixmap, QGuiApplication
 
 import config
+from animation_timeline import compile_animation, get_timeline
+from perf_stats import JitterStats, PrefetchStats
+from scheduler import get_scheduler
+from sprite_loader import (
+    get_sprite_loader, make_placeholder, PRIORITY_VISIBLE, PRIORITY_PREFETCH, PRIORITY_PRELOAD,
+)
 
 
 class Character:
@@ -25,31 +41,53 @@ class Character:
     def __init__(self):
         # --- Animation state ---
         self._current_anim_name = None   # e.g. "idle"
-        self._frames = []                # list of (QPixmap, duration_ms) for current animation
-        self._frame_index = 0            # which frame we're on right now
-        self._frame_timer = QElapsedTimer()  # measures how long current frame has been showing
+        self._timeline = None            # compiled Timeline for the current animation
+        self._anim_started_ms = 0        # when the current animation started, on the scheduler's clock
+        self._frame_index = 0            # which timeline frame is on screen right now
+        self._next_change_ms = None      # absolute deadline of the frame job, on the scheduler's clock
+        self._sprites = {}               # sprite_name -> (QPixmap, source QRect), for frames that are ready
+        self._last_sprite = None         # last real frame we handed out — shown while the next one loads
+        self._prefetched = set()         # animations predicted to come next (see prefetch())
+        self.prefetch_stats = PrefetchStats()
+
+        # --- Shared across every Character in the process ---
+        self._loader = get_sprite_loader()
 
-        # --- The Qt timer that drives animation ticks ---
-        self._tick_timer = QTimer()
-        self._tick_timer.setInterval(config.ANIMATION_TICK_MS)
-        self._tick_timer.timeout.connect(self._on_tick)
+        # --- Frame scheduling: one job on the shared scheduler, set for the next deadline ---
+        self._scheduler = get_scheduler()
+        self._clock = self._scheduler.clock
+        self.frame_jitter = JitterStats()
 
         # --- Callback: window_manager connects here to know when to repaint ---
         # Set this to a function and it will be called every time the frame changes.
         self.on_frame_changed = None
 
-        # Start with the default animation
+        # Start with the default animation, then warm up everything else
+        # in the background (in config order, behind whatever is on screen).
         self.set_animation(config.DEFAULT_ANIMATION)
-        self._tick_timer.start()
+        self.preload(config.ANIMATIONS.keys(), PRIORITY_PRELOAD)
 
     # ------------------------------------------------------------------
     # Public
     # ------------------------------------------------------------------
-    def get_pixmap(self) -> QPixmap:
-        """Return the current frame's pixmap. Called by window_manager to draw."""
-        if self._frames:
-            return self._frames[self._frame_index][0]   # [0] = the QPixmap
-        return self._make_placeholder("No frames")
+    def get_frame(self) -> tuple:
+        """
+        Return the current frame as (pixmap, source_rect). Called by window_manager
+        to draw: source_rect is the part of the pixmap to draw, in device pixels
+        (a sub-rect of an atlas sheet, or the whole pixmap).
+        If the frame is still loading, returns the previous frame instead
+        (or a placeholder if nothing has been shown yet).
+        """
+        if self._timeline is not None:
+            sprite = self._sprites.get(self._timeline.sprites[self._frame_index])
+            if sprite is not None:
+                self._last_sprite = sprite
+                return sprite
+
+        if self._last_sprite is None:
+            placeholder = make_placeholder("Loading..." if self._timeline else "No frames")
+            self._last_sprite = (placeholder, placeholder.rect())
+        return self._last_sprite
 
     def set_animation(self, name: str):
         """
@@ -61,101 +99,164 @@ class Character:
 
         self._current_anim_name = name
         self._frame_index = 0
-        self._frame_timer.restart()
-        self._frames = self._load_animation(name)
-        print(f"[character] Playing animation: {name} ({len(self._frames)} frames)")
+        self._anim_started_ms = self._clock.now_ms()
+        self._timeline, self._sprites = self._load_animation(name)
+        self._arm_frame_deadline()
+        if self.on_frame_changed:
+            self.on_frame_changed()
+
+        warm = all(filename in self._sprites for filename in self._timeline.sprites)
+        self.prefetch_stats.record_switch(warm, name in self._prefetched)
+        self._prefetched.clear()
+        print(f"[character] Playing animation: {name} ({len(self._timeline.sprites)} frames)")
+
+    def preload(self, names, priority: int):
+        """
+        Queue every frame of the given animations for background loading.
+        Frames already cached are skipped; queued ones are bumped if priority is higher.
+        With the atlas enabled this just makes sure the atlas is on its way.
+        """
+        if config.SPRITE_ATLAS_ENABLED:
+            self._request_atlas()
+            return
+
+        for name in names:
+            timeline = get_timeline(name)
+            for filename in timeline.sprites if timeline else ():
+                self._request_sprite(filename, priority)
+
+    def prefetch(self, names):
+        """
+        Warm up the animations likely to be shown next (e.g. the poses that follow
+        driving), ahead of other background work, so switching to them doesn't wait.
+        Called by the mode manager on each transition; replaces the previous prediction.
+        """
+        self._prefetched = set(names)
+        self.prefetch_stats.prefetches += len(self._prefetched)
+        self.preload(self._prefetched, PRIORITY_PREFETCH)
 
     # ------------------------------------------------------------------
-    # Internal — animation tick
+    # Internal — frame scheduling
     # ------------------------------------------------------------------
-    def _on_tick(self):
+    def _arm_frame_deadline(self):
+        """Schedule the frame job for the moment the picture next changes — or not at all."""
+        now = self._clock.now_ms()
+        next_change = self._timeline.next_change_ms(now - self._anim_started_ms)
+        if next_change is None:
+            self._next_change_ms = None
+            self._scheduler.cancel("frame", owner=self)
+            return
+
+        self._next_change_ms = self._anim_started_ms + next_change
+        self._scheduler.schedule("frame", self._next_change_ms - now, self._on_frame_deadline, owner=self)
+
+    def _on_frame_deadline(self):
         """
-        Called every ANIMATION_TICK_MS by the Qt timer.
-        Checks if the current frame's duration has elapsed.
-        If yes, advances to the next frame and notifies the window to repaint.
+        The current frame's time is up: look up which frame the clock says is
+        showing now, notify the window to repaint, and schedule the next change.
+        If we woke up very late this simply lands on the right later frame.
         """
-        if not self._frames:
+        if self._next_change_ms is None:
             return
 
-        current_duration = self._frames[self._frame_index][1]  # [1] = duration_ms
+        now = self._clock.now_ms()
+        self.frame_jitter.record(now - self._next_change_ms)
+
+        # A wakeup a hair early would still see the old frame — settle on the deadline.
+        t = max(now, self._next_change_ms) - self._anim_started_ms
+        index = self._timeline.frame_at(t)
+        changed = index != self._frame_index
+        self._frame_index = index
 
-        if self._frame_timer.elapsed() >= current_duration:
-            # Advance to next frame (loop back to 0 at the end)
-            self._frame_index = (self._frame_index + 1) % len(self._frames)
-            self._frame_timer.restart()
+        # Tell the window to repaint
+        if changed and self.on_frame_changed:
+            self.on_frame_changed()
 
-            # Tell the window to repaint
-            if self.on_frame_changed:
-                self.on_frame_changed()
+        self._arm_frame_deadline()
 
     # ------------------------------------------------------------------
     # Internal — loading
     # ------------------------------------------------------------------
-    def _load_animation(self, name: str) -> list:
+    def _load_animation(self, name: str) -> tuple:
         """
-        Load all frames for an animation from config.ANIMATIONS.
-        Returns a list of (QPixmap, duration_ms) tuples.
-        If any sprite file is missing, falls back to a placeholder pixmap
-        for that frame so the animation still runs.
+        Look up the compiled timeline for an animation in config.ANIMATIONS.
+        Returns (timeline, sprites): sprites holds the frames that are already
+        available. The rest are requested from the background loader and
+        filled in as they arrive.
         """
-        if name not in config.ANIMATIONS:
+        timeline = get_timeline(name)
+        if timeline is None:
             print(f"[character] Animation '{name}' not found in config. Falling back to placeholder.")
-            return [(self._make_placeholder(f"Unknown: {name}"), 1000)]
+            placeholder = make_placeholder(f"Unknown: {name}")
+            return compile_animation(name, []), {name: (placeholder, placeholder.rect())}
 
-        frames = []
-        all_missing = True
+        sprites = {}
+        for filename in timeline.sprites:
+            if filename not in sprites:
+                sprite = self._resolve_sprite(filename, PRIORITY_VISIBLE, notify=True)
+                if sprite is not None:
+                    sprites[filename] = sprite
 
-        for filename, duration in config.ANIMATIONS[name]:
-            path = os.path.join(config.SPRITES_DIR, filename)
+        return timeline, sprites
 
-            if os.path.isfile(path):
-                pixmap = QPixmap(path)
-                if not pixmap.isNull():
-                    pixmap = pixmap.scaled(
-                        config.WINDOW_WIDTH,
-                        config.WINDOW_HEIGHT,
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation,
-                    )
-                    frames.append((pixmap, duration))
-                    all_missing = False
-                    continue
+    def _resolve_sprite(self, filename: str, priority: int, notify: bool) -> tuple | None:
+        """
+        Return (pixmap, source_rect) for a sprite file if it's available now, else None.
+        Serves from the atlas when it's enabled and loaded; files the atlas doesn't
+        have (e.g. missing sprites) fall back to single-file loading.
+        If notify is set, _on_sprite_ready / _on_atlas_ready fill the frame in later.
+        """
+        if config.SPRITE_ATLAS_ENABLED:
+            atlas = self._request_atlas(self._on_atlas_ready if notify else None)
+            if atlas is None:
+                return None  # whole atlas is on its way
+            sprite = atlas.lookup(filename)
+            if sprite is not None:
+                return sprite
 
-            # File missing or failed to load — use a placeholder for this frame
-            frames.append((self._make_placeholder(filename), duration))
+        callback = (lambda key, pixmap, f=filename: self._on_sprite_ready(f, pixmap)) if notify else None
+        _, pixmap = self._request_sprite(filename, priority, callback)
+        return (pixmap, pixmap.rect()) if pixmap is not None else None
 
-        if all_missing:
-            print(f"[character] No sprite files found for '{name}' — using animated placeholder.")
+    def _request_sprite(self, filename: str, priority: int, callback=None) -> tuple:
+        """Ask the shared loader for a single sprite file at window size. Returns (key, pixmap or None)."""
+        path = os.path.join(config.SPRITES_DIR, filename)
+        return self._loader.request(
+            path, config.WINDOW_WIDTH, config.WINDOW_HEIGHT,
+            self._device_pixel_ratio(), priority, callback,
+        )
 
-        return frames
+    def _request_atlas(self, callback=None):
+        """Ask the shared loader for the sprite atlas. Returns it, or None while it loads."""
+        return self._loader.request_atlas(
+            config.WINDOW_WIDTH, config.WINDOW_HEIGHT, self._device_pixel_ratio(), callback,
+        )
 
-    # ------------------------------------------------------------------
-    # Internal — placeholder drawing
-    # ------------------------------------------------------------------
-    def _make_placeholder(self, label: str) -> QPixmap:
-        """
-        Draw a placeholder rectangle for a single frame.
-        The label shows which sprite file it's standing in for,
-        so you can see the animation cycling through frames.
-        """
-        pixmap = QPixmap(config.WINDOW_WIDTH, config.WINDOW_HEIGHT)
-        pixmap.fill(Qt.GlobalColor.transparent)
+    def _on_sprite_ready(self, filename: str, pixmap: QPixmap):
+        """A frame finished loading in the background. Repaint if it's on screen now."""
+        if self._timeline is None or filename not in self._timeline.sprites:
+            return  # animation changed while it was loading
 
-        painter = QPainter(pixmap)
+        self._sprites[filename] = (pixmap, pixmap.rect())
+        if self._timeline.sprites[self._frame_index] == filename and self.on_frame_changed:
+            self.on_frame_changed()
 
-        # Background rounded rectangle
-        r, g, b = config.PLACEHOLDER_COLOR
-        painter.setBrush(QColor(r, g, b, 200))
-        painter.setPen(Qt.PenStyle.NoPen)
-        painter.drawRoundedRect(10, 10, config.WINDOW_WIDTH - 20, config.WINDOW_HEIGHT - 20, 20, 20)
+    def _on_atlas_ready(self, atlas):
+        """The atlas finished loading. Fill in the current animation's missing frames."""
+        if self._timeline is None:
+            return
 
-        # Title
-        painter.setPen(QColor(255, 255, 255))
-        painter.drawText(pixmap.rect().adjusted(0, 20, 0, -40), Qt.AlignmentFlag.AlignCenter, "🐾 Desktop Pet")
+        for filename in self._timeline.sprites:
+            if filename not in self._sprites:
+                sprite = self._resolve_sprite(filename, PRIORITY_VISIBLE, notify=True)
+                if sprite is not None:
+                    self._sprites[filename] = sprite
 
-        # Frame label — shows which sprite this placeholder is standing in for
-        painter.setPen(QColor(200, 200, 255))
-        painter.drawText(pixmap.rect().adjusted(0, 40, 0, 0), Qt.AlignmentFlag.AlignCenter, f"[{label}]")
+        if self._timeline.sprites[self._frame_index] in self._sprites and self.on_frame_changed:
+            self.on_frame_changed()
 
-        painter.end()
-        return pixmap
+    @staticmethod
+    def _device_pixel_ratio() -> float:
+        """DPR of the primary screen (1.0 if there is no screen, e.g. offscreen tests)."""
+        screen = QGuiApplication.primaryScreen()
+        return screen.devicePixelRatio() if screen else 1.0
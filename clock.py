@@ -0,0 +1,51 @@
+# clock.py
+# ---------------------------------------------------------------------------
+# Time source for anything that moves or animates.
+#
+# Motion is computed from elapsed time, not counted in timer ticks, so it
+# needs a clock that is monotonic (never jumps when the wall clock changes)
+# and finer than a millisecond. MonotonicClock wraps QElapsedTimer for that.
+# VirtualClock only moves when told to — for running hours of behaviour
+# headless in milliseconds (see simulator.py).
+# ---------------------------------------------------------------------------
+
+from PyQt6.QtCore import QElapsedTimer
+
+
+class MonotonicClock:
+    """Milliseconds (as a float, sub-ms precision) since the clock was created."""
+
+    def __init__(self):
+        self._timer = QElapsedTimer()
+        self._timer.start()
+
+    def now_ms(self) -> float:
+        return self._timer.nsecsElapsed() / 1_000_000
+
+
+class VirtualClock:
+    """A clock that only advances when advance() is called. Same interface as MonotonicClock."""
+
+    def __init__(self, start_ms: float = 0.0):
+        self._now_ms = start_ms
+
+    def now_ms(self) -> float:
+        return self._now_ms
+
+    def advance(self, ms: float):
+        self._now_ms += ms
+
+    def advance_to(self, t_ms: float):
+        """Jump forward to t_ms (never backwards)."""
+        self._now_ms = max(self._now_ms, t_ms)
+
+
+_clock = None
+
+
+def get_clock() -> MonotonicClock:
+    """The process-wide clock (created on first use)."""
+    global _clock
+    if _clock is None:
+        _clock = MonotonicClock()
+    return _clock
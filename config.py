@@ -21,6 +21,30 @@ else:
 
 SPRITES_DIR = os.path.join(BASE_DIR, "assets", "sprites")
 
+# Per-user cache folder (survives restarts, unlike _MEIPASS).
+if _sys.platform == "win32":
+    CACHE_DIR = os.path.join(os.environ.get("LOCALAPPDATA", os.path.expanduser("~")), "DesktopPet", "cache")
+elif _sys.platform == "darwin":
+    CACHE_DIR = os.path.expanduser("~/Library/Caches/DesktopPet")
+else:
+    CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "desktop_pet")
+
+# Per-user settings folder (for files you edit, like the reaction rules file).
+if _sys.platform == "win32":
+    CONFIG_DIR = os.path.join(os.environ.get("APPDATA", os.path.expanduser("~")), "DesktopPet")
+elif _sys.platform == "darwin":
+    CONFIG_DIR = os.path.expanduser("~/Library/Application Support/DesktopPet")
+else:
+    CONFIG_DIR = os.path.join(os.environ.get("XDG_CONFIG_HOME", os.path.expanduser("~/.config")), "desktop_pet")
+
+# Per-user data folder (things the pet records, like app usage).
+if _sys.platform == "win32":
+    DATA_DIR = os.path.join(os.environ.get("LOCALAPPDATA", os.path.expanduser("~")), "DesktopPet")
+elif _sys.platform == "darwin":
+    DATA_DIR = os.path.expanduser("~/Library/Application Support/DesktopPet")
+else:
+    DATA_DIR = os.path.join(os.environ.get("XDG_DATA_HOME", os.path.expanduser("~/.local/share")), "desktop_pet")
+
 # ---------------------------------------------------------------------------
 # Window settings
 # ---------------------------------------------------------------------------
@@ -32,10 +56,25 @@ WINDOW_HEIGHT = 200
 WINDOW_START_X = None
 WINDOW_START_Y = None
 
+# Let clicks on transparent parts of the sprite fall through to whatever is
+# underneath. The window mask follows the current frame's alpha, rounded out
+# to WINDOW_MASK_CELL-pixel squares (coarser = cheaper, but a looser fit).
+WINDOW_MASK_ENABLED = True
+WINDOW_MASK_CELL = 8
+# How many frames' masks to keep (least recently used go first). Every frame of
+# every animation fits, with room for a reload or a second DPR.
+WINDOW_MASK_CACHE_SIZE = 128
+
+# Debug: draw a small counter in the window's corner showing how many pixels
+# are repainted per second (repaints are limited to the parts that changed).
+DEBUG_REPAINT_OVERLAY = False
+
 # ---------------------------------------------------------------------------
 # Animation settings
 # ---------------------------------------------------------------------------
-ANIMATION_TICK_MS = 100
+# Frames at least this long (ms) are "frozen": the animation holds on them
+# until something switches to another animation, instead of looping.
+FREEZE_FRAME_MS = 9999
 
 ANIMATIONS = {
     "idle": [
@@ -134,16 +173,118 @@ ANIMATIONS = {
 
 DEFAULT_ANIMATION = "idle"
 
+# Timer deadlines closer together than this (ms) are served by one wakeup
+# (see scheduler.py) — the later ones just run a little early.
+TIMER_COALESCE_MS = 5
+
+# Memory budget (in bytes) for the shared sprite cache. Scaled frames stay
+# cached until this is full, then the least recently used ones are dropped.
+# 32 MB holds every sprite at 200x200 several times over, even on HiDPI.
+SPRITE_CACHE_BUDGET_BYTES = 32 * 1024 * 1024
+
+# Number of background threads used to decode and scale sprites.
+SPRITE_LOADER_THREADS = 2
+
+# Keep already-scaled raw frames on disk so later launches skip PNG decoding
+# and scaling. Safe to delete the folder at any time — it's rebuilt on demand.
+SPRITE_DISK_CACHE_ENABLED = True
+SPRITE_DISK_CACHE_DIR = os.path.join(CACHE_DIR, "sprites")
+
+# Pack all sprites into one or a few atlas sheets instead of one pixmap per file.
+# If SPRITE_ATLAS_FILE exists (build it with `python sprite_atlas.py`) it's
+# loaded directly; otherwise the atlas is packed at startup from SPRITES_DIR.
+SPRITE_ATLAS_ENABLED = True
+SPRITE_ATLAS_FILE = os.path.join(SPRITES_DIR, "atlas.json")
+SPRITE_ATLAS_MAX_SIZE = 2048   # max sheet width/height in pixels
+
 # ---------------------------------------------------------------------------
 # Supervisor Mode — app detection and reactions
 # ---------------------------------------------------------------------------
-# How often (in ms) the app monitor checks the active window.
+# React to foreground-window changes as the OS reports them (focus_watcher.py),
+# instead of polling. Where no event source is available it polls anyway.
+FOCUS_EVENTS_ENABLED = True
+
+# How often (in ms) the app monitor checks the active window when polling.
 # 2000ms = checks every 2 seconds. Don't set too low — it wastes CPU.
 APP_CHECK_INTERVAL_MS = 2000
 
+# Active-window lookups run on a worker thread. One that takes longer than this
+# (e.g. a hung app not answering GetWindowText) is given up on and the next
+# check uses a fresh worker; at most APP_QUERY_MAX_HUNG stuck ones are kept
+# before checks pause until one of them returns.
+APP_QUERY_TIMEOUT_MS = 500
+APP_QUERY_MAX_HUNG = 2
+
+# Debouncing (reaction_filter.py): a new reaction only shows once it has held
+# for REACTION_DWELL_MS — alt-tabbing past a window doesn't trigger it. The same
+# reaction shown again within REACTION_COOLDOWN_MS switches the animation but
+# skips the speech bubble. Run `python reaction_filter.py` to compare settings.
+REACTION_DWELL_MS = 1000
+REACTION_COOLDOWN_MS = 60000
+
+# Reactions by PROGRAM: the foreground window's executable name (without
+# ".exe", any case) or, on Mac, its bundle id. These are checked first and
+# are exact — "word" here is only Word. When the program is known, the title
+# is only matched against APP_REACTIONS (sites and the like), never against
+# the program names in APP_NAME_REACTIONS — so a "Reset your password" tab
+# isn't Word. (On Mac the title is the app's name, so both tables apply.) Browsers are left out on purpose: what they show is in the title.
+APP_PROCESS_REACTIONS = [
+    # --- Coding / Productivity ---
+    ("code",                    "proud",         "Coding! I'm proud of you! 💪"),
+    ("com.microsoft.vscode",    "proud",         "Coding! I'm proud of you! 💪"),
+    ("pycharm64",               "proud",         "Python dev! That's my person! 🐍"),
+    ("pycharm",                 "proud",         "Python dev! That's my person! 🐍"),
+    ("com.jetbrains.pycharm",   "proud",         "Python dev! That's my person! 🐍"),
+    ("idea64",                  "proud",         "Java? Bold choice. I respect it."),
+    ("com.jetbrains.intellij",  "proud",         "Java? Bold choice. I respect it."),
+    ("notepad++",               "proud",         "Writing code? Nice! 👍"),
+    ("notion",                  "working_hard",  "我们一起努力✊"),
+    ("notion.id",               "working_hard",  "我们一起努力✊"),
+
+    # --- Work / School ---
+    ("winword",                 "proud",         "Writing something important? 📝"),
+    ("com.microsoft.word",      "proud",         "Writing something important? 📝"),
+    ("excel",                   "proud",         "Spreadsheets! You're a boss! 📊"),
+    ("com.microsoft.excel",     "proud",         "Spreadsheets! You're a boss! 📊"),
+    ("powerpnt",                "proud",         "Making a presentation? Go you! 🎯"),
+    ("com.microsoft.powerpoint", "proud",        "Making a presentation? Go you! 🎯"),
+    ("slack",                   "proud",         "Working hard! I see you! 💼"),
+    ("com.tinyspeck.slackmacgap", "proud",       "Working hard! I see you! 💼"),
+    ("ms-teams",                "surprised",     "Another meeting? Hang in there..."),
+    ("teams",                   "surprised",     "Another meeting? Hang in there..."),
+    ("com.microsoft.teams2",    "surprised",     "Another meeting? Hang in there..."),
+    ("dingtalk",                "proud",         "打卡了! 好员工! 💼"),
+    ("feishu",                  "proud",         "用飞书干活? 效率很高嘛! 🚀"),
+    ("lark",                    "proud",         "Lark open! Stay productive! 🚀"),
+    ("wxwork",                  "proud",         "企业微信工作中! 加油! 💪"),
+    ("wps",                     "proud",         "WPS工作中! 认真的样子很帅! 📄"),
+
+    # --- Social Media / Chat ---
+    ("wechat",                  "judging",       "又在摸鱼吗? 专注!"),
+    ("weixin",                  "judging",       "又在摸鱼吗? 专注!"),
+    ("com.tencent.xinwechat",   "judging",       "又在摸鱼吗? 专注!"),
+    ("qq",                      "judging",       "QQ挂着呢? 专注工作!"),
+    ("com.tencent.qq",          "judging",       "QQ挂着呢? 专注工作!"),
+
+    # --- Games ---
+    ("steam",                   "playing_game",  "Let's play together! 🎮"),
+    ("steamwebhelper",          "playing_game",  "Let's play together! 🎮"),
+    ("com.valvesoftware.steam", "playing_game",  "Let's play together! 🎮"),
+    ("genshinimpact",           "surprised",     "Genshin Impact?! Pull me something good! ✨"),
+    ("yuanshen",                "surprised",     "原神启动?! 抽到SSR了吗! ✨"),
+    ("leagueclientux",          "playing_game",  "Playing League? Carry them! ⚔️"),
+    ("league of legends",       "playing_game",  "Playing League? Carry them! ⚔️"),
+    ("tslgame",                 "playing_game",  "PUBG? Don't get thirsted! 🍗"),
+    ("fortniteclient-win64-shipping", "judging", "Fortnite? Seriously? 😑"),
+]
+
+# How many PID → program lookups to remember (one per running program is plenty).
+PROCESS_CACHE_SIZE = 256
+
 # Reaction map: maps keywords in window titles to (animation, speech bubble text).
+# Used when APP_PROCESS_REACTIONS has nothing for the program (browsers, unknown apps).
 # Checked in order — first match wins. Put more specific apps before general ones.
-# The keyword matching is case-insensitive.
+# The keyword matching is case-insensitive (and full-width/half-width insensitive).
 APP_REACTIONS = [
     # --- Streaming / Entertainment ---
     ("netflix",     "judging",       "Really? Netflix again? 👀"),
@@ -160,11 +301,6 @@ APP_REACTIONS = [
     ("芒果tv",       "judging",       "追综艺呢? 😏"),
 
     # --- Social Media / Chat ---
-    ("wechat",      "judging",       "又在摸鱼吗? 专注!"),
-    ("weixin",      "judging",       "又在摸鱼吗? 专注!"),
-    ("微信",         "judging",       "又在摸鱼吗? 专注!"),
-    ("qq",          "judging",       "QQ挂着呢? 专注工作!"),
-    ("腾讯qq",       "judging",       "QQ挂着呢? 专注工作!"),
     ("instagram",   "disappointed",  "Scrolling Instagram? Come on..."),
     ("twitter",     "disappointed",  "Twitter? In this economy? 😬"),
     ("facebook",    "surprised",     "Facebook? Really? 👀"),
@@ -175,26 +311,13 @@ APP_REACTIONS = [
     ("weibo",       "judging",       "刷微博? 摸鱼被我抓到了! 🐟"),
 
     # --- Coding / Productivity ---
-    ("notion",      "working_hard",  "我们一起努力✊"),
-    ("visual studio code", "proud",  "Coding! I'm proud of you! 💪"),
-    ("vscode",      "proud",         "Coding! I'm proud of you! 💪"),
-    ("pycharm",     "proud",         "Python dev! That's my person! 🐍"),
-    ("intellij",    "proud",         "Java? Bold choice. I respect it."),
-    ("notepad++",   "proud",         "Writing code? Nice! 👍"),
     ("记事本",       "proud",         "在写东西? 继续加油! 📝"),
 
     # --- Games ---
-    ("steam",       "playing_game",  "Let's play together! 🎮"),
-    ("genshin",     "surprised",     "Genshin Impact?! Pull me something good! ✨"),
-    ("原神",         "surprised",     "原神启动?! 抽到SSR了吗! ✨"),
     ("minecraft",   "proud",         "Building things! Creative! 🧱"),
     ("我的世界",     "proud",         "建造中! 好有创意! 🧱"),
-    ("fortnite",    "judging",       "Fortnite? Seriously? 😑"),
     ("王者荣耀",     "playing_game",  "王者上分中? 别送! 🏆"),
-    ("英雄联盟",     "playing_game",  "打LOL呢? carry全场! ⚔️"),
-    ("league of legends", "playing_game", "Playing League? Carry them! ⚔️"),
     ("和平精英",     "playing_game",  "吃鸡去了? 稳住! 🍗"),
-    ("pubg",        "playing_game",  "PUBG? Don't get thirsted! 🍗"),
     ("崩坏",         "playing_game",  "崩坏开舰了? 氪金警告! 💸"),
     ("明日方舟",     "playing_game",  "方舟肝活动? 注意休息! 🎮"),
 
@@ -211,21 +334,56 @@ APP_REACTIONS = [
     ("pinduoduo",   "judging",       "拼多多砍一刀? 真的有用吗... 😑"),
     ("闲鱼",         "surprised",     "逛闲鱼? 淘到宝了吗? 🐟"),
 
+    # --- Work / School ---
+    ("google docs", "proud",         "Docs! Productive day? 👍"),
+]
+
+
+# Program names as they appear in their own window titles. Only used when the
+# foreground program couldn't be identified (no PID, or psutil missing), and on
+# Mac, where the "title" is the app's name (so bundle ids missing above, like
+# PyCharm CE's, still react). Otherwise APP_PROCESS_REACTIONS already knows
+# the program exactly, and these would misfire on titles that merely contain them ("password" has "word",
+# "knowledge" has "edge"). Checked after APP_REACTIONS, first match wins.
+APP_NAME_REACTIONS = [
+    # --- Social Media / Chat ---
+    ("企业微信",     "proud",         "企业微信工作中! 加油! 💪"),   # WeCom — before "微信"
+    ("wechat",      "judging",       "又在摸鱼吗? 专注!"),
+    ("weixin",      "judging",       "又在摸鱼吗? 专注!"),
+    ("微信",         "judging",       "又在摸鱼吗? 专注!"),
+    ("qq",          "judging",       "QQ挂着呢? 专注工作!"),
+    ("腾讯qq",       "judging",       "QQ挂着呢? 专注工作!"),
+
+    # --- Coding / Productivity ---
+    ("notion",      "working_hard",  "我们一起努力✊"),
+    ("visual studio code", "proud",  "Coding! I'm proud of you! 💪"),
+    ("vscode",      "proud",         "Coding! I'm proud of you! 💪"),
+    ("pycharm",     "proud",         "Python dev! That's my person! 🐍"),
+    ("intellij",    "proud",         "Java? Bold choice. I respect it."),
+    ("notepad++",   "proud",         "Writing code? Nice! 👍"),
+
+    # --- Games ---
+    ("steam",       "playing_game",  "Let's play together! 🎮"),
+    ("genshin",     "surprised",     "Genshin Impact?! Pull me something good! ✨"),
+    ("原神",         "surprised",     "原神启动?! 抽到SSR了吗! ✨"),
+    ("fortnite",    "judging",       "Fortnite? Seriously? 😑"),
+    ("英雄联盟",     "playing_game",  "打LOL呢? carry全场! ⚔️"),
+    ("league of legends", "playing_game", "Playing League? Carry them! ⚔️"),
+    ("pubg",        "playing_game",  "PUBG? Don't get thirsted! 🍗"),
+
     # --- Work / School ---
     ("excel",       "proud",         "Spreadsheets! You're a boss! 📊"),
     ("word",        "proud",         "Writing something important? 📝"),
     ("powerpoint",  "proud",         "Making a presentation? Go you! 🎯"),
-    ("google docs", "proud",         "Docs! Productive day? 👍"),
     ("slack",       "proud",         "Working hard! I see you! 💼"),
     ("teams",       "surprised",     "Another meeting? Hang in there..."),
     ("钉钉",         "proud",         "打卡了! 好员工! 💼"),
     ("dingtalk",    "proud",         "打卡了! 好员工! 💼"),
     ("飞书",         "proud",         "用飞书干活? 效率很高嘛! 🚀"),
     ("lark",        "proud",         "Lark open! Stay productive! 🚀"),
-    ("企业微信",     "proud",         "企业微信工作中! 加油! 💪"),
     ("wps",         "proud",         "WPS工作中! 认真的样子很帅! 📄"),
 
-    # --- Web Browsers (put AFTER specific site checks) ---
+    # --- Web Browsers (a browser with nothing above in its title: just idle) ---
     ("chrome",      "idle",          None),
     ("firefox",     "idle",          None),
     ("edge",        "idle",          None),
@@ -236,19 +394,53 @@ APP_REACTIONS = [
     ("uc浏览器",     "idle",          None),
 ]
 
+# Your own reaction rules, on top of (or instead of) the two tables above:
+# a JSON file, or TOML if the name ends in .toml. Keyword, regex and exact
+# process rules are supported — see reaction_rules.py for the format. The
+# file is watched: saved changes apply within a moment, and a file with
+# mistakes is rejected whole (the reason is printed) while the current rules
+# keep running. None turns it off.
+REACTION_RULES_FILE = os.path.join(CONFIG_DIR, "reactions.json")
+# Wait this long (ms) after the file changes before reloading — editors often
+# write a file in several steps.
+REACTION_RULES_SETTLE_MS = 250
+
+# Usage tracking (usage_store.py): while supervisor mode runs, how long each
+# app is in front is totalled per hour and shown by "Today's Stats" in the
+# menu. Totals are kept in memory and written every USAGE_FLUSH_INTERVAL_MS
+# (or once USAGE_FLUSH_MAX_PENDING hour/app rows are waiting) and on quit.
+USAGE_TRACKING_ENABLED = True
+USAGE_DB_FILE = os.path.join(DATA_DIR, "usage.sqlite3")
+USAGE_FLUSH_INTERVAL_MS = 300000
+USAGE_FLUSH_MAX_PENDING = 200
+
 # How long (in ms) a speech bubble stays visible before disappearing.
 SPEECH_BUBBLE_DURATION_MS = 3000
 
+# How many rendered speech bubbles (one per text and placement) to keep around.
+# Reactions reuse a small set of phrases, so a few dozen covers them all.
+BUBBLE_CACHE_SIZE = 32
+
 # ---------------------------------------------------------------------------
 # Wanderer Mode settings
 # ---------------------------------------------------------------------------
 # How often (in ms) the movement controller updates position during driving.
-# 50ms = 20 updates per second for smooth movement.
+# 50ms = 20 updates per second for smooth movement. This only changes how
+# smooth the motion looks — the speed is the same at any update rate.
 MOVEMENT_UPDATE_INTERVAL_MS = 50
 
-# Movement speed (pixels per update tick).
-# At 50ms intervals, speed of 3 = 60 pixels/second.
-DRIVE_SPEED = 3  # Renamed from WALK_SPEED
+# Movement speed in pixels per second.
+DRIVE_SPEED = 60  # Renamed from WALK_SPEED
+
+# Easing for each leg of a drive, and for driving back to the edge after a drag.
+# "Linear" is a steady speed the whole way. Any QEasingCurve.Type name works
+# instead — e.g. "InOutSine" to speed up and slow down at the corners, or
+# "OutQuad" to ease into the edge.
+DRIVE_EASING = "Linear"
+RETURN_EASING = "Linear"
+
+# How far inside the screen edges the pet drives (pixels). 0 = sprite touches the edges.
+ROUTE_INSET = 0
 
 # Edge strip thickness - defines how wide the edge zones are (pixels).
 # Pet will ONLY visit the edge strips (left, right, top, bottom).
@@ -297,3 +489,14 @@ PETTING_DURATION_MS = 1500
 # Float behavior timings
 FLOAT_ACTIVE_DURATION_MS = 3000   # How long to float actively before going calm
 FLOAT_CALM_DURATION_MS = 5000     # How long to float calmly before going active again
+
+# ---------------------------------------------------------------------------
+# Swarm mode settings (python main.py --swarm N)
+# ---------------------------------------------------------------------------
+# Each pet drives at DRIVE_SPEED give or take this fraction, so they spread out.
+SWARM_SPEED_VARIATION = 0.25
+
+# Pets closer than this (pixels, sprite top-left to top-left) slow down for
+# the one ahead of them on the route, down to SWARM_MIN_SPEED_FACTOR of their speed.
+SWARM_SEPARATION_PX = 120
+SWARM_MIN_SPEED_FACTOR = 0.2
@@ -12,6 +12,7 @@
 #   Mac:      dist/DesktopPet.app  (app bundle)
 # ---------------------------------------------------------------------------
 
+import glob
 import sys
 import os
 
@@ -61,6 +62,13 @@ datas = [
     for sprite in sprite_files
 ]
 
+# Prebuilt sprite atlas (python sprite_atlas.py) — bundled if present, so the
+# app loads one sheet instead of packing the atlas on first launch.
+datas += [
+    (path, os.path.join("assets", "sprites"))
+    for path in glob.glob(os.path.join("assets", "sprites", "atlas*"))
+]
+
 # ---------------------------------------------------------------------------
 # Hidden imports — modules PyInstaller can't auto-detect
 # ---------------------------------------------------------------------------
@@ -92,7 +100,6 @@ a = Analysis(
         # Exclude heavy packages we don't need — keeps the bundle smaller
         "onnxruntime",
         "rembg",
-        "numpy",
         "PIL",
         "cv2",
         "torch",
@@ -0,0 +1,140 @@
+# focus_watcher.py
+# ---------------------------------------------------------------------------
+# Tells supervisor mode when the foreground window changes, instead of it
+# asking every APP_CHECK_INTERVAL_MS.
+#
+# One event source per platform, all delivered on the Qt event loop:
+#   Windows: SetWinEventHook for EVENT_SYSTEM_FOREGROUND (another window came
+#            to the front) and EVENT_OBJECT_NAMECHANGE on the foreground
+#            window (it retitled itself, e.g. a browser tab switch).
+#   macOS:   NSWorkspaceDidActivateApplicationNotification — the monitor
+#            reads the app name, so activation is the only change that counts.
+#   Linux:   X11 PropertyNotify on _NET_ACTIVE_WINDOW (x11_backend.py).
+#
+# focus_changed is emitted on each change. If no event source could be set
+# up (missing bindings, no X display, a window manager without EWMH, or
+# FOCUS_EVENTS_ENABLED off), event_driven is False and the caller polls
+# as before.
+# ---------------------------------------------------------------------------
+
+import sys
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+import config
+
+
+class FocusWatcher(QObject):
+    """Emits focus_changed when the foreground window (or its title) changes."""
+
+    focus_changed = pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+        self._source = None
+        if config.FOCUS_EVENTS_ENABLED:
+            self._source = self._create_source()
+        print(f"[focus_watcher] {'Event-driven' if self._source else 'No focus events — polling'}")
+
+    @property
+    def event_driven(self) -> bool:
+        return self._source is not None
+
+    def close(self):
+        if self._source is not None:
+            self._source.close()
+            self._source = None
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+    def _create_source(self):
+        """The platform's event source, or None if it can't be used here."""
+        try:
+            if sys.platform == "win32":
+                return _WindowsFocusHook(self.focus_changed.emit)
+            if sys.platform == "darwin":
+                return _MacActivationObserver(self.focus_changed.emit)
+            from x11_backend import X11FocusEvents
+            return X11FocusEvents.create(self.focus_changed.emit)
+        except Exception as error:
+            print(f"[focus_watcher] Focus events unavailable: {error}")
+            return None
+
+
+class _WindowsFocusHook:
+    """SetWinEventHook, out of context — callbacks arrive through the GUI thread's message loop."""
+
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    EVENT_OBJECT_NAMECHANGE = 0x800C
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    WINEVENT_SKIPOWNPROCESS = 0x0002
+    OBJID_WINDOW = 0
+
+    def __init__(self, on_change):
+        import ctypes
+        from ctypes import wintypes
+
+        self._on_change = on_change
+        self._user32 = ctypes.windll.user32
+        self._user32.SetWinEventHook.restype = wintypes.HANDLE
+        proc_type = ctypes.WINFUNCTYPE(
+            None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+            wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD,
+        )
+        self._proc = proc_type(self._on_event)   # keep a reference, or ctypes frees the callback
+        flags = self.WINEVENT_OUTOFCONTEXT | self.WINEVENT_SKIPOWNPROCESS
+        self._hooks = [
+            self._user32.SetWinEventHook(event, event, 0, self._proc, 0, 0, flags)
+            for event in (self.EVENT_SYSTEM_FOREGROUND, self.EVENT_OBJECT_NAMECHANGE)
+        ]
+        if not all(self._hooks):
+            self.close()
+            raise OSError("SetWinEventHook failed")
+
+    def _on_event(self, hook, event, hwnd, id_object, id_child, thread, time_ms):
+        if event == self.EVENT_OBJECT_NAMECHANGE:
+            # Every control renaming itself fires this — only the foreground window's title counts
+            if id_object != self.OBJID_WINDOW or hwnd != self._user32.GetForegroundWindow():
+                return
+        self._on_change()
+
+    def close(self):
+        for hook in self._hooks:
+            if hook:
+                self._user32.UnhookWinEvent(hook)
+        self._hooks = []
+
+
+_observer_class = None
+
+
+class _MacActivationObserver:
+    """NSWorkspace activation notifications — delivered on the main run loop Qt runs."""
+
+    def __init__(self, on_change):
+        from AppKit import NSWorkspace, NSWorkspaceDidActivateApplicationNotification
+
+        self._center = NSWorkspace.sharedWorkspace().notificationCenter()
+        self._observer = _make_observer_class().alloc().init()
+        self._observer.on_change = on_change
+        self._center.addObserver_selector_name_object_(
+            self._observer, "appActivated:", NSWorkspaceDidActivateApplicationNotification, None,
+        )
+
+    def close(self):
+        self._center.removeObserver_(self._observer)
+
+
+def _make_observer_class():
+    """The Objective-C observer class (defined once — Objective-C class names are process-wide)."""
+    global _observer_class
+    if _observer_class is None:
+        from Foundation import NSObject
+
+        class PetFocusObserver(NSObject):
+            def appActivated_(self, notification):
+                self.on_change()
+
+        _observer_class = PetFocusObserver
+    return _observer_class
@@ -0,0 +1,85 @@
+# kinematics.py
+# ---------------------------------------------------------------------------
+# Time-based movement shared by wandering and return-to-edge.
+#
+# A Motion is a drive along a Route (route.py) from one distance to another
+# at a speed in pixels per second. Its position is a pure function of
+# elapsed time on a clock:
+#
+#     progress = elapsed / duration          (0..1)
+#     distance = start + (end - start) * easing(progress)
+#     position = route.position_at(distance)
+#
+# so it doesn't matter how often (or how late) the movement timer fires —
+# at 20, 60 or 144 updates per second the pet is at the same place at the
+# same moment, only sampled more or less often. Positions are floats; only
+# the final window position is rounded, so no distance is lost to
+# truncation and long diagonal moves end exactly on target.
+# ---------------------------------------------------------------------------
+
+from PyQt6.QtCore import QPointF, QEasingCurve
+
+from clock import get_clock
+from route import Route
+
+
+def easing_curve(name: str) -> QEasingCurve:
+    """QEasingCurve from a type name like "Linear" or "InOutSine" (see QEasingCurve.Type)."""
+    try:
+        return QEasingCurve(getattr(QEasingCurve.Type, name))
+    except AttributeError:
+        print(f"[kinematics] Unknown easing curve '{name}' — using Linear.")
+        return QEasingCurve(QEasingCurve.Type.Linear)
+
+
+class Motion:
+    """A drive along route from start_distance to end_distance at speed_px_s, started now on clock."""
+
+    def __init__(self, route: Route, start_distance: float, end_distance: float,
+                 speed_px_s: float, easing: str = "Linear", clock=None):
+        self.route = route
+        self.start_distance = start_distance
+        self.end_distance = end_distance
+        self._clock = clock or get_clock()
+        self._curve = easing_curve(easing)
+        self._started_ms = self._clock.now_ms()
+
+        self.distance = abs(end_distance - start_distance)
+        self.duration_ms = self.distance / speed_px_s * 1000 if speed_px_s > 0 else 0.0
+
+    @classmethod
+    def line(cls, start, end, speed_px_s: float, easing: str = "Linear", clock=None) -> "Motion":
+        """A straight move from start to end."""
+        route = Route.line(start, end)
+        return cls(route, 0.0, route.total, speed_px_s, easing, clock)
+
+    @property
+    def end(self) -> QPointF:
+        return self.route.position_at(self.end_distance)
+
+    @property
+    def direction(self) -> str:
+        """Which way the sprite should face right now: "left" or "right"."""
+        return self.route.direction_at(self.distance_now())
+
+    def progress(self) -> float:
+        """How far along the move is in time, 0.0 (just started) to 1.0 (done)."""
+        if self.duration_ms <= 0:
+            return 1.0
+        return min(1.0, (self._clock.now_ms() - self._started_ms) / self.duration_ms)
+
+    @property
+    def finished(self) -> bool:
+        return self.progress() >= 1.0
+
+    def distance_now(self) -> float:
+        """Distance along the route right now (exactly end_distance once finished)."""
+        t = self.progress()
+        if t >= 1.0:
+            return self.end_distance
+        eased = self._curve.valueForProgress(t)
+        return self.start_distance + (self.end_distance - self.start_distance) * eased
+
+    def position(self) -> QPointF:
+        """Where the move is right now."""
+        return self.route.position_at(self.distance_now())
@@ -5,10 +5,13 @@
 # starts the mode manager, and runs the event loop.
 # 
 # Phase 6: Added Interactive Mode with user-triggered actions (slap, hang, feed, pet).
+#
+# python main.py --swarm N  runs N pets wandering together instead (swarm.py).
 # ---------------------------------------------------------------------------
 
+import argparse
 import sys
-from PyQt6.QtWidgets import QApplication, QMenu
+from PyQt6.QtWidgets import QApplication, QMenu, QMessageBox
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QAction
 
@@ -20,10 +23,14 @@ from mode_manager import ModeManager
 class DesktopPetApp:
     """Main application controller with mode switching."""
     
-    def __init__(self):
+    def __init__(self, swarm: int = 0):
         # 1. Create the Qt application (required before any QWidget)
         self.app = QApplication(sys.argv)
         
+        if swarm:
+            self._start_swarm(swarm)
+            return
+        
         # 2. Load the character (sprite or placeholder)
         self.character = Character()
         
@@ -47,6 +54,26 @@ class DesktopPetApp:
         print("[main] Desktop Pet started!")
         print("[main] Right-click the character to switch modes")
     
+    def _start_swarm(self, count: int):
+        """Swarm mode: many wandering pets sharing one movement tick, right-click any of them to quit."""
+        from swarm import Swarm
+        
+        self.swarm = Swarm(count)
+        for window in self.swarm.windows:
+            window.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+            window.customContextMenuRequested.connect(
+                lambda pos, window=window: self._show_swarm_menu(window, pos))
+        
+        print(f"[main] Desktop Pet swarm started with {count} pets!")
+    
+    def _show_swarm_menu(self, window, pos):
+        """Context menu in swarm mode — just Quit."""
+        menu = QMenu(window)
+        quit_action = QAction("❌ Quit", window)
+        quit_action.triggered.connect(self.app.quit)
+        menu.addAction(quit_action)
+        menu.exec(window.mapToGlobal(pos))
+    
     def _show_context_menu(self, pos):
         """Show context menu when user right-clicks."""
         menu = QMenu(self.window)
@@ -79,6 +106,14 @@ class DesktopPetApp:
         # --- Separator ---
         menu.addSeparator()
         
+        # --- Usage report (recorded while in Supervisor Mode) ---
+        if self.mode_manager.usage_recorder is not None:
+            stats_action = QAction("📈 Today's Stats", self.window)
+            stats_action.setToolTip("How long each app was in front today")
+            stats_action.triggered.connect(self._show_today_stats)
+            menu.addAction(stats_action)
+            menu.addSeparator()
+        
         # --- Interactive actions (only show in Interactive Mode) ---
         if current_mode == "interactive":
             slap_action = QAction("👋 Slap", self.window)
@@ -124,13 +159,23 @@ class DesktopPetApp:
         # Show the menu at the cursor position
         menu.exec(self.window.mapToGlobal(pos))
     
+    def _show_today_stats(self):
+        """Show today's per-app time (stored totals plus what hasn't been written yet)."""
+        from usage_store import format_stats
+        
+        stats = self.mode_manager.usage_recorder.today_stats()
+        QMessageBox.information(self.window, "Today's Stats", format_stats(stats))
+    
     def run(self):
         """Run the Qt event loop."""
         return self.app.exec()
 
 
 def main():
-    app = DesktopPetApp()
+    parser = argparse.ArgumentParser(description="Desktop Pet")
+    parser.add_argument("--swarm", type=int, default=0, metavar="N", help="run N pets at once")
+    args, _ = parser.parse_known_args()   # leave Qt's own arguments alone
+    app = DesktopPetApp(swarm=args.swarm)
     sys.exit(app.run())
 
 
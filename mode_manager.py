@@ -2,54 +2,117 @@
 # Wanderer Mode: Pet walks clockwise around screen edges with random poses
 
 import random
-from PyQt6.QtCore import QTimer, QPoint
 
 import config
 from character import Character
 from window_manager import PetWindow
-from app_monitor import AppMonitor
+from app_monitor import AppMonitor, AppMonitorThread
 from movement import MovementController
+from reaction_filter import ReactionFilter
+from scheduler import Scheduler, get_scheduler
+from sprite_loader import PRIORITY_MODE
+from usage_store import UsageRecorder
+
+# Animations each mode can show — preloaded ahead of the rest when the mode starts.
+MODE_ANIMATIONS = {
+    "supervisor": ["idle"] + list(dict.fromkeys(
+        anim for table in (config.APP_PROCESS_REACTIONS, config.APP_REACTIONS, config.APP_NAME_REACTIONS)
+        for _, anim, _ in table
+    )),
+    "wanderer": [
+        "idle", "driving_left", "driving_right", *config.WANDERER_POSES,
+        "dragged_by_ear", "driving_sad_left", "driving_sad_right", "touching_ears_sad",
+    ],
+    "interactive": [
+        "idle", "slap_reaction", "float_active", "float_calm", "eating", "eating_satisfied",
+        "petting_happy", "float_slap_reaction", "float_eating", "float_eating_satisfied",
+        "float_petting_happy",
+    ],
+}
+
+# What usually comes after each animation — prefetched as soon as it starts,
+# so the next switch finds its frames already loaded.
+ANIMATION_SUCCESSORS = {
+    # Wanderer: idle -> drive -> pose at the corner -> drive ...
+    "driving_left": config.WANDERER_POSES,
+    "driving_right": config.WANDERER_POSES,
+    **{pose: ["driving_left", "driving_right"] for pose in config.WANDERER_POSES},
+    "dragged_by_ear": ["driving_sad_left", "driving_sad_right"],
+    "driving_sad_left": ["touching_ears_sad"],
+    "driving_sad_right": ["touching_ears_sad"],
+    "touching_ears_sad": ["driving_left", "driving_right"],
+    # Interactive: each action settles back to idle (or calm floating)
+    "slap_reaction": ["idle"],
+    "eating": ["eating_satisfied"],
+    "eating_satisfied": ["idle"],
+    "petting_happy": ["idle"],
+    "float_active": ["float_calm"],
+    "float_calm": ["float_active"],
+    "float_slap_reaction": ["float_calm"],
+    "float_eating": ["float_eating_satisfied"],
+    "float_eating_satisfied": ["float_calm"],
+    "float_petting_happy": ["float_calm"],
+}
 
 
 class ModeManager:
     """Manages Supervisor and Wanderer modes."""
 
-    def __init__(self, character: Character, window: PetWindow):
+    def __init__(self, character: Character, window: PetWindow,
+                 rng=None, scheduler: Scheduler = None, movement: MovementController = None,
+                 app_monitor: AppMonitor = None, monitor_thread: AppMonitorThread = None,
+                 usage_recorder: UsageRecorder = None):
+        """
+        rng, scheduler and movement are for running headless (see simulator.py):
+        a seeded random.Random, a Scheduler on a virtual clock, and a
+        MovementController on the same clock. app_monitor and monitor_thread
+        replace the OS-facing side of supervisor mode (no focus events, no
+        worker thread), and usage_recorder one that doesn't write to the real
+        usage database. The defaults are the real thing.
+        """
         self.character = character
         self.window = window
+        self._rng = rng or random
+
+        # --- Timed work: jobs on the shared scheduler, owned by the mode they belong to ---
+        # Leaving a mode cancels everything it owns in one call (see _leave_mode).
+        self.scheduler = scheduler or get_scheduler()
+        self._jobs = {
+            # name:     (mode that owns it, what it runs)
+            "check":    ("supervisor", self._on_supervisor_tick),
+            "bubble":   ("supervisor", self._hide_bubble),
+            "movement": ("wanderer", self._on_wanderer_movement_tick),
+            "pose":     ("wanderer", self._on_pose_done),
+            "float":    ("interactive", self._on_float_toggle),
+            "action":   ("interactive", self._on_action_complete),  # For timed actions (slap, feed, pet)
+        }
         
         # --- Supervisor Mode components ---
-        self.app_monitor = AppMonitor()
-        self._check_timer = QTimer()
-        self._check_timer.setInterval(config.APP_CHECK_INTERVAL_MS)
-        self._check_timer.timeout.connect(self._on_supervisor_tick)
-        self._bubble_timer = QTimer()
-        self._bubble_timer.setInterval(config.SPEECH_BUBBLE_DURATION_MS)
-        self._bubble_timer.timeout.connect(self._hide_bubble)
+        self.app_monitor = app_monitor or AppMonitor(scheduler=self.scheduler)
+        self._app_monitor_thread = None   # started on the first check — see _on_supervisor_tick
+        self._reaction_filter = ReactionFilter(self.scheduler)   # debounces what the monitor reports
+        self._reaction_filter.reaction.connect(self._on_reaction)
+        self.app_monitor.focus_watcher.focus_changed.connect(self._on_focus_changed)
+        # How long each app is in front — see usage_store.py
+        self.usage_recorder = usage_recorder
+        if usage_recorder is None and config.USAGE_TRACKING_ENABLED:
+            self.usage_recorder = UsageRecorder(scheduler=self.scheduler)
+        if monitor_thread is not None:
+            self._connect_monitor_thread(monitor_thread)
 
         # --- Wanderer Mode components ---
-        self.movement = MovementController(window_width=900, window_height=900)
-        self._movement_timer = QTimer()
-        self._movement_timer.setInterval(config.MOVEMENT_UPDATE_INTERVAL_MS)
-        self._movement_timer.timeout.connect(self._on_wanderer_movement_tick)
-        self._pose_timer = QTimer()
-        self._pose_timer.timeout.connect(self._on_pose_done)
+        self.movement = movement or MovementController(config.WINDOW_WIDTH, config.WINDOW_HEIGHT)
         
         # --- Wanderer state tracking ---
         self._wanderer_state = "idle"  # idle, walking, posing, returning_to_edge, touching_ears, being_dragged
         self._previous_wanderer_state = None  # Store state before drag
-        self._return_target = None
-        self._return_edge = None
+        self._return_motion = None
+        self._return_distance = None   # where on the route the pet drives back to after a drag
 
         # --- Interactive Mode components ---
         self._interactive_state = "idle"  # idle, slapping, floating, eating, petting, satisfied
-        self._float_timer = QTimer()
-        self._float_timer.timeout.connect(self._on_float_toggle)
         self._float_phase = "active"  # active or calm
         self._was_floating_before_action = False  # Track if action was done while floating
-        
-        self._action_timer = QTimer()  # For timed actions (slap, feed, pet)
-        self._action_timer.timeout.connect(self._on_action_complete)
 
         # --- Current mode ---
         self.current_mode = None
@@ -68,16 +131,17 @@ class ModeManager:
         
         print("[mode_manager] Switching to Supervisor mode")
         
-        # Stop wanderer
-        self._movement_timer.stop()
-        self._pose_timer.stop()
+        # Stop whatever the previous mode had scheduled
+        self._leave_mode()
         self.movement.stop_moving()
         
         # Start supervisor
         self.current_mode = "supervisor"
+        if self.usage_recorder is not None:
+            self.usage_recorder.resume()   # same window as when we left — a new one is reported by the next check
+        self.character.preload(MODE_ANIMATIONS["supervisor"], PRIORITY_MODE)
         self._hide_bubble()
-        self.character.set_animation("idle")
-        self._check_timer.start()
+        self._play("idle")
 
     def switch_to_wanderer(self):
         """Switch to Wanderer mode - starts at bottom-left, walks clockwise."""
@@ -86,149 +150,206 @@ class ModeManager:
         
         print("[mode_manager] Switching to Wanderer mode")
         
-        # Stop supervisor
-        self._check_timer.stop()
-        self._bubble_timer.stop()
-        
-        # Stop interactive (IMPORTANT - was missing!)
-        self._float_timer.stop()
-        self._action_timer.stop()
+        # Stop whatever the previous mode had scheduled
+        self._leave_mode()
         
         # Set mode and reset state
         self.current_mode = "wanderer"
-        self._wanderer_state = "idle"
+        self.character.preload(MODE_ANIMATIONS["wanderer"], PRIORITY_MODE)
+        self._set_wanderer_state("idle")
         self._previous_wanderer_state = None
-        self._return_target = None
-        self._return_edge = None
+        self._return_motion = None
+        self._return_distance = None
         self._hide_bubble()
         
+        # RESET movement controller state (CRITICAL FIX) — back to the start of the route,
+        # on the primary screen. First, so the starting position is on that screen's route.
+        self.movement.reset()
+        
         # Move to starting position (bottom-left)
         starting_pos = self.movement.get_starting_position()
         print(f"[wanderer] Moving to starting position: ({starting_pos.x()}, {starting_pos.y()})")
-        self.window.move(starting_pos)
-        self.movement.set_current_position(starting_pos)
-        
-        # RESET movement controller state (CRITICAL FIX)
-        self.movement.is_moving = False
-        self.movement.target_pos = None
-        self.movement.current_edge = "BOTTOM"  # Start from bottom edge
+        self.window.move_sprite(starting_pos)
         
         # Start walking after brief idle
-        self.character.set_animation("idle")
-        self._pose_timer.setSingleShot(True)
-        self._pose_timer.start(2000)  # 2 second idle before starting
-        
-        # Start movement updates
-        self._movement_timer.start()
+        self._play("idle")
+        self._after("pose", 2000)  # 2 second idle before starting
+        # Movement updates start with the first walk (see _set_wanderer_state)
+
+    def wakeups_per_minute(self) -> float:
+        """How often the scheduler woke the process over the last minute (all jobs, coalesced)."""
+        return self.scheduler.wakeups.per_minute()
+
+    # ------------------------------------------------------------------
+    # Scheduling helpers — jobs are looked up in self._jobs
+    # ------------------------------------------------------------------
+    def _owner(self, mode: str) -> tuple:
+        return (self, mode)
+
+    def _after(self, name: str, delay_ms: int):
+        """Run job `name` once, delay_ms from now (replacing it if already scheduled)."""
+        mode, callback = self._jobs[name]
+        self.scheduler.schedule(name, delay_ms, callback, owner=self._owner(mode))
+
+    def _every(self, name: str, interval_ms: int):
+        """Run job `name` every interval_ms, starting one interval from now."""
+        mode, callback = self._jobs[name]
+        self.scheduler.every(name, interval_ms, callback, owner=self._owner(mode))
+
+    def _cancel(self, name: str):
+        self.scheduler.cancel(name, owner=self._owner(self._jobs[name][0]))
+
+    def _is_scheduled(self, name: str) -> bool:
+        return self.scheduler.is_scheduled(name, owner=self._owner(self._jobs[name][0]))
+
+    def _leave_mode(self):
+        """Cancel every job the current mode has scheduled."""
+        if self.current_mode == "supervisor":
+            self._reaction_filter.reset()
+            if self.usage_recorder is not None:
+                self.usage_recorder.pause()
+        if self.current_mode is not None:
+            self.scheduler.cancel_owner(self._owner(self.current_mode))
+
+    def _play(self, animation_name: str):
+        """Switch animation, and prefetch whatever is likely to follow it."""
+        self.character.set_animation(animation_name)
+
+        successors = ANIMATION_SUCCESSORS.get(animation_name)
+        if successors is None and self.current_mode == "wanderer" and animation_name == "idle":
+            successors = ["driving_left", "driving_right"]
+        elif successors is None and self.current_mode == "supervisor":
+            successors = ["idle"]   # every reaction ends back on idle
+        if successors:
+            self.character.prefetch(successors)
 
     # ========================================================================
     # Supervisor Mode
     # ========================================================================
 
     def _on_supervisor_tick(self):
-        """Check active app and trigger reaction."""
-        reaction = self.app_monitor.check()
-        if reaction is None:
+        """Ask the monitor thread to check the active app — a changed reaction arrives in _on_reaction."""
+        if self._app_monitor_thread is None:
+            self._connect_monitor_thread(AppMonitorThread(self.app_monitor, self.scheduler))
+        self._app_monitor_thread.request_check()
+
+    def _connect_monitor_thread(self, thread: AppMonitorThread):
+        self._app_monitor_thread = thread
+        thread.reaction_changed.connect(self._reaction_filter.submit)
+        if self.usage_recorder is not None:
+            thread.window_changed.connect(self.usage_recorder.record)
+
+    def _on_reaction(self, reaction: tuple):
+        """The active app's reaction changed (and stuck — see ReactionFilter): play it, say its line if any."""
+        if self.current_mode != "supervisor":
             return
 
         animation_name, speech_text = reaction
-        self.character.set_animation(animation_name)
+        self._play(animation_name)
 
         if speech_text:
             self.window.show_speech_bubble(speech_text)
-            self._bubble_timer.start()
+        elif animation_name != "idle":
+            # No line to say (none written, or muted by the cooldown): the animation
+            # still stays up as long as a bubble would, not swapped straight back to idle
+            self.window.hide_speech_bubble()
         else:
             self._hide_bubble()
+            return
+        self._after("bubble", config.SPEECH_BUBBLE_DURATION_MS)
+        # Nothing would change while the reaction is up — resume checking when it ends
+        self._cancel("check")
+
+    def _on_focus_changed(self):
+        """The foreground window changed (event-driven monitoring) — react now, unless a bubble is up."""
+        if self.current_mode == "supervisor" and not self._is_scheduled("bubble"):
+            self._on_supervisor_tick()
 
     def _hide_bubble(self):
         """Hide speech bubble."""
-        self._bubble_timer.stop()
+        self._cancel("bubble")
         self.window.hide_speech_bubble()
         if self.current_mode == "supervisor":
-            self.character.set_animation("idle")
+            self._play("idle")
+            if self.app_monitor.focus_watcher.event_driven:
+                # No timer to resume — just catch up on any switch made while the bubble was up
+                self._on_supervisor_tick()
+            elif not self._is_scheduled("check"):
+                self._every("check", config.APP_CHECK_INTERVAL_MS)
 
     # ========================================================================
     # Wanderer Mode - Clockwise Movement
     # ========================================================================
 
+    def _set_wanderer_state(self, state: str):
+        """
+        Change wanderer state, and run the movement timer only in states that move.
+        Posing, touching ears, being dragged and idling leave the process asleep.
+        """
+        self._wanderer_state = state
+        moving = self.current_mode == "wanderer" and state in ("walking", "returning_to_edge")
+        if moving and not self._is_scheduled("movement"):
+            self._every("movement", config.MOVEMENT_UPDATE_INTERVAL_MS)
+        elif not moving:
+            self._cancel("movement")
+
     def _on_wanderer_movement_tick(self):
         """Update position during walking."""
         if self._wanderer_state == "being_dragged":
             # Don't update position while user is dragging
             # The window_manager handles position updates during drag
+            # (the timer is stopped while dragging; this is just a guard)
             return
         
         if self._wanderer_state == "returning_to_edge":
             # Returning to edge after being dragged
             new_pos, reached_target, direction = self._update_return_to_edge()
-            self.window.move(new_pos)
+            self.window.move_sprite(new_pos)
             
             if reached_target:
                 print("[wanderer] Reached edge! Touching ears sadly...")
-                self._wanderer_state = "touching_ears"
-                self.character.set_animation("touching_ears_sad")
+                self._set_wanderer_state("touching_ears")
+                self._play("touching_ears_sad")
                 
                 # Update movement controller's position to the edge position
                 self.movement.set_current_position(new_pos)
                 
                 # After touching ears, resume normal wanderer behavior
-                self._pose_timer.setSingleShot(True)
-                self._pose_timer.start(2000)  # 2 seconds of ear touching
+                self._after("pose", 2000)  # 2 seconds of ear touching
         
         elif self._wanderer_state == "walking":
             # Normal clockwise walking
             new_pos, reached_corner, direction = self.movement.update_position()
-            self.window.move(new_pos)
+            self.window.move_sprite(new_pos)
             
             if reached_corner:
                 print("[wanderer] Reached corner!")
-                self._wanderer_state = "posing"
+                self._set_wanderer_state("posing")
                 self._do_random_pose()
     
     def _update_return_to_edge(self) -> tuple:
         """Update position while returning to edge after drag."""
-        current_pos = self.window.pos()
-        
-        # Calculate vector to target
-        dx = self._return_target.x() - current_pos.x()
-        dy = self._return_target.y() - current_pos.y()
-        distance = (dx**2 + dy**2) ** 0.5
-        
-        # Determine direction for animation
-        direction = "right" if dx > 0 else "left"
-        
-        # Check if reached
-        if distance < self.movement.speed:
-            return self._return_target, True, direction
-        
-        # Move towards target
-        move_x = int((dx / distance) * self.movement.speed)
-        move_y = int((dy / distance) * self.movement.speed)
-        new_pos = QPoint(current_pos.x() + move_x, current_pos.y() + move_y)
-        
-        return new_pos, False, direction
+        motion = self._return_motion
+        return motion.position().toPoint(), motion.finished, motion.direction
 
     def _on_pose_done(self):
         """Called when pose duration ends - start walking to next corner OR resume after touching ears."""
         if self._wanderer_state == "touching_ears":
             # After touching ears sadly, resume normal wanderer behavior
-            # Simply continue to the next corner in clockwise order based on which edge we're on
-            print(f"[wanderer] Resuming clockwise cycle from {self._return_edge} edge")
-            
-            # Set current_edge to the edge we returned to
-            # start_walking_to_next_corner will then go to the correct next corner
-            self.movement.current_edge = self._return_edge
+            # Simply continue to the next corner in clockwise order from where we rejoined the route
+            print(f"[wanderer] Resuming clockwise cycle from {self._return_distance:.0f}px along route")
             
-            # Update movement controller position
-            self.movement.set_current_position(self.window.pos())
+            # Update movement controller position — it projects onto the route,
+            # so start_walking_to_next_corner will then go to the correct next corner
+            self.movement.set_current_position(self.window.sprite_pos())
             
-            self._wanderer_state = "walking"
+            self._set_wanderer_state("walking")
             self._on_wanderer_start_next_walk()
             
         elif self._wanderer_state in ("posing", "idle"):
             # Normal pose ended OR initial idle ended, continue walking
             print("[wanderer] Starting walk to next corner")
-            self._wanderer_state = "walking"
+            self._set_wanderer_state("walking")
             self._on_wanderer_start_next_walk()
     
     def _on_wanderer_start_next_walk(self):
@@ -237,29 +358,28 @@ class ModeManager:
         
         # Set driving animation
         if direction == "left":
-            self.character.set_animation("driving_left")
+            self._play("driving_left")
         else:
-            self.character.set_animation("driving_right")
+            self._play("driving_right")
 
     def _do_random_pose(self):
         """Show random pose at corner."""
         # Pick random pose
-        pose = random.choice(config.WANDERER_POSES)
+        pose = self._rng.choice(config.WANDERER_POSES)
         print(f"[wanderer] Doing pose: {pose}")
         
         # Show pose
-        self.character.set_animation(pose)
-        self._wanderer_state = "posing"
+        self._play(pose)
+        self._set_wanderer_state("posing")
         
         # Set duration
-        duration = random.randint(
+        duration = self._rng.randint(
             config.MIN_POSE_DURATION * 1000,
             config.MAX_POSE_DURATION * 1000
         )
         
         # After pose, continue walking
-        self._pose_timer.setSingleShot(True)
-        self._pose_timer.start(duration)
+        self._after("pose", duration)
 
     def on_pet_drag_start(self):
         """Handle drag start - show dragged_by_ear animation and pause wanderer."""
@@ -268,11 +388,11 @@ class ModeManager:
             # Stop wanderer movement updates while being dragged
             # This prevents movement tick from interfering with drag
             self._previous_wanderer_state = self._wanderer_state
-            self._wanderer_state = "being_dragged"
+            self._set_wanderer_state("being_dragged")
             self.movement.stop_moving()
-            self._pose_timer.stop()
+            self._cancel("pose")
             # Show dragged animation (will stay on this until release)
-            self.character.set_animation("dragged_by_ear")
+            self._play("dragged_by_ear")
     
     def on_pet_dragged(self, new_pos):
         """Handle drag END (mouse release) - pet returns to closest edge with sad animation."""
@@ -284,21 +404,21 @@ class ModeManager:
         # Update current position to where the user dropped it
         self.movement.set_current_position(new_pos)
         
-        # Find closest edge and calculate return position
-        return_target, closest_edge = self.movement.find_closest_edge_position(new_pos)
-        self._return_target = return_target
-        self._return_edge = closest_edge
+        # Find the closest point on the route to drive back to
+        return_target, self._return_distance = self.movement.closest_route_position(new_pos)
+        self._return_motion = self.movement.motion_to(return_target, config.RETURN_EASING)
+        closest_edge = self.movement.route.name_at(self._return_distance) or "route"
         
         # Start returning to edge with sad animation
-        self._wanderer_state = "returning_to_edge"
+        self._set_wanderer_state("returning_to_edge")
         
         # Determine direction for sad driving animation based on target
         dx = return_target.x() - new_pos.x()
         if dx > 0:
-            self.character.set_animation("driving_sad_right")
+            self._play("driving_sad_right")
             print(f"[wanderer] Driving sadly RIGHT to {closest_edge} edge")
         else:
-            self.character.set_animation("driving_sad_left")
+            self._play("driving_sad_left")
             print(f"[wanderer] Driving sadly LEFT to {closest_edge} edge")
         
         print(f"[wanderer] Target position: ({return_target.x()}, {return_target.y()})")
@@ -314,26 +434,18 @@ class ModeManager:
         
         print("[mode_manager] Switching to Interactive mode")
         
-        # Stop supervisor
-        self._check_timer.stop()
-        self._bubble_timer.stop()
-        
-        # Stop wanderer
-        self._movement_timer.stop()
-        self._pose_timer.stop()
+        # Stop whatever the previous mode had scheduled
+        self._leave_mode()
         self.movement.stop_moving()
         
-        # Stop any interactive actions
-        self._float_timer.stop()
-        self._action_timer.stop()
-        
         # Set mode and reset state
         self.current_mode = "interactive"
+        self.character.preload(MODE_ANIMATIONS["interactive"], PRIORITY_MODE)
         self._interactive_state = "idle"
         self._hide_bubble()
         
         # Return to idle at current position
-        self.character.set_animation("idle")
+        self._play("idle")
         
         print("[interactive] Ready for interactions! Right-click to choose action.")
     
@@ -345,8 +457,8 @@ class ModeManager:
         print("[interactive] *SLAP!* 👋")
         
         # Stop any ongoing actions
-        self._float_timer.stop()
-        self._action_timer.stop()
+        self._cancel("float")
+        self._cancel("action")
         
         # Check if currently floating OR if we were floating before a previous action
         # This handles rapid slapping while floating
@@ -357,15 +469,14 @@ class ModeManager:
         
         # Show slap reaction (different animation if floating)
         if was_floating:
-            self.character.set_animation("float_slap_reaction")
+            self._play("float_slap_reaction")
             self.window.show_speech_bubble("OW! 😵 (still floating!)")
         else:
-            self.character.set_animation("slap_reaction")
+            self._play("slap_reaction")
             self.window.show_speech_bubble("OW! 😵 Why?!")
         
         # Return to previous state after animation
-        self._action_timer.setSingleShot(True)
-        self._action_timer.start(config.SLAP_REACTION_DURATION_MS)
+        self._after("action", config.SLAP_REACTION_DURATION_MS)
         
         # Remember if we were floating before
         self._was_floating_before_action = was_floating
@@ -378,8 +489,8 @@ class ModeManager:
         print("[interactive] Floating! 🎈")
         
         # Stop any ongoing actions
-        self._float_timer.stop()
-        self._action_timer.stop()
+        self._cancel("float")
+        self._cancel("action")
         
         self._interactive_state = "floating"
         self._float_phase = "active"
@@ -391,11 +502,10 @@ class ModeManager:
         self.window.hide_speech_bubble()
         
         # Show floating animation
-        self.character.set_animation("float_active")
+        self._play("float_active")
         
         # After a while, switch to calm floating
-        self._float_timer.setSingleShot(True)
-        self._float_timer.start(config.FLOAT_ACTIVE_DURATION_MS)
+        self._after("float", config.FLOAT_ACTIVE_DURATION_MS)
     
     def trigger_unfloat(self):
         """User clicked 'Unfloat' - release from floating, return to idle."""
@@ -405,21 +515,20 @@ class ModeManager:
         print("[interactive] Back to ground! 😮‍💨")
         
         # Stop floating
-        self._float_timer.stop()
+        self._cancel("float")
         self._interactive_state = "idle"
         
         # Clear the floating flag so future actions know we're not floating anymore
         self._was_floating_before_action = False
         
         # Return to idle animation
-        self.character.set_animation("idle")
+        self._play("idle")
         
         # Show relief message
         self.window.show_speech_bubble("Finally! 😅")
         
         # Hide bubble after a moment
-        self._action_timer.setSingleShot(True)
-        self._action_timer.start(2000)
+        self._after("action", 2000)
     
     def _on_float_toggle(self):
         """Toggle between active and calm floating."""
@@ -428,19 +537,17 @@ class ModeManager:
         
         if self._float_phase == "active":
             self._float_phase = "calm"
-            self.character.set_animation("float_calm")
+            self._play("float_calm")
             print("[interactive] Now floating calmly... 😌")
             
             # Alternate back to active after a while
-            self._float_timer.setSingleShot(True)
-            self._float_timer.start(config.FLOAT_CALM_DURATION_MS)
+            self._after("float", config.FLOAT_CALM_DURATION_MS)
         else:
             self._float_phase = "active"
-            self.character.set_animation("float_active")
+            self._play("float_active")
             print("[interactive] Floating actively again! ✨")
             
-            self._float_timer.setSingleShot(True)
-            self._float_timer.start(config.FLOAT_ACTIVE_DURATION_MS)
+            self._after("float", config.FLOAT_ACTIVE_DURATION_MS)
     
     def trigger_feed(self):
         """User clicked 'Feed' - eating animation."""
@@ -450,8 +557,8 @@ class ModeManager:
         print("[interactive] *nom nom nom* 🍪")
         
         # Stop any ongoing actions
-        self._float_timer.stop()
-        self._action_timer.stop()
+        self._cancel("float")
+        self._cancel("action")
         
         # Check if currently floating OR if we were floating before a previous action
         was_floating = (self._interactive_state == "floating" or 
@@ -461,15 +568,14 @@ class ModeManager:
         
         # Show eating animation (different if floating)
         if was_floating:
-            self.character.set_animation("float_eating")
+            self._play("float_eating")
             self.window.show_speech_bubble("Yum! 😋 (still floating!)")
         else:
-            self.character.set_animation("eating")
+            self._play("eating")
             self.window.show_speech_bubble("Yum! 😋")
         
         # After eating, show satisfied
-        self._action_timer.setSingleShot(True)
-        self._action_timer.start(config.EATING_DURATION_MS)
+        self._after("action", config.EATING_DURATION_MS)
         
         # Remember if we were floating before
         self._was_floating_before_action = was_floating
@@ -482,8 +588,8 @@ class ModeManager:
         print("[interactive] *pat pat* 💕")
         
         # Stop any ongoing actions
-        self._float_timer.stop()
-        self._action_timer.stop()
+        self._cancel("float")
+        self._cancel("action")
         
         # Check if currently floating OR if we were floating before a previous action
         was_floating = (self._interactive_state == "floating" or 
@@ -493,15 +599,14 @@ class ModeManager:
         
         # Show happy petting animation (different if floating)
         if was_floating:
-            self.character.set_animation("float_petting_happy")
+            self._play("float_petting_happy")
             self.window.show_speech_bubble("Hehe~ 💖 (still floating!)")
         else:
-            self.character.set_animation("petting_happy")
+            self._play("petting_happy")
             self.window.show_speech_bubble("Hehe~ 💖")
         
         # Return to previous state after animation
-        self._action_timer.setSingleShot(True)
-        self._action_timer.start(config.PETTING_DURATION_MS)
+        self._after("action", config.PETTING_DURATION_MS)
         
         # Remember if we were floating before
         self._was_floating_before_action = was_floating
@@ -515,16 +620,15 @@ class ModeManager:
                 self._interactive_state = "floating"
                 self._float_phase = "calm"
                 self.window.hide_speech_bubble()
-                self.character.set_animation("float_calm")
+                self._play("float_calm")
                 print("[interactive] Recovered from slap, back to floating")
                 # Resume float alternation
-                self._float_timer.setSingleShot(True)
-                self._float_timer.start(config.FLOAT_CALM_DURATION_MS)
+                self._after("float", config.FLOAT_CALM_DURATION_MS)
             else:
                 # Return to idle
                 self._interactive_state = "idle"
                 self.window.hide_speech_bubble()
-                self.character.set_animation("idle")
+                self._play("idle")
                 print("[interactive] Recovered from slap, back to idle")
         
         elif self._interactive_state == "eating":
@@ -533,15 +637,14 @@ class ModeManager:
             
             # Use float version if was floating
             if hasattr(self, '_was_floating_before_action') and self._was_floating_before_action:
-                self.character.set_animation("float_eating_satisfied")
+                self._play("float_eating_satisfied")
                 self.window.show_speech_bubble("So good! 😊 (still floating!)")
             else:
-                self.character.set_animation("eating_satisfied")
+                self._play("eating_satisfied")
                 self.window.show_speech_bubble("So good! 😊")
             
             # After showing satisfaction, return to previous state
-            self._action_timer.setSingleShot(True)
-            self._action_timer.start(config.SATISFIED_DURATION_MS)
+            self._after("action", config.SATISFIED_DURATION_MS)
         
         elif self._interactive_state == "satisfied":
             # Satisfied done, return to previous state
@@ -550,16 +653,15 @@ class ModeManager:
                 self._interactive_state = "floating"
                 self._float_phase = "calm"
                 self.window.hide_speech_bubble()
-                self.character.set_animation("float_calm")
+                self._play("float_calm")
                 print("[interactive] Full and happy, back to floating")
                 # Resume float alternation
-                self._float_timer.setSingleShot(True)
-                self._float_timer.start(config.FLOAT_CALM_DURATION_MS)
+                self._after("float", config.FLOAT_CALM_DURATION_MS)
             else:
                 # Return to idle
                 self._interactive_state = "idle"
                 self.window.hide_speech_bubble()
-                self.character.set_animation("idle")
+                self._play("idle")
                 print("[interactive] Full and happy, back to idle")
         
         elif self._interactive_state == "petting":
@@ -569,16 +671,15 @@ class ModeManager:
                 self._interactive_state = "floating"
                 self._float_phase = "calm"
                 self.window.hide_speech_bubble()
-                self.character.set_animation("float_calm")
+                self._play("float_calm")
                 print("[interactive] That felt nice! Back to floating")
                 # Resume float alternation
-                self._float_timer.setSingleShot(True)
-                self._float_timer.start(config.FLOAT_CALM_DURATION_MS)
+                self._after("float", config.FLOAT_CALM_DURATION_MS)
             else:
                 # Return to idle
                 self._interactive_state = "idle"
                 self.window.hide_speech_bubble()
-                self.character.set_animation("idle")
+                self._play("idle")
                 print("[interactive] That felt nice! Back to idle")
         
         elif self._interactive_state == "idle":
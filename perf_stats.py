@@ -0,0 +1,172 @@
+# perf_stats.py
+# ---------------------------------------------------------------------------
+# Small counters for keeping an eye on timing.
+#
+# Nothing here prints on its own — call summary() (or read the attributes)
+# wherever you want to look at the numbers.
+# ---------------------------------------------------------------------------
+
+import time
+from collections import Counter, deque
+
+
+class JitterStats:
+    """
+    Tracks how late timer callbacks fire compared to their deadline.
+    Keeps running totals plus the last `window` samples for percentiles.
+    """
+
+    def __init__(self, window: int = 256):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._recent = deque(maxlen=window)
+
+    def record(self, late_ms: float):
+        """Record one wakeup that fired late_ms after its deadline (negative = early)."""
+        self.count += 1
+        self.total_ms += abs(late_ms)
+        self.max_ms = max(self.max_ms, abs(late_ms))
+        self._recent.append(abs(late_ms))
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """p-th percentile (0-100) of the recent samples."""
+        if not self._recent:
+            return 0.0
+        ordered = sorted(self._recent)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    def summary(self) -> str:
+        return (f"{self.count} wakeups, jitter mean {self.mean_ms:.1f}ms, "
+                f"p95 {self.percentile(95):.1f}ms, max {self.max_ms:.1f}ms")
+
+
+class QueryStats(JitterStats):
+    """
+    How long app monitor queries take (ms), so slow backends stand out.
+    Also counts queries that blew their deadline, and how many of those
+    answered eventually ("late") rather than staying hung.
+    """
+
+    def __init__(self, window: int = 256):
+        super().__init__(window)
+        self.timeouts = 0
+        self.late = 0
+
+    def summary(self) -> str:
+        return (f"{self.count} queries, mean {self.mean_ms:.1f}ms, p95 {self.percentile(95):.1f}ms, "
+                f"max {self.max_ms:.1f}ms, {self.timeouts} timed out ({self.late} answered late)")
+
+
+class PrefetchStats:
+    """
+    Tracks whether animation switches found their frames already loaded.
+    A "warm" switch showed every frame immediately; a "cold" one had to wait
+    for the loader. "predicted" switches went to an animation that had been
+    prefetched beforehand.
+    """
+
+    def __init__(self):
+        self.prefetches = 0     # animations handed to prefetch()
+        self.switches = 0
+        self.warm = 0
+        self.cold = 0
+        self.predicted = 0
+
+    def record_switch(self, warm: bool, predicted: bool):
+        self.switches += 1
+        if warm:
+            self.warm += 1
+        else:
+            self.cold += 1
+        if predicted:
+            self.predicted += 1
+
+    @property
+    def hit_rate(self) -> float:
+        return self.warm / self.switches if self.switches else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.switches} switches, {self.hit_rate:.0%} warm "
+                f"({self.cold} cold), {self.predicted} predicted by {self.prefetches} prefetches")
+
+
+class RepaintStats:
+    """
+    Tracks how many pixels the window repaints, as a rate over the last second.
+    Fed from paintEvent with the area of each repainted region.
+    """
+
+    def __init__(self, window_s: float = 1.0):
+        self.paints = 0
+        self.total_pixels = 0
+        self._window_s = window_s
+        self._recent = deque()      # (time, pixels) within the last window_s
+
+    def record(self, pixels: int):
+        now = time.monotonic()
+        self.paints += 1
+        self.total_pixels += pixels
+        self._recent.append((now, pixels))
+        self._trim(now)
+
+    def _trim(self, now: float):
+        while self._recent and now - self._recent[0][0] > self._window_s:
+            self._recent.popleft()
+
+    @property
+    def pixels_per_second(self) -> float:
+        self._trim(time.monotonic())
+        return sum(pixels for _, pixels in self._recent) / self._window_s
+
+    def summary(self) -> str:
+        return (f"{self.paints} paints, {self.total_pixels} px total, "
+                f"{self.pixels_per_second:,.0f} px/s now")
+
+
+class WakeupCounter:
+    """
+    Counts timer wakeups, per source (e.g. "movement", "check") and as a rate
+    over the last `window_ms`. `clock` is anything with now_ms() — pass a
+    VirtualClock to count simulated time; defaults to the real monotonic clock.
+    """
+
+    def __init__(self, clock=None, window_ms: float = 60_000):
+        self._now_ms = clock.now_ms if clock is not None else (lambda: time.monotonic() * 1000)
+        self._window_ms = window_ms
+        self.started_ms = self._now_ms()
+        self.total = 0
+        self.by_source = Counter()
+        self._recent = deque()      # wakeup times within the last window_ms
+
+    def record(self, source: str):
+        now = self._now_ms()
+        self.total += 1
+        self.by_source[source] += 1
+        self._recent.append(now)
+        self._trim(now)
+
+    def _trim(self, now: float):
+        while self._recent and now - self._recent[0] > self._window_ms:
+            self._recent.popleft()
+
+    def per_minute(self) -> float:
+        """Wakeups per minute over the last window (or since start, if that's shorter)."""
+        now = self._now_ms()
+        self._trim(now)
+        span = min(self._window_ms, now - self.started_ms)
+        return len(self._recent) * 60_000 / span if span > 0 else 0.0
+
+    def average_per_minute(self) -> float:
+        """Wakeups per minute since the counter started."""
+        elapsed = self._now_ms() - self.started_ms
+        return self.total * 60_000 / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        sources = ", ".join(f"{name} {count}" for name, count in self.by_source.most_common())
+        return (f"{self.per_minute():.1f} wakeups/min now, {self.average_per_minute():.1f} average "
+                f"({self.total} total: {sources})")
@@ -0,0 +1,181 @@
+# process_identity.py
+# ---------------------------------------------------------------------------
+# Which program owns a window: PID → executable name, cached.
+#
+# Looking a process up (readlink on /proc/<pid>/exe, or psutil on Windows
+# and Mac) is far more work than a poll should do, so ProcessResolver keeps
+# the answer per PID in a bounded LRU. Each entry is stamped with the
+# process's start time, and every lookup re-reads just that (one small
+# file on Linux): a process that exited is dropped, and a PID reused by a
+# new process is looked up afresh. So the full lookup runs once per process,
+# not once per poll.
+#
+# On Linux everything is read from a proc root (default /proc), which can
+# point at a fake tree — run this file for a self-test that does that.
+# ---------------------------------------------------------------------------
+
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+import config
+
+
+class ProcessInfo(NamedTuple):
+    pid: int
+    name: str   # normalized executable name (see normalize_process_name) — what rules match
+    path: str   # full path of the executable ("" if it couldn't be read)
+
+
+def normalize_process_name(name: str) -> str:
+    """ "C:\\Program Files\\Microsoft VS Code\\Code.exe" → "code"; bundle ids are just casefolded."""
+    name = re.split(r"[\\/]", name.strip())[-1].casefold()
+    return name[:-4] if name.endswith(".exe") else name
+
+
+class ProcessResolver:
+    """PID → ProcessInfo, cached per process. Safe to use from several threads."""
+
+    def __init__(self, proc_root: str = None, max_entries: int = None):
+        """proc_root: read processes from this /proc-style tree (Linux, or tests) instead of psutil."""
+        if proc_root is None and sys.platform.startswith("linux") and os.path.isdir("/proc"):
+            proc_root = "/proc"
+        self.proc_root = proc_root
+        self.max_entries = config.PROCESS_CACHE_SIZE if max_entries is None else max_entries
+        self._cache = OrderedDict()   # pid -> (start time, ProcessInfo), least recently used first
+        self._lock = threading.Lock()
+
+        # --- Stats ---
+        self.hits = 0
+        self.lookups = 0          # full (expensive) lookups
+        self.invalidated = 0      # entries dropped because the process exited or the PID was reused
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+    def resolve(self, pid: int) -> ProcessInfo | None:
+        """The process with this PID, or None if it isn't running (or can't be read)."""
+        if not pid or pid < 0:
+            return None
+
+        started = self._start_time(pid)
+        with self._lock:
+            entry = self._cache.get(pid)
+            if entry is not None:
+                if started is not None and entry[0] == started:
+                    self._cache.move_to_end(pid)
+                    self.hits += 1
+                    return entry[1]
+                del self._cache[pid]   # exited, or a new process got the PID
+                self.invalidated += 1
+        if started is None:
+            return None
+
+        info = self._lookup(pid)
+        with self._lock:
+            self.lookups += 1
+            if info is not None:
+                self._cache[pid] = (started, info)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return info
+
+    def summary(self) -> str:
+        return (f"{len(self._cache)} cached, {self.hits} hits, {self.lookups} lookups, "
+                f"{self.invalidated} invalidated")
+
+    # ------------------------------------------------------------------
+    # Internal — the cheap check and the expensive lookup
+    # ------------------------------------------------------------------
+    def _start_time(self, pid: int):
+        """When the process started (any comparable value), or None if it isn't running."""
+        if self.proc_root is not None:
+            try:
+                with open(os.path.join(self.proc_root, str(pid), "stat"), "rb") as f:
+                    stat = f.read()
+                # Field 22 (starttime); the command name (field 2) may contain spaces and ')'
+                return int(stat[stat.rindex(b")") + 2:].split()[19])
+            except (OSError, ValueError, IndexError):
+                return None
+        try:
+            import psutil
+            return psutil.Process(pid).create_time()
+        except Exception:   # psutil missing, NoSuchProcess, AccessDenied
+            return None
+
+    def _lookup(self, pid: int) -> ProcessInfo | None:
+        if self.proc_root is not None:
+            base = os.path.join(self.proc_root, str(pid))
+            try:
+                path = os.readlink(os.path.join(base, "exe")).removesuffix(" (deleted)")
+            except OSError:
+                path = ""   # other users' processes: exe isn't readable, comm is
+            if path:
+                return ProcessInfo(pid, normalize_process_name(path), path)
+            try:
+                with open(os.path.join(base, "comm"), encoding="utf-8", errors="replace") as f:
+                    return ProcessInfo(pid, normalize_process_name(f.read()), "")
+            except OSError:
+                return None
+        try:
+            import psutil
+            process = psutil.Process(pid)
+            try:
+                path = process.exe()
+            except psutil.AccessDenied:
+                path = ""
+            return ProcessInfo(pid, normalize_process_name(path or process.name()), path)
+        except Exception:
+            return None
+
+
+# ---------------------------------------------------------------------------
+# Self-test against a fake /proc (python process_identity.py)
+# ---------------------------------------------------------------------------
+def _self_test():
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as root:
+        def spawn(pid: int, exe: str, started: int, comm: str = None):
+            base = os.path.join(root, str(pid))
+            os.makedirs(base, exist_ok=True)
+            fields = ["S"] + ["0"] * 18 + [str(started)] + ["0"] * 10
+            with open(os.path.join(base, "stat"), "w") as f:
+                f.write(f"{pid} ({comm or 'x'}) " + " ".join(fields))
+            with open(os.path.join(base, "comm"), "w") as f:
+                f.write((comm or os.path.basename(exe)) + "\n")
+            link = os.path.join(base, "exe")
+            if os.path.lexists(link):
+                os.remove(link)
+            if exe:
+                os.symlink(exe, link)
+
+        def kill(pid: int):
+            import shutil
+            shutil.rmtree(os.path.join(root, str(pid)))
+
+        resolver = ProcessResolver(proc_root=root, max_entries=2)
+        spawn(100, "/usr/share/code/code", started=5000, comm="code (a) b")
+        spawn(200, "", started=6000, comm="steam")
+
+        assert resolver.resolve(100) == ProcessInfo(100, "code", "/usr/share/code/code")
+        assert resolver.resolve(100).name == "code" and resolver.lookups == 1 and resolver.hits == 1
+        assert resolver.resolve(200) == ProcessInfo(200, "steam", "")       # exe unreadable → comm
+
+        kill(100)                                                            # exits
+        assert resolver.resolve(100) is None and resolver.invalidated == 1
+        spawn(100, "/usr/bin/firefox", started=7000)                         # PID reused
+        assert resolver.resolve(100).name == "firefox" and resolver.lookups == 3
+
+        spawn(300, "/opt/slack/slack", started=8000)                         # evicts 200 (LRU, max 2)
+        resolver.resolve(300)
+        assert 200 not in resolver._cache and len(resolver._cache) == 2
+        assert normalize_process_name(r"C:\Program Files\Microsoft Office\WINWORD.EXE") == "winword"
+        print(f"[process_identity] Self-test passed ({resolver.summary()}).")
+
+
+if __name__ == "__main__":
+    _self_test()
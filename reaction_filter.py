@@ -0,0 +1,176 @@
+# reaction_filter.py
+# ---------------------------------------------------------------------------
+# Debounce and hysteresis between the app monitor and supervisor mode.
+#
+# Alt-tabbing through windows produces a reaction per window passed, and
+# each one costs an animation switch and a speech bubble nobody reads.
+# ReactionFilter sits between AppMonitorThread.reaction_changed and
+# ModeManager and only lets through reactions that stick:
+#
+#   - Dwell: a new reaction is held for REACTION_DWELL_MS. If another one
+#     arrives first, it replaces the held one ("superseded"); only the one
+#     the user settles on is emitted.
+#   - A→B→A: if the reaction goes back to what's already on screen before
+#     the dwell is up, the held one is dropped and nothing is emitted
+#     ("coalesced") — the pet never flickered away.
+#   - Cooldown: a reaction emitted again within REACTION_COOLDOWN_MS of its
+#     last time still switches the animation, but without the speech bubble
+#     ("muted") — the pet doesn't repeat itself every time you come back.
+#
+# Counters for all of these are in .counts; replay() runs a recorded switch
+# trace through a filter on virtual time, for tuning the two settings.
+# ---------------------------------------------------------------------------
+
+import argparse
+import random
+from collections import Counter
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+import config
+from clock import VirtualClock
+
+
+class ReactionFilter(QObject):
+    """Debounces (animation, speech) reactions. Emits `reaction` for the ones that stick."""
+
+    reaction = pyqtSignal(object)   # (animation_name, speech_text or None)
+
+    def __init__(self, scheduler=None, dwell_ms: float = None, cooldown_ms: float = None):
+        super().__init__()
+        from scheduler import get_scheduler
+
+        self.scheduler = scheduler or get_scheduler()
+        self.clock = self.scheduler.clock
+        self.dwell_ms = config.REACTION_DWELL_MS if dwell_ms is None else dwell_ms
+        self.cooldown_ms = config.REACTION_COOLDOWN_MS if cooldown_ms is None else cooldown_ms
+
+        self._shown = None          # last reaction emitted
+        self._held = None           # reaction waiting out its dwell
+        self._last_spoken = {}      # reaction -> clock ms its speech was last shown
+        self.counts = Counter()     # submitted, emitted, superseded, coalesced, muted
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+    def submit(self, reaction: tuple):
+        """A new reaction from the monitor."""
+        self.counts["submitted"] += 1
+        if reaction == self._held:
+            return   # already waiting on this one — keep its dwell going
+        if self._held is not None:
+            if reaction == self._shown:
+                # A→B→A inside the dwell: B never showed, and A still is
+                self.counts["coalesced"] += 1
+                self._drop_held()
+                return
+            self.counts["superseded"] += 1
+        elif reaction == self._shown:
+            return
+
+        self._held = reaction
+        if self.dwell_ms <= 0:
+            self._release()
+        else:
+            self.scheduler.schedule("dwell", self.dwell_ms, self._release, owner=self)
+
+    def reset(self):
+        """Forget what's on screen and drop anything held (e.g. leaving supervisor mode)."""
+        self._drop_held()
+        self._shown = None
+
+    def summary(self) -> str:
+        c = self.counts
+        return (f"{c['submitted']} submitted → {c['emitted']} emitted "
+                f"({c['superseded']} superseded, {c['coalesced']} coalesced A→B→A, "
+                f"{c['muted']} bubbles muted by cooldown)")
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+    def _drop_held(self):
+        self._held = None
+        self.scheduler.cancel("dwell", owner=self)
+
+    def _release(self):
+        """The held reaction outlasted its dwell: show it."""
+        reaction, self._held = self._held, None
+        self.scheduler.cancel("dwell", owner=self)
+        if reaction is None:
+            return
+
+        animation, speech = reaction
+        if speech:
+            now = self.clock.now_ms()
+            last = self._last_spoken.get(reaction)
+            if last is not None and now - last < self.cooldown_ms:
+                self.counts["muted"] += 1
+                speech = None
+            else:
+                self._last_spoken[reaction] = now
+
+        self._shown = reaction
+        self.counts["emitted"] += 1
+        self.reaction.emit((animation, speech))
+
+
+# ---------------------------------------------------------------------------
+# Tuning against switch traces
+# ---------------------------------------------------------------------------
+def replay(trace, dwell_ms: float = None, cooldown_ms: float = None) -> ReactionFilter:
+    """
+    Run a trace of (t_ms, reaction) — what the monitor reported, and when —
+    through a filter on virtual time. Returns the filter; read .counts.
+    """
+    from scheduler import Scheduler
+
+    clock = VirtualClock()
+    scheduler = Scheduler(clock=clock, use_timer=False)
+    filt = ReactionFilter(scheduler, dwell_ms, cooldown_ms)
+
+    def run_until(t_ms: float):
+        while (due := scheduler.next_due_ms()) is not None and due <= t_ms:
+            clock.advance_to(due)
+            scheduler.run_due()
+        clock.advance_to(t_ms)
+
+    for t_ms, reaction in sorted(trace, key=lambda event: event[0]):
+        run_until(t_ms)
+        filt.submit(reaction)
+    run_until(clock.now_ms() + filt.dwell_ms + 1)
+    return filt
+
+
+def _synthetic_trace(minutes: float, seed: int) -> list:
+    """Work sessions with bursts of alt-tabbing: mostly long stays, sometimes 0.2-1.5 s hops."""
+    rng = random.Random(seed)
+    reactions = list(dict.fromkeys((animation, speech) for _, animation, speech in config.APP_REACTIONS))[:12]
+    trace, t, current = [], 0.0, reactions[0]
+    while t < minutes * 60_000:
+        if rng.random() < 0.3:
+            for _ in range(rng.randint(2, 6)):       # an alt-tab burst
+                t += rng.uniform(200, 1500)
+                current = rng.choice(reactions)
+                trace.append((t, current))
+        else:
+            t += rng.uniform(5_000, 120_000)         # a real switch after a while
+            current = rng.choice(reactions)
+            trace.append((t, current))
+    return trace
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a synthetic switch trace through ReactionFilter.")
+    parser.add_argument("--minutes", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dwell", type=float, nargs="+", default=[0, 500, 1000, 2000])
+    args = parser.parse_args()
+
+    trace = _synthetic_trace(args.minutes, args.seed)
+    print(f"{len(trace)} switches over {args.minutes:g} min, cooldown {config.REACTION_COOLDOWN_MS} ms")
+    for dwell in args.dwell:
+        print(f"  dwell {dwell:>6g} ms: {replay(trace, dwell_ms=dwell).summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+# reaction_matcher.py
+# ---------------------------------------------------------------------------
+# Matches window titles against config.APP_REACTIONS.
+#
+# The rule table is compiled once into an Aho–Corasick automaton over the
+# keywords: a trie of every keyword plus "failure" links, so one left-to-
+# right pass over the title finds every keyword it contains, however many
+# rules there are. Each state remembers the lowest rule index of any keyword
+# ending there (directly or via its failure chain), so "first rule in the
+# list wins" is just the minimum seen during the pass.
+#
+# Keywords and titles are both NFKC-normalized and casefolded, so "ＹｏｕＴｕｂｅ"
+# matches "youtube" and "STRASSE" matches "straße".
+#
+# KeywordAutomaton is the automaton itself, over keywords tagged with any
+# ints; reaction_rules.py also uses it to prefilter regex rules.
+#
+# Benchmark against the old linear scan:
+#   python reaction_matcher.py
+# ---------------------------------------------------------------------------
+
+import random
+import time
+import unicodedata
+from collections import deque
+
+
+def fold(text: str) -> str:
+    """Normalize text for matching: NFKC (full-width → ASCII, ligatures split), then casefold."""
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+class KeywordAutomaton:
+    """
+    Aho–Corasick over (keyword, tag) pairs, tags being ints such as rule indices.
+    first() finds the smallest tag of any keyword in a text; with collect_all,
+    every_tag() finds them all (for prefiltering, where every hit matters).
+    """
+
+    def __init__(self, keywords, collect_all: bool = False):
+        keywords = list(keywords)
+        self._none = max((tag for _, tag in keywords), default=-1) + 1   # "no match" — above every tag
+        self._floor = min((tag for _, tag in keywords), default=0)       # nothing can beat this one
+
+        # --- The automaton: state 0 is the root ---
+        self._goto = [{}]                  # state -> {char: next state}
+        self._fail = [0]                   # state -> longest proper suffix state
+        self._out = [self._none]           # state -> lowest tag matched on reaching it
+        self._all = [()] if collect_all else None   # state -> every tag matched on reaching it
+
+        for keyword, tag in keywords:
+            state = 0
+            for ch in fold(keyword):
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(self._none)
+                    if collect_all:
+                        self._all.append(())
+                state = next_state
+            self._out[state] = min(self._out[state], tag)   # duplicate keywords: smallest tag
+            if collect_all:
+                self._all[state] += (tag,)
+
+        # Failure links, breadth first, folding each state's output into its failure chain's
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(ch, 0)
+                self._out[child] = min(self._out[child], self._out[self._fail[child]])
+                if collect_all:
+                    self._all[child] += self._all[self._fail[child]]
+                queue.append(child)
+
+    def first(self, folded: str) -> int | None:
+        """Smallest tag of any keyword in folded (already fold()ed) text, or None."""
+        goto, fail, out = self._goto, self._fail, self._out
+        best = out[0]   # an empty keyword matches everything
+        state = 0
+        for ch in folded:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state] < best:
+                best = out[state]
+                if best == self._floor:
+                    break   # nothing can beat the first rule
+        return best if best < self._none else None
+
+    def every_tag(self, folded: str) -> set:
+        """Tags of every keyword in folded text (needs collect_all)."""
+        goto, fail, outputs = self._goto, self._fail, self._all
+        found = set(outputs[0])
+        state = 0
+        for ch in folded:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+    @property
+    def state_count(self) -> int:
+        return len(self._goto)
+
+
+class ReactionMatcher:
+    """APP_REACTIONS-style rules ((keyword, animation, speech), ...) compiled for single-pass matching."""
+
+    def __init__(self, rules):
+        self.rules = tuple(rules)
+        self._automaton = KeywordAutomaton((keyword, index) for index, (keyword, _, _) in enumerate(self.rules))
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+    def first_match(self, title: str) -> int | None:
+        """Index of the first rule whose keyword appears in title, or None."""
+        return self._automaton.first(fold(title))
+
+    def match(self, title: str) -> tuple | None:
+        """(animation_name, speech_text) of the first matching rule, or None."""
+        index = self.first_match(title)
+        if index is None:
+            return None
+        _, animation, speech = self.rules[index]
+        return (animation, speech)
+
+    @property
+    def state_count(self) -> int:
+        return self._automaton.state_count
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+def _linear_match(rules, title: str) -> tuple | None:
+    """The matcher this replaced: lowercase, then test every keyword in order."""
+    title_lower = title.lower()
+    for keyword, animation, speech in rules:
+        if keyword.lower() in title_lower:
+            return (animation, speech)
+    return None
+
+
+def _synthetic_rules(count: int, rng: random.Random) -> list:
+    """config.APP_REACTIONS padded with made-up internal app names, up to count rules."""
+    import config
+
+    rules = list(config.APP_REACTIONS)[:count]
+    while len(rules) < count:
+        name = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(5, 12)))
+        rules.append((f"{name}-{len(rules)}", "working_hard", f"Back to {name}!"))
+    return rules
+
+
+def benchmark(counts=(80, 1000, 10000), titles: int = 2000, seed: int = 0):
+    """Print µs per title for the linear scan vs. the automaton at each rule count."""
+    rng = random.Random(seed)
+    words = ["Untitled", "Document", "Inbox", "Project", "Report", "Meeting notes", "Dashboard", "Q3 plan"]
+    print(f"µs per title ({titles} titles, ~half matching a rule somewhere in the list):")
+    print(f"  {'rules':>6}  {'linear':>10}  {'automaton':>10}  {'speedup':>8}  {'compile':>9}")
+    for count in counts:
+        rules = _synthetic_rules(count, rng)
+        sample = []
+        for _ in range(titles):
+            title = " — ".join(rng.sample(words, 3))
+            if rng.random() < 0.5:
+                title += " - " + rng.choice(rules)[0].upper()
+            sample.append(title)
+
+        started = time.perf_counter()
+        matcher = ReactionMatcher(rules)
+        compile_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        expected = [_linear_match(rules, title) for title in sample]
+        linear_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        got = [matcher.match(title) for title in sample]
+        automaton_s = time.perf_counter() - started
+
+        assert got == expected, "automaton disagrees with the linear scan"
+        print(f"  {count:>6}  {linear_s / titles * 1e6:>8.1f}µs  {automaton_s / titles * 1e6:>8.1f}µs  "
+              f"{linear_s / automaton_s:>7.1f}x  {compile_s * 1000:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,463 @@
+# reaction_rules.py
+# ---------------------------------------------------------------------------
+# The reaction table: config defaults plus an optional user rules file.
+#
+# A RuleSet is the compiled, read-only form of a list of rules:
+#   - process rules: exact executable name / bundle id → a dict lookup.
+#   - keyword rules: substring of the window title → one Aho–Corasick pass
+#     (reaction_matcher.KeywordAutomaton), however many there are.
+#   - app rules: keyword rules naming a program ("word", "steam"), only used
+#     when the foreground program couldn't be identified, or when the "title"
+#     is the app's own name (Mac). When a real window title comes with a known
+#     program, the process rules know it exactly, and a title that merely
+#     contains the name ("password") mustn't match. They get an automaton
+#     without them.
+#   - regex rules: searched against the title as is, case-insensitively. Most
+#     regexes contain a literal run they can't match without ("jira" in
+#     r"jira.*\d+"); those are prefiltered by a second automaton and only the
+#     ones whose literal is in the title are run (for "(a|b)..." it's one
+#     literal per alternative). Regexes with no such literal (only character
+#     classes, say) are run on every title.
+# Process rules are checked first; title rules (keyword, app and regex) keep their
+# order in the file, and the first match wins — a regex is only tried when it
+# comes before the best keyword hit.
+#
+# ReactionRulesWatcher follows the rules file (REACTION_RULES_FILE, JSON or
+# TOML) with a QFileSystemWatcher. On a change it waits for writes to settle,
+# then parses, validates and compiles the file on a QThreadPool worker and
+# hands the finished RuleSet to the GUI thread, where the app monitor swaps it
+# in with one assignment. A file with any error is rejected whole and the
+# rules already running stay; deleting the file goes back to the defaults.
+#
+# File format (JSON shown; TOML is the same with [[rules]] tables):
+#   {
+#     "include_defaults": true,
+#     "rules": [
+#       {"process": "blender",          "animation": "proud",   "speech": "3D art! 🎨"},
+#       {"keyword": "jira",             "animation": "judging", "speech": "Ticket time..."},
+#       {"app":     "krita",            "animation": "proud"},
+#       {"regex":   "PR #\\d+ .* review", "animation": "proud"}
+#     ]
+#   }
+# A bare JSON list is taken as "rules". include_defaults (default true) appends
+# the config tables after the file's rules, so the file's rules win.
+#
+# Check a rules file without running the pet:
+#   python reaction_rules.py path/to/reactions.json
+# ---------------------------------------------------------------------------
+
+import itertools
+import json
+import os
+import re
+import sys
+import time
+import tomllib
+from typing import NamedTuple
+
+from PyQt6.QtCore import QFileSystemWatcher, QObject, QRunnable, QThreadPool, pyqtSignal
+
+import config
+from process_identity import normalize_process_name
+from reaction_matcher import KeywordAutomaton, fold
+
+RULE_KINDS = ("process", "keyword", "app", "regex")
+
+
+class Rule(NamedTuple):
+    kind: str            # "process", "keyword", "app" or "regex"
+    pattern: str
+    animation: str
+    speech: str | None
+
+
+class RulesFileError(ValueError):
+    """A rules file that can't be used. .problems lists everything wrong with it."""
+
+    def __init__(self, path: str, problems: list):
+        self.path = path
+        self.problems = problems
+        super().__init__(f"{path}: " + "; ".join(problems))
+
+
+# Regex prefilter: literals are matched in the title lowercased, with the few
+# non-ASCII characters that IGNORECASE counts as ASCII letters mapped to them
+# (dotted/dotless i, long s, the Kelvin sign) — so an ASCII literal a regex
+# needs is always found there if the regex can match.
+_ASCII_LOOKALIKES = str.maketrans({"\u0130": "i", "\u0131": "i", "\u017f": "s", "\u212a": "k"})
+_QUANTIFIER = re.compile(r"(?:[*+?]|\{\d*,?\d*\})[?+]?")
+_ESCAPE = re.compile(r"\\(?:x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|N\{[^}]*\}|[0-7]{1,3}|\d{1,2}|.)", re.S)
+_CHAR_CLASS = re.compile(r"\[\^?\]?(?:\\.|[^\]\\])*\]", re.S)
+_GROUP = re.compile(r"\((?:\?(?:[aiLmsu]*(?:-[ims]+)?:|P<\w+>|(?P<lookaround>=|!|<=|<!)))?")
+_SKIPPED_GROUP = re.compile(r"\(\?(?:#[^)]*|[aiLmsu]+|P=\w+)\)")
+
+
+class _NoLiteral(Exception):
+    """The pattern uses something the literal scan doesn't follow."""
+
+
+def _prefilter_text(title: str) -> str:
+    return title.translate(_ASCII_LOOKALIKES).lower()
+
+
+def _required_literals(pattern: str) -> list | None:
+    """
+    Lowercase ASCII literals such that every match of pattern contains at
+    least one: the longest plain run ("jira" in r"jira-\d+"), or one per
+    alternative of a group ("(netflix|hulu) \\d+" → netflix, hulu). None if
+    there's no usable set — runs shorter than 2, or syntax the scan doesn't
+    follow (verbose mode, conditionals), which just leaves the regex unfiltered.
+    """
+    if re.search(r"\(\?[a-zA-Z]*x", pattern):
+        return None   # verbose: whitespace and # aren't literal
+    try:
+        literals, _ = _scan_literals(pattern, 0, nested=False)
+    except _NoLiteral:
+        return None
+    return literals
+
+
+def _scan_literals(pattern: str, i: int, nested: bool) -> tuple:
+    """Scan alternatives from i to the closing ")" (or the end): (literals or None, index of the ")")."""
+    alternatives = [[]]     # per alternative: candidate literal lists, any one of which it needs
+    run = []
+
+    def end_run():
+        if len(run) >= 2:
+            alternatives[-1].append(["".join(run)])
+        run.clear()
+
+    def quantified(at: int) -> int:
+        """Index past a quantifier at `at` (or `at` itself if there's none)."""
+        quantifier = _QUANTIFIER.match(pattern, at)
+        return quantifier.end() if quantifier else at
+
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == ")" and nested:
+            break
+        if ch == "|":
+            end_run()
+            alternatives.append([])
+            i += 1
+        elif ch == "\\" and pattern[i + 1:i + 2].isascii() and pattern[i + 1:i + 2].isalnum():
+            end_run()                                    # \d, \b, \x41, backreferences...
+            i = quantified(_ESCAPE.match(pattern, i).end())
+        elif ch == "[":
+            end_run()
+            i = quantified(_CHAR_CLASS.match(pattern, i).end())
+        elif ch == "(":
+            end_run()
+            skipped = _SKIPPED_GROUP.match(pattern, i)
+            if skipped:                                  # comment, flags, named backreference
+                i = quantified(skipped.end())
+                continue
+            group = _GROUP.match(pattern, i)
+            if pattern.startswith("(?", i) and group.end() == i + 1:
+                raise _NoLiteral(pattern[i:i + 4])       # conditionals, atomic groups, anything newer
+            literals, close = _scan_literals(pattern, group.end(), nested=True)
+            i = quantified(close + 1)
+            if literals is not None and i == close + 1 and not group.group("lookaround"):
+                alternatives[-1].append(literals)
+        elif ch in ".^$*+?{}":
+            end_run()
+            i = quantified(i + 1) if ch == "." else i + 1
+        else:
+            if ch == "\\":                              # escaped punctuation is literal
+                i += 1
+                ch = pattern[i]
+            after = quantified(i + 1)
+            if after != i + 1 or not ch.isascii():
+                end_run()                                # optional/repeated, or not prefilterable
+            else:
+                run.append(ch.lower())
+            i = after
+    end_run()
+
+    chosen = []
+    for candidates in alternatives:
+        if not candidates:
+            return None, i
+        singles = [literals for literals in candidates if len(literals) == 1]
+        chosen += (max(singles, key=lambda literals: len(literals[0])) if singles
+                   else min(candidates, key=len))
+    return chosen, i
+
+
+class RuleSet:
+    """Compiled reaction rules. Immutable once built, so it can be shared across threads."""
+
+    def __init__(self, rules, source: str = "config"):
+        self.rules = tuple(rules)
+        self.source = source
+
+        self._processes = {}
+        title_rules = []
+        for rule in self.rules:
+            if rule.kind == "process":
+                self._processes.setdefault(normalize_process_name(rule.pattern), (rule.animation, rule.speech))
+            else:
+                title_rules.append(rule)
+        self._reactions = [(rule.animation, rule.speech) for rule in title_rules]
+
+        self._keywords = KeywordAutomaton(
+            (rule.pattern, index) for index, rule in enumerate(title_rules) if rule.kind in ("keyword", "app")
+        )
+        self._site_keywords = self._keywords   # for a known program: keyword rules without the app rules
+        if any(rule.kind == "app" for rule in title_rules):
+            self._site_keywords = KeywordAutomaton(
+                (rule.pattern, index) for index, rule in enumerate(title_rules) if rule.kind == "keyword"
+            )
+        self._regexes = {}        # title rule index -> compiled regex
+        literals = []             # (literal, title rule index) — the regex needs one of its literals
+        unfiltered = []           # regexes without one — tried on every title
+        for index, rule in enumerate(title_rules):
+            if rule.kind != "regex":
+                continue
+            self._regexes[index] = re.compile(rule.pattern, re.IGNORECASE)
+            found = _required_literals(rule.pattern)
+            if found is None:
+                unfiltered.append(index)
+            else:
+                literals.extend((literal, index) for literal in found)
+        self._literals = KeywordAutomaton(literals, collect_all=True) if literals else None
+        self._unfiltered = frozenset(unfiltered)
+
+    @classmethod
+    def from_config(cls) -> "RuleSet":
+        return cls(_config_rules())
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+    def match(self, title: str, program: str = None, title_is_app_name: bool = False) -> tuple | None:
+        """
+        (animation_name, speech_text) for the window, or None if no rule matches.
+        title_is_app_name: the title is the program's own name, not a window's
+        (Mac) — app rules apply even though the program is known.
+        """
+        if program:
+            reaction = self._processes.get(program)
+            if reaction is not None:
+                return reaction
+
+        folded = fold(title)
+        keywords = self._site_keywords if program and not title_is_app_name else self._keywords
+        best = keywords.first(folded)
+        if self._regexes:
+            candidates = set(self._unfiltered)
+            if self._literals is not None:
+                candidates.update(self._literals.every_tag(_prefilter_text(title)))
+            for index in sorted(candidates):
+                if best is not None and index > best:
+                    break
+                if self._regexes[index].search(title):
+                    best = index
+                    break
+        return None if best is None else self._reactions[best]
+
+    def summary(self) -> str:
+        counts = {kind: 0 for kind in RULE_KINDS}
+        for rule in self.rules:
+            counts[rule.kind] += 1
+        return (f"{len(self.rules)} rules from {self.source} ({counts['process']} process, "
+                f"{counts['keyword']} keyword, {counts['app']} app, {counts['regex']} regex — "
+                f"{len(self._unfiltered)} regexes without a prefilter literal)")
+
+
+def _config_rules() -> list:
+    """config.APP_PROCESS_REACTIONS, APP_REACTIONS and APP_NAME_REACTIONS as Rules."""
+    return ([Rule("process", program, animation, speech) for program, animation, speech in config.APP_PROCESS_REACTIONS]
+            + [Rule("keyword", keyword, animation, speech) for keyword, animation, speech in config.APP_REACTIONS]
+            + [Rule("app", name, animation, speech) for name, animation, speech in config.APP_NAME_REACTIONS])
+
+
+# ---------------------------------------------------------------------------
+# Rules files
+# ---------------------------------------------------------------------------
+def load_rules_file(path: str) -> RuleSet:
+    """Parse, validate and compile a JSON or TOML rules file. Raises RulesFileError (or OSError)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        if path.lower().endswith(".toml"):
+            document = tomllib.loads(data.decode("utf-8"))
+        else:
+            document = json.loads(data)
+    except (ValueError, UnicodeDecodeError) as error:   # JSONDecodeError and TOMLDecodeError are ValueErrors
+        raise RulesFileError(path, [f"can't parse: {error}"]) from None
+
+    if isinstance(document, list):
+        document = {"rules": document}
+    if not isinstance(document, dict) or not isinstance(document.get("rules"), list):
+        raise RulesFileError(path, ['expected a "rules" list'])
+
+    problems = []
+    include_defaults = document.get("include_defaults", True)
+    if not isinstance(include_defaults, bool):
+        problems.append("include_defaults must be true or false")
+    for key in document.keys() - {"rules", "include_defaults"}:
+        problems.append(f"unknown setting {key!r}")
+
+    rules = []
+    for number, entry in enumerate(document["rules"], start=1):
+        rule = _parse_rule(entry, lambda problem: problems.append(f"rule {number}: {problem}"))
+        if rule is not None:
+            rules.append(rule)
+    if problems:
+        raise RulesFileError(path, problems)
+
+    if include_defaults:
+        rules += _config_rules()
+    return RuleSet(rules, source=os.path.basename(path))
+
+
+def _parse_rule(entry, report) -> Rule | None:
+    """One rules-file entry as a Rule, or None after report()ing what's wrong with it."""
+    if not isinstance(entry, dict):
+        report("expected a table of keyword/regex/process, animation, speech")
+        return None
+    ok = True
+    kinds = [kind for kind in RULE_KINDS if kind in entry]
+    if len(kinds) != 1:
+        report("needs exactly one of " + ", ".join(RULE_KINDS))
+        return None
+    kind = kinds[0]
+    pattern = entry[kind]
+    if not isinstance(pattern, str) or not pattern.strip():
+        report(f"{kind} must be a non-empty string")
+        ok = False
+    elif kind == "regex":
+        try:
+            re.compile(pattern, re.IGNORECASE)
+        except re.error as error:
+            report(f"bad regex {pattern!r}: {error}")
+            ok = False
+
+    animation = entry.get("animation")
+    if animation not in config.ANIMATIONS:
+        report(f"unknown animation {animation!r}")
+        ok = False
+    speech = entry.get("speech")
+    if speech is not None and not isinstance(speech, str):
+        report("speech must be a string")
+        ok = False
+    for key in entry.keys() - {kind, "animation", "speech"}:
+        report(f"unknown field {key!r}")
+        ok = False
+    return Rule(kind, pattern, animation, speech or None) if ok else None
+
+
+def _file_signature(path: str):
+    """(mtime, size), or None if the file isn't there — reload only when this changes."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+# ---------------------------------------------------------------------------
+# Watching the file
+# ---------------------------------------------------------------------------
+class _CompileSignals(QObject):
+    """Lives on the GUI thread; the compile task emits through it so delivery is queued."""
+    # (generation, RuleSet or None, error message or None, ms taken)
+    compiled = pyqtSignal(int, object, object, float)
+
+
+class _CompileTask(QRunnable):
+    """Load and compile the rules file on a QThreadPool worker."""
+
+    def __init__(self, path: str, generation: int, signals: _CompileSignals):
+        super().__init__()
+        self._path = path
+        self._generation = generation
+        self._signals = signals
+
+    def run(self):
+        started = time.perf_counter()
+        try:
+            rules, error = load_rules_file(self._path), None
+        except (RulesFileError, OSError) as problem:
+            rules, error = None, str(problem)
+        self._signals.compiled.emit(self._generation, rules, error, (time.perf_counter() - started) * 1000)
+
+
+class ReactionRulesWatcher(QObject):
+    """
+    Follows a rules file. rules_loaded carries each new RuleSet (on the GUI
+    thread); load_failed carries the reason a change was rejected.
+    """
+
+    rules_loaded = pyqtSignal(object)   # RuleSet
+    load_failed = pyqtSignal(str)
+
+    def __init__(self, path: str = None, scheduler=None, settle_ms: int = None):
+        super().__init__()
+        from scheduler import get_scheduler
+
+        self.path = os.path.abspath(path or config.REACTION_RULES_FILE)
+        self.scheduler = scheduler or get_scheduler()
+        self.settle_ms = config.REACTION_RULES_SETTLE_MS if settle_ms is None else settle_ms
+
+        self._generation = itertools.count(1)
+        self._current = 0             # generation of the newest reload started
+        self._signature = None        # _file_signature() of what's loaded (None: the defaults)
+        self._signals = _CompileSignals()
+        self._signals.compiled.connect(self._on_compiled)
+
+        # The directory is watched too: editors that save by writing a new
+        # file and renaming it over the old one replace the file being watched.
+        # It's created if need be (a fresh install has no settings folder yet),
+        # so a rules file saved there later is still picked up.
+        self._watcher = QFileSystemWatcher(self)
+        directory = os.path.dirname(self.path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            self._watcher.addPath(directory)
+        except OSError as error:
+            print(f"[reaction_rules] Can't watch {directory} ({error}) — rules file changes need a restart.")
+        self._watcher.directoryChanged.connect(self._on_changed)
+        self._watcher.fileChanged.connect(self._on_changed)
+        self._on_changed()
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+    def _on_changed(self, _path: str = None):
+        """Something touched the file (or its folder): reload once writes have settled."""
+        if os.path.isfile(self.path) and self.path not in self._watcher.files():
+            self._watcher.addPath(self.path)
+        self.scheduler.schedule("reload", self.settle_ms, self._reload, owner=self)
+
+    def _reload(self):
+        signature = _file_signature(self.path)
+        if signature == self._signature:
+            return   # the folder changed, not this file
+        self._signature = signature
+        self._current = next(self._generation)
+        if signature is None:
+            print(f"[reaction_rules] {self.path} removed — back to the built-in rules.")
+            self.rules_loaded.emit(RuleSet.from_config())
+            return
+        QThreadPool.globalInstance().start(_CompileTask(self.path, self._current, self._signals))
+
+    def _on_compiled(self, generation: int, rules, error, elapsed_ms: float):
+        if generation != self._current:
+            return   # the file changed again while this one compiled
+        if rules is None:
+            print(f"[reaction_rules] Rules file rejected, keeping the current rules: {error}")
+            self.load_failed.emit(error)
+            return
+        print(f"[reaction_rules] Loaded {rules.summary()} in {elapsed_ms:.0f}ms")
+        self.rules_loaded.emit(rules)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python reaction_rules.py RULES_FILE")
+    try:
+        print(load_rules_file(sys.argv[1]).summary())
+    except (RulesFileError, OSError) as error:
+        sys.exit(str(error))
@@ -0,0 +1,200 @@
+# route.py
+# ---------------------------------------------------------------------------
+# Paths the pet drives along, compiled once for fast lookups.
+#
+# A Route is a polyline (closed loop or open path) plus the cumulative
+# arc length at each vertex. That turns every question movement asks into
+# a binary search and a lerp instead of per-tick vector math:
+#
+#   position_at(d)      where is the point d pixels along the route?
+#   next_stop(d)        the next corner (vertex) after d — legs stop there
+#   direction_at(d)     which way the sprite faces on that stretch
+#   project(p)          the closest point on the route to p (after a drag)
+#
+# project() uses a grid of buckets over the segments, so it only looks at
+# segments near the point rather than all of them.
+#
+# Any path compiles the same way: the screen perimeter (Route.rectangle),
+# an inset loop, a loop per monitor, or a user-drawn list of points.
+# ---------------------------------------------------------------------------
+
+import math
+from bisect import bisect_right
+
+from PyQt6.QtCore import QPointF, QRectF
+
+
+class Route:
+    """A polyline compiled for arc-length (distance along the route) lookups."""
+
+    def __init__(self, points, closed: bool = True, names=None):
+        """
+        points: the vertices, in driving order (QPoint/QPointF or (x, y) tuples).
+        closed: if True the route loops back from the last vertex to the first.
+        names:  optional label per segment (e.g. "BOTTOM"), for log messages.
+        """
+        vertices = [QPointF(*p) if isinstance(p, tuple) else QPointF(p) for p in points]
+        if closed and vertices:
+            vertices.append(QPointF(vertices[0]))
+        if len(vertices) < 2:
+            raise ValueError("a route needs at least two distinct points")
+
+        self.closed = closed
+        self.points = tuple(vertices)
+        self.names = tuple(names) if names else None
+
+        # Cumulative arc length at each vertex — lengths[i] is where segment i starts
+        lengths, total = [0.0], 0.0
+        for a, b in zip(vertices, vertices[1:]):
+            total += math.hypot(b.x() - a.x(), b.y() - a.y())
+            lengths.append(total)
+        self.lengths = tuple(lengths)
+        self.total = total
+
+        # Facing per segment: from the sign of dx; vertical segments keep the
+        # facing of the segment before them (so going up the right edge still faces right).
+        facing = [None] * self.segment_count
+        for i, (a, b) in enumerate(zip(vertices, vertices[1:])):
+            if b.x() != a.x():
+                facing[i] = "right" if b.x() > a.x() else "left"
+        for _ in range(2):  # twice, so a closed loop can wrap its facing around
+            for i in range(self.segment_count):
+                if facing[i] is None and (i > 0 or closed):
+                    facing[i] = facing[i - 1]
+        self._facing = tuple(f or "left" for f in facing)
+
+        self._build_grid()
+
+    @classmethod
+    def rectangle(cls, rect: QRectF, inset: float = 0) -> "Route":
+        """The perimeter of rect (shrunk by inset), starting bottom-left: bottom → right → top → left."""
+        r = QRectF(rect).adjusted(inset, inset, -inset, -inset)
+        return cls(
+            [r.bottomLeft(), r.bottomRight(), r.topRight(), r.topLeft()],
+            closed=True,
+            names=["BOTTOM", "RIGHT", "TOP", "LEFT"],
+        )
+
+    @classmethod
+    def line(cls, start, end) -> "Route":
+        """A single straight segment."""
+        return cls([start, end], closed=False)
+
+    # ------------------------------------------------------------------
+    # Lookups by distance
+    # ------------------------------------------------------------------
+    @property
+    def segment_count(self) -> int:
+        return len(self.points) - 1
+
+    def normalize(self, distance: float) -> float:
+        """Wrap a distance onto a closed route, or clamp it onto an open one."""
+        if self.closed:
+            return distance % self.total if self.total else 0.0
+        return min(max(distance, 0.0), self.total)
+
+    def segment_at(self, distance: float) -> int:
+        """Index of the segment containing the point `distance` along the route."""
+        index = bisect_right(self.lengths, self.normalize(distance)) - 1
+        return min(max(index, 0), self.segment_count - 1)
+
+    def position_at(self, distance: float) -> QPointF:
+        """The point `distance` pixels along the route."""
+        d = self.normalize(distance)
+        i = self.segment_at(d)
+        a, b = self.points[i], self.points[i + 1]
+        span = self.lengths[i + 1] - self.lengths[i]
+        t = (d - self.lengths[i]) / span if span else 0.0
+        return a + (b - a) * t
+
+    def direction_at(self, distance: float) -> str:
+        """Which way the sprite faces at `distance`: "left" or "right"."""
+        return self._facing[self.segment_at(distance)]
+
+    def name_at(self, distance: float) -> str | None:
+        """Label of the segment at `distance`, if the route has names."""
+        return self.names[self.segment_at(distance)] if self.names else None
+
+    def next_stop(self, distance: float) -> float:
+        """
+        Distance of the next vertex strictly after `distance`. On a closed route
+        the result may be past self.total (the first corner of the next lap),
+        so a leg from distance to next_stop always moves forward.
+        """
+        d = self.normalize(distance)
+        lap = distance - d
+        index = bisect_right(self.lengths, d)
+        if index >= len(self.lengths):
+            return lap + (self.lengths[1] + self.total if self.closed else self.total)
+        return lap + self.lengths[index]
+
+    # ------------------------------------------------------------------
+    # Projection — nearest point on the route
+    # ------------------------------------------------------------------
+    def _build_grid(self):
+        """Bucket each segment into the grid cells its bounding box covers."""
+        xs = [p.x() for p in self.points]
+        ys = [p.y() for p in self.points]
+        self._grid_origin = QPointF(min(xs), min(ys))
+        extent = max(max(xs) - min(xs), max(ys) - min(ys), 1.0)
+        self._cell = max(extent / 16, 1.0)   # ~16x16 cells over the route's bounds
+        self._grid = {}
+        for i in range(self.segment_count):
+            a, b = self.points[i], self.points[i + 1]
+            c0, r0 = self._cell_of(QPointF(min(a.x(), b.x()), min(a.y(), b.y())))
+            c1, r1 = self._cell_of(QPointF(max(a.x(), b.x()), max(a.y(), b.y())))
+            for col in range(c0, c1 + 1):
+                for row in range(r0, r1 + 1):
+                    self._grid.setdefault((col, row), []).append(i)
+        self._grid_span = max(max(c for c, _ in self._grid), max(r for _, r in self._grid)) + 1
+
+    def _cell_of(self, point: QPointF) -> tuple:
+        return (int((point.x() - self._grid_origin.x()) // self._cell),
+                int((point.y() - self._grid_origin.y()) // self._cell))
+
+    def _project_on_segment(self, i: int, point: QPointF) -> tuple:
+        """(squared distance, distance along route) of the closest point on segment i."""
+        a, b = self.points[i], self.points[i + 1]
+        ab = b - a
+        span_sq = ab.x() ** 2 + ab.y() ** 2
+        t = 0.0
+        if span_sq:
+            t = ((point.x() - a.x()) * ab.x() + (point.y() - a.y()) * ab.y()) / span_sq
+            t = min(max(t, 0.0), 1.0)
+        closest = a + ab * t
+        dist_sq = (point.x() - closest.x()) ** 2 + (point.y() - closest.y()) ** 2
+        return dist_sq, self.lengths[i] + t * (self.lengths[i + 1] - self.lengths[i])
+
+    def project(self, point) -> tuple:
+        """
+        Closest point on the route to `point`. Returns (distance along route, QPointF).
+        Searches grid cells in growing rings around the point and stops once no
+        unsearched cell can hold anything closer than the best match so far.
+        """
+        point = QPointF(point)
+        col, row = self._cell_of(point)
+        best = None   # (squared distance, route distance)
+        seen = set()
+        ring = 0
+        # Points far outside the grid need enough rings to reach it
+        max_ring = self._grid_span + max(abs(col), abs(row), abs(col - self._grid_span), abs(row - self._grid_span))
+
+        while ring <= max_ring:
+            for c in range(col - ring, col + ring + 1):
+                for r in range(row - ring, row + ring + 1):
+                    if max(abs(c - col), abs(r - row)) != ring:
+                        continue  # only this ring's border cells
+                    for i in self._grid.get((c, r), ()):
+                        if i in seen:
+                            continue
+                        seen.add(i)
+                        candidate = self._project_on_segment(i, point)
+                        if best is None or candidate[0] < best[0]:
+                            best = candidate
+            # Anything in ring k+1 is at least k cells away
+            if best is not None and (ring * self._cell) ** 2 >= best[0]:
+                break
+            ring += 1
+
+        distance = best[1] if best is not None else 0.0
+        return self.normalize(distance), self.position_at(distance)
@@ -0,0 +1,187 @@
+# scheduler.py
+# ---------------------------------------------------------------------------
+# One timer for everything.
+#
+# Instead of every component owning QTimers that each wake the process on
+# their own, jobs are scheduled here: a min-heap of deadlines served by a
+# single precise single-shot QTimer, armed for the earliest one.
+#
+#   - Jobs are named and belong to an owner: scheduling the same (owner, name)
+#     again replaces the old job, and cancel_owner() drops everything an owner
+#     has scheduled in one call (e.g. on a mode switch).
+#   - Deadlines within config.TIMER_COALESCE_MS of each other are served by
+#     one wakeup — the later ones run a few ms early rather than waking the
+#     process again.
+#   - Repeating jobs are rescheduled from their previous deadline, not from
+#     when they ran, so they don't drift.
+#
+# The clock is pluggable, and with use_timer=False nothing is armed at all:
+# the caller advances its own clock to next_due_ms() and calls run_due().
+# That's how simulator.py runs hours of behaviour in milliseconds.
+# ---------------------------------------------------------------------------
+
+import heapq
+import itertools
+import math
+import time
+from collections import Counter
+
+from PyQt6.QtCore import Qt, QTimer
+
+import config
+from clock import get_clock
+from perf_stats import WakeupCounter
+
+
+class Job:
+    """One scheduled callback. Returned by Scheduler.schedule(); pass to cancel_job()."""
+
+    __slots__ = ("name", "owner", "callback", "due_ms", "repeat_ms", "cancelled")
+
+    def __init__(self, name: str, owner, callback, due_ms: float, repeat_ms: float | None):
+        self.name = name
+        self.owner = owner
+        self.callback = callback
+        self.due_ms = due_ms
+        self.repeat_ms = repeat_ms
+        self.cancelled = False
+
+
+class Scheduler:
+    """Named, owner-scoped jobs on a single timer, with nearby deadlines coalesced."""
+
+    def __init__(self, clock=None, coalesce_ms: float = None, use_timer: bool = True):
+        self.clock = clock or get_clock()
+        self.coalesce_ms = config.TIMER_COALESCE_MS if coalesce_ms is None else coalesce_ms
+        self._heap = []                 # (due_ms, seq, job) — cancelled jobs are skipped when popped
+        self._seq = itertools.count()   # tie-break: jobs due together run in scheduling order
+        self._jobs = {}                 # (owner, name) -> live Job
+        self._armed_for = None          # deadline the QTimer is currently armed for
+
+        # --- Stats ---
+        self.wakeups = WakeupCounter(self.clock)   # one per run_due() that ran something
+        self.runs = Counter()                      # job name -> times run
+        self.run_seconds = Counter()               # job name -> wall time spent in its callback
+
+        self._timer = None
+        if use_timer:
+            self._timer = QTimer()
+            self._timer.setSingleShot(True)
+            self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+            self._timer.timeout.connect(self._on_timeout)
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+    def schedule(self, name: str, delay_ms: float, callback, owner=None, repeat_ms: float = None) -> Job:
+        """
+        Run callback in delay_ms (then every repeat_ms, if given).
+        Replaces any job with the same owner and name.
+        """
+        self.cancel(name, owner)
+        job = Job(name, owner, callback, self.clock.now_ms() + max(0.0, delay_ms), repeat_ms)
+        self._jobs[(owner, name)] = job
+        self._push(job)
+        return job
+
+    def every(self, name: str, interval_ms: float, callback, owner=None) -> Job:
+        """Run callback every interval_ms, starting one interval from now."""
+        return self.schedule(name, interval_ms, callback, owner, repeat_ms=interval_ms)
+
+    def cancel(self, name: str, owner=None):
+        job = self._jobs.pop((owner, name), None)
+        if job is not None:
+            job.cancelled = True
+
+    def cancel_job(self, job: Job):
+        if self._jobs.get((job.owner, job.name)) is job:
+            del self._jobs[(job.owner, job.name)]
+        job.cancelled = True
+
+    def cancel_owner(self, owner):
+        """Cancel every job the owner has scheduled."""
+        for key in [key for key in self._jobs if key[0] == owner]:
+            self._jobs.pop(key).cancelled = True
+
+    def is_scheduled(self, name: str, owner=None) -> bool:
+        return (owner, name) in self._jobs
+
+    def next_due_ms(self) -> float | None:
+        """Deadline of the earliest live job, or None if nothing is scheduled."""
+        self._drop_cancelled()
+        return self._heap[0][0] if self._heap else None
+
+    def run_due(self) -> int:
+        """
+        Run every job due now, plus any due within the coalescing window.
+        Returns how many ran. Called by the timer, or directly with use_timer=False.
+        """
+        now = self.clock.now_ms()
+        horizon = now + self.coalesce_ms
+        ran = 0
+        while True:
+            self._drop_cancelled()
+            if not self._heap or self._heap[0][0] > horizon:
+                break
+            _, _, job = heapq.heappop(self._heap)
+
+            if job.repeat_ms:
+                job.due_ms += job.repeat_ms
+                if job.due_ms <= now:
+                    job.due_ms = now + job.repeat_ms   # fell far behind — don't run a burst
+                self._push(job, arm=False)
+            else:
+                self._jobs.pop((job.owner, job.name), None)
+                job.cancelled = True
+
+            if ran == 0:
+                self.wakeups.record(job.name)
+            started = time.perf_counter()
+            job.callback()
+            self.run_seconds[job.name] += time.perf_counter() - started
+            self.runs[job.name] += 1
+            ran += 1
+
+        self._arm()
+        return ran
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+    def _push(self, job: Job, arm: bool = True):
+        heapq.heappush(self._heap, (job.due_ms, next(self._seq), job))
+        if arm:
+            self._arm()
+
+    def _drop_cancelled(self):
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+
+    def _arm(self):
+        """Point the single timer at the earliest deadline (if it isn't already)."""
+        if self._timer is None:
+            return
+        due = self.next_due_ms()
+        if due is None:
+            self._armed_for = None
+            self._timer.stop()
+            return
+        if due == self._armed_for and self._timer.isActive():
+            return
+        self._armed_for = due
+        self._timer.start(max(0, math.ceil(due - self.clock.now_ms())))
+
+    def _on_timeout(self):
+        self._armed_for = None
+        self.run_due()
+
+
+_scheduler = None
+
+
+def get_scheduler() -> Scheduler:
+    """The process-wide scheduler (created on first use — needs a Qt event loop to fire)."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = Scheduler()
+    return _scheduler
@@ -0,0 +1,110 @@
+# screen_geometry.py
+# ---------------------------------------------------------------------------
+# One place to ask "which screen is this point on, and how big is it?"
+#
+# Keeps the availableGeometry (screen minus taskbar/dock/menu bar) of every
+# connected screen in a small index sorted by left edge, so lookups don't
+# go through QScreen every time. The index is dropped and rebuilt when Qt
+# reports a screen being plugged in, unplugged, or resized/moved, and
+# `changed` is emitted so movement and the window can re-place themselves.
+# ---------------------------------------------------------------------------
+
+from bisect import bisect_right
+
+from PyQt6.QtCore import QObject, QPoint, QRect, pyqtSignal
+from PyQt6.QtGui import QGuiApplication
+
+
+class ScreenGeometry(QObject):
+    """Cached available geometry of all screens, kept up to date as they change."""
+
+    changed = pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+        self._rects = None      # available geometry per screen, sorted by left edge (None = stale)
+        self._lefts = ()        # left edge of each rect, for bisect
+        self._primary = QRect()
+
+        app = QGuiApplication.instance()
+        app.screenAdded.connect(self._on_screen_added)
+        app.screenRemoved.connect(lambda screen: self._invalidate())
+        app.primaryScreenChanged.connect(lambda screen: self._invalidate())
+        for screen in QGuiApplication.screens():
+            self._watch(screen)
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+    def screens(self) -> list:
+        """Available geometry of every screen, left to right."""
+        self._ensure()
+        return list(self._rects)
+
+    def primary(self) -> QRect:
+        """Available geometry of the primary screen."""
+        self._ensure()
+        return QRect(self._primary)
+
+    def screen_at(self, point: QPoint) -> QRect | None:
+        """Available geometry of the screen containing point, or None if it's off every screen."""
+        self._ensure()
+        # Only screens starting at or left of the point can contain it
+        for i in range(bisect_right(self._lefts, point.x()) - 1, -1, -1):
+            if self._rects[i].contains(point):
+                return QRect(self._rects[i])
+        return None
+
+    def nearest(self, point: QPoint) -> QRect:
+        """Available geometry of the screen containing point, or else the closest one."""
+        rect = self.screen_at(point)
+        if rect is not None:
+            return rect
+        if not self._rects:
+            return QRect(self._primary)
+
+        def distance_sq(r: QRect) -> int:
+            dx = max(r.left() - point.x(), 0, point.x() - r.right())
+            dy = max(r.top() - point.y(), 0, point.y() - r.bottom())
+            return dx * dx + dy * dy
+
+        return QRect(min(self._rects, key=distance_sq))
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+    def _watch(self, screen):
+        screen.availableGeometryChanged.connect(lambda rect: self._invalidate())
+        screen.geometryChanged.connect(lambda rect: self._invalidate())
+
+    def _on_screen_added(self, screen):
+        self._watch(screen)
+        self._invalidate()
+
+    def _invalidate(self):
+        self._rects = None
+        self.changed.emit()
+
+    def _ensure(self):
+        """Rebuild the index if a screen changed since the last lookup."""
+        if self._rects is not None:
+            return
+        rects = sorted((screen.availableGeometry() for screen in QGuiApplication.screens()),
+                       key=lambda r: (r.left(), r.top()))
+        self._rects = tuple(rects)
+        self._lefts = tuple(r.left() for r in rects)
+        primary = QGuiApplication.primaryScreen()
+        self._primary = primary.availableGeometry() if primary else QRect(0, 0, 1920, 1080)
+        print(f"[screen_geometry] {len(rects)} screen(s): "
+              + ", ".join(f"{r.width()}x{r.height()}@({r.x()},{r.y()})" for r in rects))
+
+
+_screen_geometry = None
+
+
+def get_screen_geometry() -> ScreenGeometry:
+    """The shared ScreenGeometry (created on first use — needs a QApplication)."""
+    global _screen_geometry
+    if _screen_geometry is None:
+        _screen_geometry = ScreenGeometry()
+    return _screen_geometry
@@ -0,0 +1,325 @@
+# simulator.py
+# ---------------------------------------------------------------------------
+# Headless, deterministic wanderer-mode simulation.
+#
+# Runs the real ModeManager and MovementController, but:
+#   - time comes from a VirtualClock (clock.py) that jumps straight to the
+#     next deadline instead of sleeping,
+#   - jobs run from a Scheduler (scheduler.py) on that clock with no Qt timer
+#     behind it — run() steps it from deadline to deadline,
+#   - randomness comes from a seeded random.Random,
+#   - the character and window are stand-ins that just record what they're
+#     told (positions, animation switches, speech bubbles) into a trace,
+#   - the app monitor is a stand-in too: no focus events, file watchers or
+#     worker thread — report() plays what it would have found — and usage
+#     is recorded to an in-memory database.
+#
+# Hours of driving, poses, drags and return-to-edge run in well under a
+# second, and the same seed always gives the same trace — so the trace can
+# be checked in tests, and the per-job callback times double as a
+# benchmark of tick cost.
+#
+# Usage:
+#   sim = WandererSimulation(seed=1)
+#   sim.run(60 * 60 * 1000)                 # one simulated hour
+#   sim.drag_to(QPoint(500, 400))           # user drags the pet
+#   sim.run(30 * 1000)
+#   sim.trace                               # [TraceEvent(t_ms, kind, value), ...]
+#
+# Or from the command line, as a benchmark:
+#   python simulator.py --hours 4 --seed 1 --drags 20
+# and python simulator.py --self-test to check supervisor-mode reactions.
+# ---------------------------------------------------------------------------
+
+import argparse
+import contextlib
+import io
+import random
+import time
+from typing import NamedTuple
+
+from PyQt6.QtCore import QPoint, QRect
+
+import config
+from clock import VirtualClock
+from movement import MovementController
+from scheduler import Scheduler
+
+
+class TraceEvent(NamedTuple):
+    t_ms: float
+    kind: str       # "move", "animation", "bubble"
+    value: object   # (x, y) for moves, animation name, bubble text (None = hidden)
+
+
+class _Signal:
+    """Just enough of a Qt signal: connect() and emit()."""
+
+    def __init__(self):
+        self._slots = []
+
+    def connect(self, slot):
+        self._slots.append(slot)
+
+    def emit(self, *args):
+        for slot in self._slots:
+            slot(*args)
+
+
+# ---------------------------------------------------------------------------
+# Stand-ins for the character, window and screens
+# ---------------------------------------------------------------------------
+class FixedScreens:
+    """ScreenGeometry with a fixed set of screens (no QGuiApplication needed)."""
+
+    def __init__(self, rects):
+        self._rects = [QRect(r) for r in rects]
+        self.changed = _Signal()
+
+    def screens(self) -> list:
+        return list(self._rects)
+
+    def primary(self) -> QRect:
+        return QRect(self._rects[0])
+
+    def screen_at(self, point: QPoint) -> QRect | None:
+        return next((QRect(r) for r in self._rects if r.contains(point)), None)
+
+    def nearest(self, point: QPoint) -> QRect:
+        def distance_sq(r: QRect) -> int:
+            dx = max(r.left() - point.x(), 0, point.x() - r.right())
+            dy = max(r.top() - point.y(), 0, point.y() - r.bottom())
+            return dx * dx + dy * dy
+        return QRect(min(self._rects, key=distance_sq))
+
+
+class TraceCharacter:
+    """Records animation switches instead of animating."""
+
+    def __init__(self, sim: "WandererSimulation"):
+        self._sim = sim
+        self.animation = None
+
+    def set_animation(self, name: str):
+        if name != self.animation:
+            self.animation = name
+            self._sim._record("animation", name)
+
+    def preload(self, names, priority: int):
+        pass
+
+    def prefetch(self, names):
+        pass
+
+
+class TraceFocusWatcher:
+    """No focus events: supervisor mode polls, on the virtual clock."""
+
+    event_driven = False
+
+    def __init__(self):
+        self.focus_changed = _Signal()
+
+
+class TraceAppMonitor:
+    """Stands in for AppMonitor — nothing here looks at the real desktop."""
+
+    def __init__(self):
+        self.focus_watcher = TraceFocusWatcher()
+
+
+class TraceMonitorThread:
+    """Stands in for AppMonitorThread: counts checks; WandererSimulation.report() answers them."""
+
+    def __init__(self):
+        self.reaction_changed = _Signal()
+        self.window_changed = _Signal()
+        self.checks = 0
+
+    def request_check(self):
+        self.checks += 1
+
+
+class TraceWindow:
+    """Records sprite moves and speech bubbles instead of showing a window."""
+
+    def __init__(self, sim: "WandererSimulation"):
+        self._sim = sim
+        self._pos = QPoint(0, 0)
+
+    def sprite_pos(self) -> QPoint:
+        return QPoint(self._pos)
+
+    def move_sprite(self, pos: QPoint):
+        if pos != self._pos:
+            self._pos = QPoint(pos)
+            self._sim._record("move", (pos.x(), pos.y()))
+
+    def show_speech_bubble(self, text: str):
+        self._sim._record("bubble", text)
+
+    def hide_speech_bubble(self):
+        self._sim._record("bubble", None)
+
+
+# ---------------------------------------------------------------------------
+# The simulation
+# ---------------------------------------------------------------------------
+class WandererSimulation:
+    """ModeManager in wanderer mode on virtual time. Same seed → same trace."""
+
+    def __init__(self, seed: int = 0, screens=(QRect(0, 0, 1920, 1080),), quiet: bool = True):
+        # Import here so the stand-ins above stay usable without pulling in the GUI modules
+        from mode_manager import ModeManager
+        from usage_store import UsageRecorder, UsageStore
+
+        self.quiet = quiet
+        self.rng = random.Random(seed)
+        self.clock = VirtualClock()
+        self.scheduler = Scheduler(clock=self.clock, use_timer=False)
+        self.trace = []
+
+        self.character = TraceCharacter(self)
+        self.window = TraceWindow(self)
+        self.monitor_thread = TraceMonitorThread()
+        with self._output():
+            self.movement = MovementController(
+                config.WINDOW_WIDTH, config.WINDOW_HEIGHT,
+                clock=self.clock, screens=FixedScreens(screens),
+            )
+            self.mode_manager = ModeManager(
+                self.character, self.window,
+                rng=self.rng, scheduler=self.scheduler, movement=self.movement,
+                app_monitor=TraceAppMonitor(), monitor_thread=self.monitor_thread,
+                usage_recorder=UsageRecorder(UsageStore(":memory:"), scheduler=self.scheduler),
+            )
+            self.mode_manager.switch_to_wanderer()
+
+    def _output(self):
+        """Swallow the modules' progress prints unless quiet is off."""
+        return contextlib.redirect_stdout(io.StringIO()) if self.quiet else contextlib.nullcontext()
+
+    def _record(self, kind: str, value):
+        self.trace.append(TraceEvent(self.clock.now_ms(), kind, value))
+
+    # ------------------------------------------------------------------
+    # Driving the simulation
+    # ------------------------------------------------------------------
+    @property
+    def now_ms(self) -> float:
+        return self.clock.now_ms()
+
+    def run(self, ms: float):
+        """Advance virtual time by ms, running every job that comes due."""
+        end = self.clock.now_ms() + ms
+        with self._output():
+            while True:
+                due = self.scheduler.next_due_ms()
+                if due is None or due > end:
+                    break
+                self.clock.advance_to(due)
+                self.scheduler.run_due()
+        self.clock.advance_to(end)
+
+    def report(self, reaction: tuple, window: tuple = ("", None)):
+        """The app monitor found a new foreground window with this (animation, speech) reaction."""
+        with self._output():
+            self.monitor_thread.window_changed.emit(window)
+            self.monitor_thread.reaction_changed.emit(reaction)
+
+    def drag_to(self, pos: QPoint):
+        """Pick the pet up and drop it at pos (sprite top-left), like a mouse drag."""
+        with self._output():
+            self.mode_manager.on_pet_drag_start()
+            self.window.move_sprite(pos)
+            self.mode_manager.on_pet_dragged(self.window.sprite_pos())
+
+    # ------------------------------------------------------------------
+    # Reading the trace
+    # ------------------------------------------------------------------
+    def events(self, kind: str) -> list:
+        return [event for event in self.trace if event.kind == kind]
+
+    def animations(self) -> list:
+        """Animation names in the order they were switched to."""
+        return [event.value for event in self.events("animation")]
+
+    def positions(self) -> list:
+        """(t_ms, x, y) for every sprite move."""
+        return [(event.t_ms, *event.value) for event in self.events("move")]
+
+    def timer_stats(self) -> dict:
+        """Per-job run count and mean callback cost (µs), keyed by job name."""
+        return {
+            name: (count, self.scheduler.run_seconds[name] / count * 1e6)
+            for name, count in self.scheduler.runs.items()
+        }
+
+
+# ---------------------------------------------------------------------------
+# Self-test (python simulator.py --self-test)
+# ---------------------------------------------------------------------------
+def _self_test():
+    """Supervisor mode on virtual time: a reaction muted by the cooldown still holds its animation."""
+    sim = WandererSimulation()
+    with sim._output():
+        sim.mode_manager.switch_to_supervisor()
+    dwell, shown = config.REACTION_DWELL_MS, config.SPEECH_BUBBLE_DURATION_MS
+
+    sim.report(("proud", "Coding!"))
+    sim.run(dwell + 1)
+    assert sim.character.animation == "proud" and sim.events("bubble")[-1].value == "Coding!"
+    sim.run(shown)
+    assert sim.character.animation == "idle"
+
+    sim.report(("idle", None))                      # switched to something unmatched...
+    sim.run(dwell + 1)
+    sim.report(("proud", "Coding!"))                # ...and back, inside the cooldown
+    sim.run(dwell + 1)
+    muted_at = sim.events("animation")[-1].t_ms
+    assert sim.character.animation == "proud", "muted reaction didn't play"
+    assert sim.events("bubble")[-1].value is None, "muted reaction showed its bubble"
+    assert sim.mode_manager._reaction_filter.counts["muted"] == 1
+
+    sim.run(muted_at + shown - 1 - sim.now_ms)
+    assert sim.character.animation == "proud", "muted reaction was swapped straight back to idle"
+    sim.run(2)
+    assert sim.character.animation == "idle" and sim.events("animation")[-1].t_ms == muted_at + shown
+    print("[simulator] Self-test passed.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run wanderer mode on a virtual clock and report tick cost.")
+    parser.add_argument("--hours", type=float, default=1.0, help="simulated hours to run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--drags", type=int, default=0, help="random drags spread over the run")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--self-test", action="store_true", help="check supervisor-mode reactions and exit")
+    args = parser.parse_args()
+    if args.self_test:
+        _self_test()
+        return
+
+    screen = QRect(0, 0, args.width, args.height)
+    sim = WandererSimulation(seed=args.seed, screens=(screen,))
+    total_ms = args.hours * 3600 * 1000
+    drag_times = sorted(sim.rng.uniform(0, total_ms) for _ in range(args.drags))
+
+    started = time.perf_counter()
+    for t in drag_times + [total_ms]:
+        sim.run(t - sim.now_ms)
+        if t < total_ms:
+            sim.drag_to(QPoint(sim.rng.randrange(screen.width()), sim.rng.randrange(screen.height())))
+    wall_s = time.perf_counter() - started
+
+    print(f"Simulated {args.hours:g} h in {wall_s * 1000:.0f} ms ({total_ms / 1000 / wall_s:,.0f}x real time)")
+    print(f"{sum(sim.scheduler.runs.values())} job runs, {len(sim.events('move'))} moves, "
+          f"{len(sim.events('animation'))} animation switches, {args.drags} drags")
+    for name, (count, mean_us) in sorted(sim.timer_stats().items()):
+        print(f"  {name:<18} {count:>8} runs  {mean_us:8.1f} µs/tick")
+    print(f"Wakeups: {sim.scheduler.wakeups.summary()}")
+
+
+if __name__ == "__main__":
+    main()
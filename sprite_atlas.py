@@ -0,0 +1,237 @@
+# sprite_atlas.py
+# ---------------------------------------------------------------------------
+# Packs every sprite into one or a few large "atlas" sheets.
+#
+# Why:
+#   Each frame in config.ANIMATIONS used to be its own file and its own
+#   QPixmap — dozens of small allocations, a file open per frame, and
+#   duplicated pixels for files that appear in several animations. With an
+#   atlas there's one pixmap per sheet and a small index from sprite file
+#   name to the rect it occupies; the window draws sub-rects of the sheet.
+#
+# Two ways to get an atlas:
+#   - Prebuilt: atlas.json + atlas_<n>.png next to the sprites (see
+#     config.SPRITE_ATLAS_FILE). One PNG decode per sheet instead of one per
+#     frame. Build it with:   python sprite_atlas.py [--dpr 2]
+#   - Runtime: if there's no prebuilt atlas (or it's stale, or was built for
+#     a different size), the sheets are packed at startup from SPRITES_DIR,
+#     using the on-disk frame cache so warm starts still skip PNG decoding.
+#
+# Image work (build_atlas_images / load_prebuilt_atlas) is safe off the GUI
+# thread; SpriteAtlas wraps the finished sheets as QPixmaps on the GUI thread.
+# ---------------------------------------------------------------------------
+
+import json
+import os
+import sys
+
+from PyQt6.QtCore import Qt, QRect
+from PyQt6.QtGui import QImage, QImageReader, QPainter, QPixmap
+
+import config
+
+_ATLAS_VERSION = 1
+_PADDING = 2   # transparent gap between sprites so smooth scaling never bleeds neighbours
+
+
+class SpriteAtlas:
+    """A set of sheet pixmaps plus an index of sprite name -> (sheet, source rect)."""
+
+    def __init__(self, sheets: list, index: dict, dpr: float):
+        self.sheets = sheets   # list of QPixmap
+        self.index = index     # filename -> (sheet_number, QRect in device pixels)
+        self.dpr = dpr
+
+    @classmethod
+    def from_images(cls, images: list, index: dict, dpr: float) -> "SpriteAtlas":
+        """GUI thread: convert packed sheet images to pixmaps."""
+        sheets = []
+        for image in images:
+            pixmap = QPixmap.fromImage(image)
+            pixmap.setDevicePixelRatio(dpr)
+            sheets.append(pixmap)
+        return cls(sheets, index, dpr)
+
+    def lookup(self, filename: str) -> tuple | None:
+        """Return (sheet pixmap, source QRect) for a sprite file, or None if it isn't packed."""
+        entry = self.index.get(filename)
+        if entry is None:
+            return None
+        sheet_number, rect = entry
+        return self.sheets[sheet_number], rect
+
+    def byte_size(self) -> int:
+        return sum(p.width() * p.height() * max(p.depth(), 8) // 8 for p in self.sheets)
+
+
+# ----------------------------------------------------------------------
+# Building (any thread)
+# ----------------------------------------------------------------------
+def atlas_filenames() -> list:
+    """Every distinct sprite file used by config.ANIMATIONS, in first-use order."""
+    return list(dict.fromkeys(filename for frames in config.ANIMATIONS.values() for filename, _ in frames))
+
+
+def pack_images(images: dict, max_size: int = config.SPRITE_ATLAS_MAX_SIZE) -> tuple:
+    """
+    Shelf-pack {filename: QImage} into as few sheets as fit within max_size.
+    Returns (sheet_images, index) where index maps filename -> (sheet_number, QRect).
+    """
+    # Tallest first keeps shelves tight
+    order = sorted(images, key=lambda name: (-images[name].height(), name))
+
+    placements = []   # per sheet: list of (filename, QRect)
+    sheet_sizes = []  # per sheet: [used_width, used_height]
+    x = y = shelf_height = 0
+
+    for name in order:
+        w = images[name].width() + _PADDING
+        h = images[name].height() + _PADDING
+
+        if not placements or x + w > max_size:
+            # Start a new shelf (or the very first sheet)
+            if placements:
+                y += shelf_height
+            x, shelf_height = 0, 0
+            if not placements or y + h > max_size:
+                placements.append([])
+                sheet_sizes.append([0, 0])
+                y = 0
+
+        placements[-1].append((name, QRect(x, y, images[name].width(), images[name].height())))
+        x += w
+        shelf_height = max(shelf_height, h)
+        sheet_sizes[-1][0] = max(sheet_sizes[-1][0], x)
+        sheet_sizes[-1][1] = max(sheet_sizes[-1][1], y + shelf_height)
+
+    sheets = []
+    index = {}
+    for sheet_number, (placed, (width, height)) in enumerate(zip(placements, sheet_sizes)):
+        sheet = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+        sheet.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(sheet)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        for name, rect in placed:
+            painter.drawImage(rect.topLeft(), images[name])
+            index[name] = (sheet_number, rect)
+        painter.end()
+        sheets.append(sheet)
+
+    return sheets, index
+
+
+def build_atlas_images(width_px: int, height_px: int, load_frame) -> tuple:
+    """
+    Load every sprite at (width_px, height_px) and pack them.
+    load_frame(path, width_px, height_px) must return (QImage or None, keepalive).
+    Missing files are simply left out of the index.
+    Returns (sheet_images, index).
+    """
+    images = {}
+    keepalive = []   # e.g. mmaps backing disk-cached images, held until packing is done
+
+    for filename in atlas_filenames():
+        image, held = load_frame(os.path.join(config.SPRITES_DIR, filename), width_px, height_px)
+        if image is not None:
+            images[filename] = image
+            keepalive.append(held)
+
+    if not images:
+        return [], {}
+    return pack_images(images)
+
+
+def load_prebuilt_atlas(atlas_file: str, width_px: int, height_px: int) -> tuple | None:
+    """
+    Load a prebuilt atlas written by save_atlas(). Returns (sheet_images, index),
+    or None if it's missing, unreadable, malformed, built for a different size,
+    or older than a sprite.
+    """
+    if not os.path.isfile(atlas_file):
+        return None
+
+    try:
+        with open(atlas_file, encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[sprite_atlas] Could not read {atlas_file}: {e}")
+        return None
+
+    if not isinstance(meta, dict):
+        print(f"[sprite_atlas] {atlas_file} is not an atlas index — building at runtime.")
+        return None
+    if meta.get("version") != _ATLAS_VERSION or meta.get("cell") != [width_px, height_px]:
+        print(f"[sprite_atlas] Prebuilt atlas is for {meta.get('cell')}, need {[width_px, height_px]} — building at runtime.")
+        return None
+
+    try:
+        sheet_names = meta["sheets"]
+        index = {name: (entry[0], QRect(*entry[1:])) for name, entry in meta["frames"].items()}
+        if not all(isinstance(name, str) for name in sheet_names):
+            raise TypeError("sheet names must be strings")
+        if not all(isinstance(sheet, int) and 0 <= sheet < len(sheet_names) for sheet, _ in index.values()):
+            raise ValueError("frame on a sheet that isn't listed")
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        reason = str(e).splitlines()[0] if str(e) else ""
+        print(f"[sprite_atlas] Malformed atlas index {atlas_file} ({type(e).__name__}: {reason}) — building at runtime.")
+        return None
+
+    # Stale if any sprite PNG was edited after the atlas was written.
+    # (Skipped in a PyInstaller bundle, where extraction resets every mtime.)
+    if not getattr(sys, "frozen", False):
+        atlas_mtime = os.path.getmtime(atlas_file)
+        for filename in index:
+            path = os.path.join(config.SPRITES_DIR, filename)
+            if os.path.isfile(path) and os.path.getmtime(path) > atlas_mtime:
+                print(f"[sprite_atlas] {filename} is newer than the prebuilt atlas — building at runtime.")
+                return None
+
+    atlas_dir = os.path.dirname(atlas_file)
+    sheets = []
+    for sheet_name in sheet_names:
+        image = QImageReader(os.path.join(atlas_dir, sheet_name)).read()
+        if image.isNull():
+            print(f"[sprite_atlas] Missing atlas sheet {sheet_name} — building at runtime.")
+            return None
+        sheets.append(image.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied))
+    return sheets, index
+
+
+def save_atlas(atlas_file: str, sheets: list, index: dict, width_px: int, height_px: int):
+    """Write sheets as atlas_<n>.png plus the JSON index next to them."""
+    atlas_dir = os.path.dirname(atlas_file)
+    stem = os.path.splitext(os.path.basename(atlas_file))[0]
+    sheet_names = []
+    for sheet_number, sheet in enumerate(sheets):
+        sheet_name = f"{stem}_{sheet_number}.png"
+        sheet.save(os.path.join(atlas_dir, sheet_name))
+        sheet_names.append(sheet_name)
+
+    meta = {
+        "version": _ATLAS_VERSION,
+        "cell": [width_px, height_px],
+        "sheets": sheet_names,
+        "frames": {
+            name: [sheet_number, rect.x(), rect.y(), rect.width(), rect.height()]
+            for name, (sheet_number, rect) in index.items()
+        },
+    }
+    with open(atlas_file, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=1)
+
+
+if __name__ == "__main__":
+    import argparse
+    from sprite_loader import decode_sprite
+
+    parser = argparse.ArgumentParser(description="Prebuild the sprite atlas from SPRITES_DIR.")
+    parser.add_argument("--dpr", type=float, default=1.0, help="device pixel ratio to build for (default 1)")
+    args = parser.parse_args()
+
+    w = round(config.WINDOW_WIDTH * args.dpr)
+    h = round(config.WINDOW_HEIGHT * args.dpr)
+    built_sheets, built_index = build_atlas_images(w, h, lambda path, pw, ph: (decode_sprite(path, pw, ph), None))
+    if not built_sheets:
+        raise SystemExit(f"No sprites found in {config.SPRITES_DIR}")
+    save_atlas(config.SPRITE_ATLAS_FILE, built_sheets, built_index, w, h)
+    print(f"[sprite_atlas] Wrote {len(built_index)} sprites into {len(built_sheets)} sheet(s): {config.SPRITE_ATLAS_FILE}")
@@ -0,0 +1,114 @@
+# sprite_cache.py
+# ---------------------------------------------------------------------------
+# Process-wide cache of decoded, scaled sprite pixmaps.
+#
+# How it works:
+#   - Entries are keyed by (file path, target width, target height, device
+#     pixel ratio), so the same PNG scaled for a different size or screen
+#     gets its own entry.
+#   - Each entry costs its pixel data in bytes (width * height * depth / 8).
+#   - When the total goes over the byte budget, the least recently used
+#     entries are evicted until it fits again.
+#   - Hit / miss / eviction counters are kept so you can check how well the
+#     budget fits the animations you actually use.
+#
+# Use get_sprite_cache() to get the shared instance — every Character in the
+# process goes through the same cache.
+# ---------------------------------------------------------------------------
+
+from collections import OrderedDict
+
+from PyQt6.QtGui import QPixmap
+
+import config
+
+
+class SpriteCache:
+    """LRU cache of QPixmaps with a byte budget."""
+
+    def __init__(self, budget_bytes: int = config.SPRITE_CACHE_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()   # key -> (QPixmap, cost_bytes), oldest first
+        self._used_bytes = 0
+
+        # --- Counters ---
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+    @staticmethod
+    def make_key(path: str, width: int, height: int, device_pixel_ratio: float) -> tuple:
+        """Build the cache key for a sprite file scaled to (width, height) at a given DPR."""
+        return (path, width, height, round(device_pixel_ratio, 2))
+
+    def get(self, key: tuple) -> QPixmap | None:
+        """Return the cached pixmap for key (marking it recently used), or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def contains(self, key: tuple) -> bool:
+        """True if key is cached. Does not touch the counters or the LRU order."""
+        return key in self._entries
+
+    def put(self, key: tuple, pixmap: QPixmap):
+        """Insert (or replace) a pixmap, evicting old entries if over budget."""
+        if key in self._entries:
+            self._used_bytes -= self._entries.pop(key)[1]
+
+        cost = self._cost_of(pixmap)
+        self._entries[key] = (pixmap, cost)
+        self._used_bytes += cost
+        self._evict_to_budget()
+
+    def clear(self):
+        """Drop every entry. Counters are kept."""
+        self._entries.clear()
+        self._used_bytes = 0
+
+    def stats(self) -> dict:
+        """Return a snapshot of the cache counters."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "used_bytes": self._used_bytes,
+            "budget_bytes": self.budget_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _cost_of(pixmap: QPixmap) -> int:
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+    def _evict_to_budget(self):
+        """Evict least recently used entries until we're within budget.
+        The newest entry is always kept, even if it alone is over budget."""
+        while self._used_bytes > self.budget_bytes and len(self._entries) > 1:
+            _, (_, cost) = self._entries.popitem(last=False)
+            self._used_bytes -= cost
+            self.evictions += 1
+
+
+_shared_cache = None
+
+
+def get_sprite_cache() -> SpriteCache:
+    """Return the process-wide sprite cache, creating it on first use."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = SpriteCache()
+    return _shared_cache
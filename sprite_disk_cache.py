@@ -0,0 +1,143 @@
+# sprite_disk_cache.py
+# ---------------------------------------------------------------------------
+# On-disk cache of already-scaled sprite frames, so warm starts skip PNG
+# decoding and scaling completely.
+#
+# How it works:
+#   - Each entry is one raw premultiplied ARGB32 frame, stored as a small
+#     header followed by the pixel rows exactly as QImage lays them out.
+#   - Entries are named after the source file, a content hash of the source
+#     file, and the target size. If the PNG changes, its hash changes, so the
+#     old entry simply stops matching and gets rebuilt (and the stale file
+#     for that sprite + size is deleted).
+#   - Loading memory-maps the entry and wraps the mapped bytes in a QImage
+#     without copying them. The mmap must stay alive as long as that QImage
+#     does — load() hands it back alongside the image for that reason.
+#   - A truncated or corrupted entry fails the header check and is rebuilt.
+#
+# Safe to use from the sprite loader's worker threads.
+# ---------------------------------------------------------------------------
+
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+
+from PyQt6 import sip
+from PyQt6.QtGui import QImage
+
+import config
+
+_MAGIC = b"DPSC"
+_VERSION = 1
+# magic, version, image width, image height, bytes per line
+_HEADER = struct.Struct("<4sIIII")
+_FORMAT = QImage.Format.Format_ARGB32_Premultiplied
+
+
+class SpriteDiskCache:
+    """Raw, pre-scaled sprite frames on disk, loaded through mmap."""
+
+    def __init__(self, cache_dir: str = config.SPRITE_DISK_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+    def load(self, source_path: str, width: int, height: int, build) -> tuple:
+        """
+        Return (QImage, keepalive) for source_path scaled to fit (width, height).
+        On a cache hit the image is backed by mapped file memory and keepalive
+        is the mmap holding it. On a miss build() is called to produce the
+        image, which is written to the cache; keepalive is then None.
+        Returns (None, None) if the source is missing or build() fails.
+        """
+        try:
+            with open(source_path, "rb") as f:
+                digest = hashlib.blake2b(f.read(), digest_size=12).hexdigest()
+        except OSError:
+            return None, None
+
+        entry_path = self._entry_path(source_path, digest, width, height)
+
+        image, mapped = self._read_entry(entry_path)
+        if image is not None:
+            return image, mapped
+
+        image = build()
+        if image is None:
+            return None, None
+
+        self._write_entry(entry_path, image)
+        self._remove_stale_entries(source_path, entry_path, width, height)
+        return image, None
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+    def _entry_path(self, source_path: str, digest: str, width: int, height: int) -> str:
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        return os.path.join(self.cache_dir, f"{stem}-{digest}-{width}x{height}.argb")
+
+    def _read_entry(self, entry_path: str) -> tuple:
+        """Map an entry and wrap it as a QImage. Returns (None, None) if missing or invalid."""
+        try:
+            with open(entry_path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None, None  # missing, or empty file (can't map 0 bytes)
+
+        if len(mapped) >= _HEADER.size:
+            magic, version, w, h, bytes_per_line = _HEADER.unpack_from(mapped, 0)
+            if (magic == _MAGIC and version == _VERSION and w > 0 and h > 0
+                    and len(mapped) == _HEADER.size + bytes_per_line * h):
+                address = int(sip.voidptr(mapped)) + _HEADER.size
+                image = QImage(sip.voidptr(address), w, h, bytes_per_line, _FORMAT)
+                return image, mapped
+
+        mapped.close()
+        print(f"[sprite_disk_cache] Corrupt entry, rebuilding: {os.path.basename(entry_path)}")
+        try:
+            os.remove(entry_path)
+        except OSError:
+            pass
+        return None, None
+
+    def _write_entry(self, entry_path: str, image: QImage):
+        """Write image atomically (temp file + rename), so readers never see half an entry."""
+        if image.format() != _FORMAT:
+            image = image.convertToFormat(_FORMAT)
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, _VERSION, image.width(), image.height(), image.bytesPerLine()))
+                f.write(image.constBits().asstring(image.sizeInBytes()))
+            os.replace(tmp_path, entry_path)
+        except OSError as e:
+            # A read-only or full cache dir just means we decode every time.
+            print(f"[sprite_disk_cache] Could not write cache entry: {e}")
+
+    def _remove_stale_entries(self, source_path: str, keep_path: str, width: int, height: int):
+        """Delete entries for the same sprite and size built from older file contents."""
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        suffix = f"-{width}x{height}.argb"
+        keep_name = os.path.basename(keep_path)
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+
+        for name in names:
+            if name == keep_name or not name.endswith(suffix) or not name.startswith(stem + "-"):
+                continue
+            # stem-<24 hex digest>-WxH.argb — check the middle really is a digest,
+            # so "car" doesn't delete "car_left" entries.
+            middle = name[len(stem) + 1:-len(suffix)]
+            if len(middle) == 24 and all(c in "0123456789abcdef" for c in middle):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
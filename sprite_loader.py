@@ -0,0 +1,297 @@
+# sprite_loader.py
+# ---------------------------------------------------------------------------
+# Decodes and scales sprites on background threads.
+#
+# How it works:
+#   - Callers ask for a sprite with request(). If it's already in the shared
+#     SpriteCache the pixmap comes straight back; otherwise the request is
+#     queued and None is returned.
+#   - Requests wait in a priority queue. Only a few are handed to the
+#     QThreadPool at a time, so a later high-priority request (the frame
+#     that's on screen right now) can still jump ahead of a big preload.
+#   - Workers decode + scale into a QImage (safe off the GUI thread).
+#     The finished image is sent back through a queued signal, and only the
+#     final QPixmap.fromImage() conversion happens on the GUI thread.
+#   - Workers check the on-disk raw frame cache (sprite_disk_cache.py) first,
+#     so on a warm start they only map a file instead of decoding a PNG.
+#   - Missing or broken files get a placeholder pixmap instead, which is
+#     cached like any other sprite.
+#   - request_atlas() loads (or packs) the whole sprite atlas in one job —
+#     see sprite_atlas.py. Once it's ready, sprites are served from its sheets.
+#
+# Use get_sprite_loader() to get the shared instance.
+# ---------------------------------------------------------------------------
+
+import heapq
+import itertools
+import os
+
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QColor, QImage, QImageReader, QPainter, QPixmap
+
+import config
+from sprite_atlas import SpriteAtlas, build_atlas_images, load_prebuilt_atlas
+from sprite_cache import SpriteCache, get_sprite_cache
+from sprite_disk_cache import SpriteDiskCache
+
+# Request priorities — higher is loaded first
+PRIORITY_VISIBLE = 100   # needed on screen right now
+PRIORITY_PREFETCH = 75   # predicted to be the next animation
+PRIORITY_MODE = 50       # used by the current mode, likely needed soon
+PRIORITY_PRELOAD = 0     # everything else, warmed up at startup
+
+
+def decode_sprite(path: str, width: int, height: int) -> QImage | None:
+    """
+    Decode a sprite file and scale it to fit (width, height), keeping aspect ratio.
+    Safe to call from any thread. Returns None if the file is missing or broken.
+    """
+    if not os.path.isfile(path):
+        return None
+
+    image = QImageReader(path).read()
+    if image.isNull():
+        return None
+
+    image = image.scaled(
+        width,
+        height,
+        Qt.AspectRatioMode.KeepAspectRatio,
+        Qt.TransformationMode.SmoothTransformation,
+    )
+    return image.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+
+
+def make_placeholder(label: str) -> QPixmap:
+    """
+    Draw a placeholder rectangle for a single frame.
+    The label shows which sprite file it's standing in for,
+    so you can see the animation cycling through frames.
+    """
+    pixmap = QPixmap(config.WINDOW_WIDTH, config.WINDOW_HEIGHT)
+    pixmap.fill(Qt.GlobalColor.transparent)
+
+    painter = QPainter(pixmap)
+
+    # Background rounded rectangle
+    r, g, b = config.PLACEHOLDER_COLOR
+    painter.setBrush(QColor(r, g, b, 200))
+    painter.setPen(Qt.PenStyle.NoPen)
+    painter.drawRoundedRect(10, 10, config.WINDOW_WIDTH - 20, config.WINDOW_HEIGHT - 20, 20, 20)
+
+    # Title
+    painter.setPen(QColor(255, 255, 255))
+    painter.drawText(pixmap.rect().adjusted(0, 20, 0, -40), Qt.AlignmentFlag.AlignCenter, "🐾 Desktop Pet")
+
+    # Frame label — shows which sprite this placeholder is standing in for
+    painter.setPen(QColor(200, 200, 255))
+    painter.drawText(pixmap.rect().adjusted(0, 40, 0, 0), Qt.AlignmentFlag.AlignCenter, f"[{label}]")
+
+    painter.end()
+    return pixmap
+
+
+class _DecodeSignals(QObject):
+    """Lives on the GUI thread; workers emit through it so delivery is queued."""
+    # (cache key, QImage or None, keepalive) — keepalive is the mmap backing a
+    # disk-cached image, and must outlive the QImage until it's been converted.
+    decoded = pyqtSignal(object, object, object)
+    # (sheet QImages, index, dpr)
+    atlas_built = pyqtSignal(object, object, object)
+
+
+def _load_frame(path: str, width: int, height: int, disk_cache: SpriteDiskCache | None) -> tuple:
+    """Any thread: (QImage or None, keepalive) for one sprite, via the disk cache if enabled."""
+    if disk_cache is None:
+        return decode_sprite(path, width, height), None
+    return disk_cache.load(path, width, height, lambda: decode_sprite(path, width, height))
+
+
+class _DecodeTask(QRunnable):
+    """One sprite decode, run on a QThreadPool worker."""
+
+    def __init__(self, key: tuple, path: str, width: int, height: int,
+                 disk_cache: SpriteDiskCache | None, signals: _DecodeSignals):
+        super().__init__()
+        self._key = key
+        self._path = path
+        self._width = width
+        self._height = height
+        self._disk_cache = disk_cache
+        self._signals = signals
+
+    def run(self):
+        image, keepalive = _load_frame(self._path, self._width, self._height, self._disk_cache)
+        self._signals.decoded.emit(self._key, image, keepalive)
+
+
+class _AtlasTask(QRunnable):
+    """Load the prebuilt atlas, or pack one from SPRITES_DIR, on a QThreadPool worker."""
+
+    def __init__(self, width: int, height: int, dpr: float,
+                 disk_cache: SpriteDiskCache | None, signals: _DecodeSignals):
+        super().__init__()
+        self._width = width
+        self._height = height
+        self._dpr = dpr
+        self._disk_cache = disk_cache
+        self._signals = signals
+
+    def run(self):
+        result = load_prebuilt_atlas(config.SPRITE_ATLAS_FILE, self._width, self._height)
+        if result is None:
+            result = build_atlas_images(
+                self._width, self._height,
+                lambda path, w, h: _load_frame(path, w, h, self._disk_cache),
+            )
+        sheets, index = result
+        self._signals.atlas_built.emit(sheets, index, self._dpr)
+
+
+class SpriteLoader:
+    """Prioritised background sprite loading into the shared SpriteCache."""
+
+    def __init__(self, cache: SpriteCache = None, max_threads: int = config.SPRITE_LOADER_THREADS):
+        self._cache = cache or get_sprite_cache()
+        self._max_in_flight = max_threads
+
+        self._pool = QThreadPool()
+        self._pool.setMaxThreadCount(max_threads)
+        self._disk_cache = SpriteDiskCache() if config.SPRITE_DISK_CACHE_ENABLED else None
+
+        self._signals = _DecodeSignals()
+        self._signals.decoded.connect(self._on_decoded)
+        self._signals.atlas_built.connect(self._on_atlas_built)
+
+        # --- Request bookkeeping (GUI thread only) ---
+        self._queue = []            # heap of (-priority, seq, key)
+        self._queued = {}           # key -> (priority, path, width_px, height_px, dpr)
+        self._in_flight = set()     # keys currently being decoded
+        self._callbacks = {}        # key -> [callback(key, pixmap), ...]
+        self._seq = itertools.count()
+
+        # Keys whose cached pixmap is a placeholder, not a real sprite
+        self.placeholder_keys = set()
+
+        # --- Atlas (see sprite_atlas.py) ---
+        self.atlas = None               # SpriteAtlas once loaded
+        self._atlas_pending_dpr = None  # DPR of the atlas job in flight, if any
+        self._atlas_callbacks = []      # [callback(atlas), ...]
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+    def request(self, path: str, width: int, height: int, dpr: float,
+                priority: int = PRIORITY_PRELOAD, callback=None) -> tuple:
+        """
+        Ask for a sprite scaled to (width, height) logical pixels at the given DPR.
+        Returns (key, pixmap). pixmap is None if it isn't ready yet — in that
+        case callback(key, pixmap) is called on the GUI thread once it is.
+        """
+        key = self._cache.make_key(path, width, height, dpr)
+
+        pixmap = self._cache.get(key)
+        if pixmap is not None:
+            return key, pixmap
+
+        if callback is not None:
+            self._callbacks.setdefault(key, []).append(callback)
+
+        if key in self._in_flight:
+            return key, None
+
+        queued = self._queued.get(key)
+        if queued is None or queued[0] < priority:
+            # New request, or an existing one that just became more urgent.
+            # The old heap entry goes stale and is skipped when popped.
+            self._queued[key] = (priority, path, round(width * dpr), round(height * dpr), dpr)
+            heapq.heappush(self._queue, (-priority, next(self._seq), key))
+            self._pump()
+
+        return key, None
+
+    def request_atlas(self, width: int, height: int, dpr: float, callback=None) -> SpriteAtlas | None:
+        """
+        Ask for the sprite atlas at (width, height) logical pixels per sprite.
+        Returns it if it's ready; otherwise starts loading it (once) and calls
+        callback(atlas) on the GUI thread when done.
+        """
+        if self.atlas is not None and self.atlas.dpr == dpr:
+            return self.atlas
+
+        if callback is not None:
+            self._atlas_callbacks.append(callback)
+
+        if self._atlas_pending_dpr != dpr:
+            self._atlas_pending_dpr = dpr
+            task = _AtlasTask(round(width * dpr), round(height * dpr), dpr, self._disk_cache, self._signals)
+            self._pool.start(task, PRIORITY_VISIBLE)
+        return None
+
+    def is_pending(self, key: tuple) -> bool:
+        """True if key is queued or being decoded."""
+        return key in self._queued or key in self._in_flight
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+    def _pump(self):
+        """Hand queued requests to the thread pool, highest priority first."""
+        while self._queue and len(self._in_flight) < self._max_in_flight:
+            neg_priority, _, key = heapq.heappop(self._queue)
+            queued = self._queued.get(key)
+            if queued is None or queued[0] != -neg_priority:
+                continue  # stale entry — superseded by a higher priority request
+
+            del self._queued[key]
+            _, path, width_px, height_px, _ = queued
+            self._in_flight.add(key)
+            self._pool.start(_DecodeTask(key, path, width_px, height_px, self._disk_cache, self._signals))
+
+    def _on_decoded(self, key: tuple, image, keepalive):
+        """GUI thread: turn the decoded image into a cached pixmap and notify waiters."""
+        self._in_flight.discard(key)
+        path, _, _, dpr = key
+
+        if image is None:
+            print(f"[sprite_loader] Missing sprite: {os.path.basename(path)} — using placeholder.")
+            pixmap = make_placeholder(os.path.basename(path))
+            self.placeholder_keys.add(key)
+        else:
+            # fromImage copies the pixels, so the mmap (keepalive) can go after this
+            pixmap = QPixmap.fromImage(image)
+            pixmap.setDevicePixelRatio(dpr)
+            del image, keepalive
+
+        self._cache.put(key, pixmap)
+
+        for callback in self._callbacks.pop(key, []):
+            callback(key, pixmap)
+
+        self._pump()
+
+
+    def _on_atlas_built(self, images: list, index: dict, dpr: float):
+        """GUI thread: wrap the packed sheets as pixmaps and notify waiters."""
+        if dpr != self._atlas_pending_dpr:
+            return  # superseded by a request for another DPR
+
+        self._atlas_pending_dpr = None
+        self.atlas = SpriteAtlas.from_images(images, index, dpr)
+        print(f"[sprite_loader] Atlas ready: {len(index)} sprites in {len(images)} sheet(s), "
+              f"{self.atlas.byte_size() // 1024} KB")
+
+        callbacks, self._atlas_callbacks = self._atlas_callbacks, []
+        for callback in callbacks:
+            callback(self.atlas)
+
+
+_shared_loader = None
+
+
+def get_sprite_loader() -> SpriteLoader:
+    """Return the process-wide sprite loader, creating it on first use."""
+    global _shared_loader
+    if _shared_loader is None:
+        _shared_loader = SpriteLoader()
+    return _shared_loader
@@ -0,0 +1,341 @@
+# swarm.py
+# ---------------------------------------------------------------------------
+# Swarm mode: many pets driving around the screen at once (e.g. one per team
+# member on a shared wall display).
+#
+# Running N copies of the single-pet stack would mean N ModeManagers, N
+# MovementControllers and a Python loop per pet per tick. Instead:
+#
+#   - SwarmMotion keeps every pet's state in NumPy arrays (distance along a
+#     shared Route, speed, pose timers) and one tick updates them all at
+#     once — positions are np.interp over the route's arc-length table, the
+#     same lookup Route.position_at does for one pet.
+#   - Pets closer than SWARM_SEPARATION_PX slow down for the one ahead of
+#     them. Close pairs come from a SpatialHash: points are bucketed into a
+#     grid of separation-sized cells, so only pets in neighbouring cells are
+#     compared instead of all N² pairs.
+#   - Swarm ties it to the screen: one PetWindow + Character per pet, but a
+#     single "move" job on the shared scheduler for all of them. Sprites,
+#     timelines and window masks come from the process-wide caches, so the
+#     200th pet costs no extra decoding or scaling.
+#
+# Pets drive at constant speed (no easing) and, like the single pet, may
+# strike a pose at each corner. Dropping a dragged pet puts it back on the
+# route at the nearest point.
+#
+# Benchmark (no window needed):
+#   python swarm.py --bench
+# ---------------------------------------------------------------------------
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+from PyQt6.QtCore import QPoint, QRect, QRectF
+
+import config
+from clock import VirtualClock, get_clock
+from route import Route
+
+
+class SpatialHash:
+    """Finds all pairs of points within `cell` of each other by bucketing them into a grid."""
+
+    # Half of the 3x3 neighbourhood: each pair of neighbouring cells is visited once
+    _NEIGHBOURS = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+    def __init__(self, cell: float):
+        self.cell = float(cell)
+
+    def pairs(self, points: np.ndarray) -> tuple:
+        """
+        (i, j) index arrays, i != j, of every pair of points (an (N, 2) array)
+        closer than `cell`. Each pair appears once.
+        """
+        empty = np.empty(0, dtype=np.intp)
+        if len(points) < 2:
+            return empty, empty
+
+        cells = np.floor(points / self.cell).astype(np.int64)
+        cells -= cells.min(axis=0) - 1          # keep neighbour cells non-negative
+        stride = int(cells[:, 1].max()) + 2
+        keys = cells[:, 0] * stride + cells[:, 1]
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+
+        found_i, found_j = [], []
+        for dx, dy in self._NEIGHBOURS:
+            # Range of sorted points in the neighbouring cell, for every point at once
+            neighbour = keys + dx * stride + dy
+            lo = np.searchsorted(sorted_keys, neighbour, side="left")
+            hi = np.searchsorted(sorted_keys, neighbour, side="right")
+            counts = hi - lo
+            total = int(counts.sum())
+            if not total:
+                continue
+            i = np.repeat(np.arange(len(points)), counts)
+            starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+            j = order[starts + np.arange(total)]
+            keep = i < j if (dx, dy) == (0, 0) else np.ones(total, dtype=bool)
+            found_i.append(i[keep])
+            found_j.append(j[keep])
+
+        if not found_i:
+            return empty, empty
+        i, j = np.concatenate(found_i), np.concatenate(found_j)
+        close = np.sum((points[i] - points[j]) ** 2, axis=1) < self.cell ** 2
+        return i[close], j[close]
+
+
+class SwarmMotion:
+    """Positions of `count` pets driving along one route, all updated in one tick()."""
+
+    def __init__(self, route: Route, count: int, seed: int = None, clock=None,
+                 separation_px: float = config.SWARM_SEPARATION_PX):
+        self.clock = clock or get_clock()
+        self.rng = np.random.default_rng(seed)
+        self.count = count
+        self.separation_px = separation_px
+        self._grid = SpatialHash(separation_px)
+
+        # --- Per-pet state ---
+        variation = config.SWARM_SPEED_VARIATION
+        self.speed = config.DRIVE_SPEED * (1 + self.rng.uniform(-variation, variation, count))   # px/s
+        self.paused_until = np.zeros(count)           # clock ms; pets pose (or are held) until then
+        self.pose = np.full(count, -1)                # index into config.WANDERER_POSES, -1 = driving
+        self.distance = np.zeros(count)               # along the route
+        self.set_route(route)
+
+        # Start spread evenly around the route (a little jitter so they don't look drilled)
+        spacing = self.route.total / max(count, 1)
+        self.distance = self.route_wrap(np.arange(count) * spacing + self.rng.uniform(0, spacing / 2, count))
+        self.segment = self._segment_of(self.distance)
+        self._last_ms = self.clock.now_ms()
+
+    def set_route(self, route: Route):
+        """Drive a different route; pets keep their relative place on it (e.g. after a screen change)."""
+        old_total = getattr(self, "route", None) and self.route.total
+        self.route = route
+        self._lengths = np.array(route.lengths)
+        self._xs = np.array([p.x() for p in route.points])
+        self._ys = np.array([p.y() for p in route.points])
+        self._faces_right = np.array([route.direction_at(d) == "right" for d in route.lengths[:-1]])
+        if old_total:
+            self.distance = self.route_wrap(self.distance * route.total / old_total)
+        self.segment = self._segment_of(self.distance)
+
+    def route_wrap(self, distance: np.ndarray) -> np.ndarray:
+        """Route.normalize for an array of distances."""
+        if self.route.closed:
+            return np.mod(distance, self.route.total) if self.route.total else np.zeros_like(distance)
+        return np.clip(distance, 0.0, self.route.total)
+
+    def _segment_of(self, distance: np.ndarray) -> np.ndarray:
+        """Route.segment_at for an array of distances."""
+        index = np.searchsorted(self._lengths, distance, side="right") - 1
+        return np.clip(index, 0, len(self._lengths) - 2)
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+    def positions(self) -> np.ndarray:
+        """(count, 2) float array of sprite top-left positions."""
+        return np.column_stack((np.interp(self.distance, self._lengths, self._xs),
+                                np.interp(self.distance, self._lengths, self._ys)))
+
+    def animations(self) -> list:
+        """Animation name per pet: its pose, or driving left/right."""
+        driving = np.where(self._faces_right[self.segment], "driving_right", "driving_left")
+        poses = config.WANDERER_POSES
+        return [poses[p] if p >= 0 else d for p, d in zip(self.pose.tolist(), driving.tolist())]
+
+    def tick(self) -> np.ndarray:
+        """Advance every pet by the time since the last tick. Returns positions()."""
+        now = self.clock.now_ms()
+        dt = (now - self._last_ms) / 1000
+        self._last_ms = now
+
+        driving = self.paused_until <= now
+        self.pose[driving] = -1
+        speed = np.where(driving, self.speed, 0.0)
+
+        # Separation: of each close pair, the pet behind slows down for the one ahead
+        i, j = self._grid.pairs(self.positions())
+        if i.size and self.route.total:
+            ahead = self.distance[j] - self.distance[i]          # how far j is in front of i
+            if self.route.closed:
+                ahead = np.mod(ahead, self.route.total)
+                i_trails = ahead < self.route.total / 2
+            else:
+                i_trails = ahead >= 0
+            trailer = np.where(i_trails, i, j)
+            gap = np.abs(np.where(i_trails, ahead, self.route.total - ahead if self.route.closed else ahead))
+            factor = np.clip(gap / self.separation_px, config.SWARM_MIN_SPEED_FACTOR, 1.0)
+            scale = np.ones(self.count)
+            np.minimum.at(scale, trailer, factor)
+            speed *= scale
+
+        self.distance = self.route_wrap(self.distance + speed * dt)
+
+        # Pets that just turned a corner may stop and pose, like the single pet does
+        segment = self._segment_of(self.distance)
+        turned = driving & (segment != self.segment)
+        self.segment = segment
+        posing = turned & (self.rng.random(self.count) < config.POSE_AFTER_DRIVE_CHANCE)
+        n = int(posing.sum())
+        if n:
+            self.pose[posing] = self.rng.integers(len(config.WANDERER_POSES), size=n)
+            self.paused_until[posing] = now + 1000 * self.rng.uniform(
+                config.MIN_POSE_DURATION, config.MAX_POSE_DURATION, n)
+
+        return self.positions()
+
+    def hold(self, index: int):
+        """Stop one pet where it is until it's dropped (e.g. while it's being dragged)."""
+        self.paused_until[index] = np.inf
+
+    def drop(self, index: int, pos):
+        """Put a held pet back on the route at the point nearest pos, and let it drive on."""
+        self.distance[index], _ = self.route.project(pos)
+        self.segment[index] = self._segment_of(self.distance[index:index + 1])[0]
+        self.paused_until[index] = self.clock.now_ms()
+        self.pose[index] = -1
+
+
+class Swarm:
+    """Shows a SwarmMotion: one window per pet, one scheduler job moving them all."""
+
+    def __init__(self, count: int, seed: int = None, scheduler=None):
+        # Import here so SwarmMotion and the benchmark don't pull in the GUI modules
+        from character import Character
+        from screen_geometry import get_screen_geometry
+        from scheduler import get_scheduler
+        from sprite_loader import PRIORITY_MODE
+        from window_manager import PetWindow
+        from mode_manager import MODE_ANIMATIONS
+
+        self.scheduler = scheduler or get_scheduler()
+        self.screens = get_screen_geometry()
+        self.screens.changed.connect(self._on_screens_changed)
+        self.motion = SwarmMotion(self._perimeter_route(), count, seed)
+
+        self.characters = []
+        self.windows = []
+        for index in range(count):
+            character = Character()
+            window = PetWindow(character)
+            window.on_drag_start = lambda index=index: self.motion.hold(index)
+            window.on_dragged = lambda pos, index=index: self.motion.drop(index, pos)
+            self.characters.append(character)
+            self.windows.append(window)
+        # Every pet plays the same animations — loading them once covers all of them
+        self.characters[0].preload(MODE_ANIMATIONS["wanderer"], PRIORITY_MODE)
+
+        self._animations = [None] * count
+        self._positions = [None] * count
+        self._update_pets(self.motion.positions())
+        for window in self.windows:
+            window.show()
+        self.scheduler.every("move", config.MOVEMENT_UPDATE_INTERVAL_MS, self._on_tick, owner=self)
+        print(f"[swarm] {count} pets on a {self.motion.route.total:.0f}px route")
+
+    def _perimeter_route(self) -> Route:
+        screen = self.screens.primary()
+        return Route.rectangle(
+            QRectF(screen.x(), screen.y(),
+                   screen.width() - config.WINDOW_WIDTH, screen.height() - config.WINDOW_HEIGHT),
+            inset=config.ROUTE_INSET,
+        )
+
+    def _on_screens_changed(self):
+        self.motion.set_route(self._perimeter_route())
+
+    def _on_tick(self):
+        self._update_pets(self.motion.tick())
+
+    def _update_pets(self, positions: np.ndarray):
+        """Move windows and switch animations — only for pets where something changed."""
+        held = self.motion.paused_until == np.inf
+        points = np.rint(positions).astype(int).tolist()
+        for index, (name, point) in enumerate(zip(self.motion.animations(), points)):
+            if held[index]:
+                continue  # being dragged — the window is where the mouse put it
+            if name != self._animations[index]:
+                self._animations[index] = name
+                self.characters[index].set_animation(name)
+            if point != self._positions[index]:
+                self._positions[index] = point
+                self.windows[index].move_sprite(QPoint(*point))
+
+    def stop(self):
+        self.scheduler.cancel_owner(self)
+        for window in self.windows:
+            window.close()
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+def _per_pet_tick_cost(route: Route, count: int, ticks: int, screen: QRect) -> float:
+    """CPU seconds per tick for `count` MovementControllers — the one-stack-per-pet way."""
+    from movement import MovementController
+    from simulator import FixedScreens
+
+    clock = VirtualClock()
+    with contextlib.redirect_stdout(io.StringIO()):
+        pets = [MovementController(clock=clock, route=route, screens=FixedScreens([screen]))
+                for _ in range(count)]
+        for pet in pets:
+            pet.start_walking_to_next_corner()
+        started = time.process_time()
+        for _ in range(ticks):
+            clock.advance(config.MOVEMENT_UPDATE_INTERVAL_MS)
+            for pet in pets:
+                _, arrived, _ = pet.update_position()
+                if arrived:
+                    pet.start_walking_to_next_corner()
+        return (time.process_time() - started) / ticks
+
+
+def _swarm_tick_cost(route: Route, count: int, ticks: int) -> float:
+    """CPU seconds per SwarmMotion.tick() for `count` pets."""
+    clock = VirtualClock()
+    motion = SwarmMotion(route, count, seed=0, clock=clock)
+    started = time.process_time()
+    for _ in range(ticks):
+        clock.advance(config.MOVEMENT_UPDATE_INTERVAL_MS)
+        motion.tick()
+    return (time.process_time() - started) / ticks
+
+
+def benchmark(counts=(1, 10, 50, 200), ticks: int = 2000, width: int = 1920, height: int = 1080):
+    """Print CPU per movement tick against pet count, swarm vs. one MovementController per pet."""
+    screen = QRect(0, 0, width, height)
+    route = Route.rectangle(QRectF(0, 0, width - config.WINDOW_WIDTH, height - config.WINDOW_HEIGHT))
+    print(f"CPU per movement tick ({ticks} ticks, {width}x{height} route, "
+          f"separation {config.SWARM_SEPARATION_PX}px):")
+    print("  swarm = one SwarmMotion.tick() incl. separation; per-pet = a MovementController per pet, no separation")
+    print(f"  {'pets':>5}  {'swarm':>10}  {'per-pet':>10}  {'per pet (swarm)':>16}")
+    for count in counts:
+        swarm_s = _swarm_tick_cost(route, count, ticks)
+        per_pet_s = _per_pet_tick_cost(route, count, max(ticks // max(count // 10, 1), 50), screen)
+        print(f"  {count:>5}  {swarm_s * 1e6:>8.1f}µs  {per_pet_s * 1e6:>8.1f}µs  "
+              f"{swarm_s / count * 1e6:>14.2f}µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Swarm mode movement benchmark.")
+    parser.add_argument("--bench", action="store_true", help="report CPU per tick at 1/10/50/200 pets")
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--ticks", type=int, default=2000)
+    args = parser.parse_args()
+    if not args.bench:
+        parser.print_help()
+        return
+    benchmark(args.counts, args.ticks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+# usage_store.py
+# ---------------------------------------------------------------------------
+# How long each app was in front, for the "Today's stats" report.
+#
+# UsageRecorder is fed by the app monitor (AppMonitorThread.window_changed)
+# while supervisor mode runs. It never writes on a switch. Time in front is
+# added to per-(hour, app) totals in memory, so a busy hour of alt-tabbing
+# between five apps is five rows, not thousands of events. The totals are
+# written in one transaction USAGE_FLUSH_INTERVAL_MS after a switch (sooner
+# if more than USAGE_FLUSH_MAX_PENDING rows are waiting) and when the app
+# quits. Time in the app still in front goes in with whichever comes next,
+# so sitting in one app doesn't wake the pet to write anything.
+#
+# UsageStore keeps only those hourly aggregates, in SQLite in WAL mode
+# (synchronous=NORMAL: a flush appends to the log without waiting on an
+# fsync). The table is keyed by (hour, app), so "today" is a range scan
+# over today's rows however many months are stored. Hours are local
+# clock hours, stamped with the Unix time they start at.
+#
+# An app is the foreground window's program (see process_identity.py), or
+# its title when the program isn't known. Time counts while the window is in
+# front, whether or not anyone is at the keyboard.
+#
+#   python usage_store.py            today's stats from the real database
+#   python usage_store.py --bench    query/flush timings on months of synthetic data
+# ---------------------------------------------------------------------------
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+from PyQt6.QtCore import QCoreApplication
+
+import config
+
+
+def hour_start(timestamp: float) -> int:
+    """Unix time of the start of the local clock hour containing timestamp."""
+    return int(datetime.fromtimestamp(timestamp).replace(minute=0, second=0, microsecond=0).timestamp())
+
+
+def day_start(timestamp: float) -> int:
+    """Unix time of local midnight before timestamp."""
+    return int(datetime.fromtimestamp(timestamp).replace(hour=0, minute=0, second=0, microsecond=0).timestamp())
+
+
+def split_by_hour(start: float, end: float):
+    """Yield (hour_start, seconds) for each local hour the span [start, end) covers."""
+    while start < end:
+        hour = hour_start(start)
+        boundary = min(end, hour + 3600)
+        if boundary <= start:   # a DST jump — don't loop
+            boundary = end
+        yield hour, boundary - start
+        start = boundary
+
+
+def format_duration(seconds: float) -> str:
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return f"{minutes}m" if minutes else f"{int(seconds)}s"
+    return f"{minutes // 60}h {minutes % 60:02d}m"
+
+
+def format_stats(stats: list, limit: int = 10) -> str:
+    """Text report of today_stats() output, longest first."""
+    if not stats:
+        return "Nothing recorded yet today."
+    total = sum(seconds for _, seconds, _ in stats)
+    lines = [f"{format_duration(total)} in front of {len(stats)} apps today", ""]
+    for app, seconds, switches in stats[:limit]:
+        lines.append(f"{format_duration(seconds):>7}  {app}  ({switches}×)")
+    if len(stats) > limit:
+        rest = sum(seconds for _, seconds, _ in stats[limit:])
+        lines.append(f"{format_duration(rest):>7}  {len(stats) - limit} others")
+    return "\n".join(lines)
+
+
+class UsageStore:
+    """Hourly per-app totals in SQLite. Opened on first use."""
+
+    def __init__(self, path: str = None):
+        self.path = path or config.USAGE_DB_FILE
+        self._db = None
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+    def add(self, totals: dict):
+        """Add {(hour, app): [seconds, switches]} to the stored totals, in one transaction."""
+        db = self._connect()
+        with db:
+            db.executemany(
+                "INSERT INTO usage_hourly (hour, app, seconds, switches) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (hour, app) DO UPDATE SET "
+                "seconds = seconds + excluded.seconds, switches = switches + excluded.switches",
+                [(hour, app, seconds, switches) for (hour, app), (seconds, switches) in totals.items()],
+            )
+
+    def totals(self, start: float, end: float = None) -> dict:
+        """{app: [seconds, switches]} over the hours starting in [start, end)."""
+        query, params = "SELECT app, SUM(seconds), SUM(switches) FROM usage_hourly WHERE hour >= ?", [int(start)]
+        if end is not None:
+            query += " AND hour < ?"
+            params.append(int(end))
+        rows = self._connect().execute(query + " GROUP BY app", params)
+        return {app: [seconds, switches] for app, seconds, switches in rows}
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.path)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS usage_hourly ("
+                "  hour INTEGER NOT NULL,"       # Unix time the local hour starts
+                "  app TEXT NOT NULL,"
+                "  seconds REAL NOT NULL,"
+                "  switches INTEGER NOT NULL,"   # times the app came to the front
+                "  PRIMARY KEY (hour, app)"
+                ") WITHOUT ROWID"
+            )
+            self._db = db
+        return self._db
+
+
+class UsageRecorder:
+    """Turns foreground-window changes into hourly totals, written to a UsageStore in batches."""
+
+    def __init__(self, store: UsageStore = None, scheduler=None,
+                 flush_ms: int = None, max_pending: int = None):
+        from scheduler import get_scheduler
+
+        self.store = store or UsageStore()
+        self.scheduler = scheduler or get_scheduler()
+        self.flush_ms = config.USAGE_FLUSH_INTERVAL_MS if flush_ms is None else flush_ms
+        self.max_pending = config.USAGE_FLUSH_MAX_PENDING if max_pending is None else max_pending
+
+        self._app = None            # app in front, as last reported
+        self._since = None          # when its time started counting (None: not counting)
+        self._paused = False        # between pause() and resume(): nothing is counted
+        self._pending = {}          # (hour, app) -> [seconds, switches] not yet written
+
+        # --- Stats ---
+        self.flushes = 0
+        self.rows_written = 0
+
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.close)
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+    def record(self, window: tuple):
+        """The foreground window changed to (title, program)."""
+        title, program = window
+        app = program or title.strip() or None
+        if self._paused:
+            # e.g. a check still running when supervisor mode ended — remember it for resume()
+            self._app = app
+            return
+        if app == self._app and self._since is not None:
+            return
+        now = time.time()
+        self._close_span(now)
+        self._app = app
+        if app is not None:
+            self._since = now
+            self._add(hour_start(now), app, 0.0, 1)
+        if len(self._pending) >= self.max_pending:
+            self.flush()
+        else:
+            self._schedule_flush()
+
+    def pause(self):
+        """Stop counting (supervisor mode off) — the app in front is remembered for resume()."""
+        self._paused = True
+        self._close_span(time.time())
+        self._schedule_flush()
+
+    def resume(self):
+        """Count the remembered app again (supervisor mode back on, same window in front)."""
+        self._paused = False
+        if self._app is not None and self._since is None:
+            self._since = time.time()
+
+    def flush(self):
+        """Write everything counted so far (including the running span) in one transaction."""
+        self.scheduler.cancel("flush", owner=self)
+        if self._since is not None:
+            now = time.time()
+            self._close_span(now)
+            self._since = now
+        if self._pending:
+            try:
+                self.store.add(self._pending)
+            except (sqlite3.Error, OSError) as error:   # OSError: the data folder can't be created
+                print(f"[usage_store] Flush failed, will retry: {error}")
+            else:
+                self.flushes += 1
+                self.rows_written += len(self._pending)
+                self._pending = {}
+        self._schedule_flush()
+
+    def close(self):
+        """Final flush and close (on quit)."""
+        self.pause()
+        self.flush()
+        self.scheduler.cancel_owner(self)
+        self.store.close()
+
+    def today_stats(self, now: float = None) -> list:
+        """[(app, seconds, switches), ...] for today so far, longest first — stored plus unwritten."""
+        now = time.time() if now is None else now
+        midnight = day_start(now)
+        totals = self.store.totals(midnight)
+        for (hour, app), (seconds, switches) in self._pending.items():
+            if hour >= midnight:
+                entry = totals.setdefault(app, [0.0, 0])
+                entry[0] += seconds
+                entry[1] += switches
+        if self._since is not None:
+            entry = totals.setdefault(self._app, [0.0, 0])
+            entry[0] += max(0.0, now - max(self._since, midnight))
+        return sorted(((app, seconds, switches) for app, (seconds, switches) in totals.items()),
+                      key=lambda row: row[1], reverse=True)
+
+    def summary(self) -> str:
+        return f"{self.flushes} flushes, {self.rows_written} rows written, {len(self._pending)} pending"
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+    def _close_span(self, now: float):
+        """Add the running span's time up to now to the hourly totals, and stop it."""
+        if self._since is None:
+            return
+        for hour, seconds in split_by_hour(self._since, now):   # nothing if the clock went back
+            self._add(hour, self._app, seconds, 0)
+        self._since = None
+
+    def _add(self, hour: int, app: str, seconds: float, switches: int):
+        entry = self._pending.setdefault((hour, app), [0.0, 0])
+        entry[0] += seconds
+        entry[1] += switches
+
+    def _schedule_flush(self):
+        """Flush after flush_ms — only when a switch left totals to write, so an idle pet never wakes."""
+        if self._pending and not self.scheduler.is_scheduled("flush", owner=self):
+            self.scheduler.schedule("flush", self.flush_ms, self.flush, owner=self)
+
+
+# ---------------------------------------------------------------------------
+# Report and benchmark
+# ---------------------------------------------------------------------------
+def _bench(days: int, apps: int = 40, seed: int = 0):
+    """Fill a temporary store with `days` of hourly rows, then time flushes and today's query."""
+    rng = random.Random(seed)
+    names = [f"app{index:02d}" for index in range(apps)]
+    now = time.time()
+    with tempfile.TemporaryDirectory() as directory:
+        store = UsageStore(os.path.join(directory, "usage.sqlite3"))
+        started = time.perf_counter()
+        for day in range(days, -1, -1):
+            midnight = day_start(now - day * 86400)
+            totals = {}
+            for hour in range(8, 22):   # a working day, six apps an hour
+                for app in rng.sample(names, 6):
+                    totals[(midnight + hour * 3600, app)] = [rng.uniform(60, 1200), rng.randint(1, 30)]
+            store.add(totals)
+        fill_s = time.perf_counter() - started
+        rows = store._connect().execute("SELECT COUNT(*) FROM usage_hourly").fetchone()[0]
+
+        recorder = UsageRecorder(store, scheduler=_offline_scheduler())
+        started = time.perf_counter()
+        for _ in range(100):
+            recorder.today_stats(now)
+        query_ms = (time.perf_counter() - started) / 100 * 1000
+
+        flush_ms = []
+        for _ in range(50):
+            recorder._pending = {(hour_start(now), rng.choice(names)): [30.0, 1] for _ in range(6)}
+            started = time.perf_counter()
+            recorder.flush()
+            flush_ms.append((time.perf_counter() - started) * 1000)
+        size = os.path.getsize(store.path) + os.path.getsize(store.path + "-wal")
+        store.close()
+
+    print(f"{days} days, {rows} hourly rows ({size / 1024:.0f} KiB incl. WAL), filled in {fill_s:.2f}s")
+    print(f"  today_stats(): {query_ms:.2f}ms")
+    print(f"  flush of 6 rows: median {sorted(flush_ms)[len(flush_ms) // 2]:.2f}ms, max {max(flush_ms):.2f}ms")
+
+
+def _offline_scheduler():
+    """A scheduler nothing runs — flushes are called directly."""
+    from clock import VirtualClock
+    from scheduler import Scheduler
+
+    return Scheduler(clock=VirtualClock(), use_timer=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Today's app usage, or a benchmark of the usage store.")
+    parser.add_argument("--bench", action="store_true", help="time queries on synthetic data instead")
+    parser.add_argument("--days", type=int, default=180)
+    args = parser.parse_args()
+
+    if args.bench:
+        _bench(args.days)
+        return
+    if not os.path.exists(config.USAGE_DB_FILE):
+        print(f"No usage recorded yet ({config.USAGE_DB_FILE}).")
+        return
+    store = UsageStore()
+    print(format_stats(UsageRecorder(store, scheduler=_offline_scheduler()).today_stats()))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,40 +9,101 @@
 #   - Can be dragged around the desktop by clicking and dragging.
 #   - Repaints itself whenever character.py signals a new animation frame.
 #   - Can show/hide a speech bubble above the character.
+#
+# The window is only as big as what it shows: the sprite, plus the speech
+# bubble while one is up. Positions are tracked for the SPRITE (its top-left
+# corner on screen — see sprite_pos() / move_sprite()); the window geometry
+# is derived from that, so the sprite stays put when a bubble appears.
+# Clicks pass through transparent pixels: the window mask is a coarse alpha
+# region of the current frame (precomputed once per sprite), plus the bubble.
+#
+# Repainting is damage-tracked: a new frame repaints only the sprite rect,
+# a bubble change repaints only the old and new bubble areas, and nothing
+# that doesn't change what's on screen triggers a repaint at all. The bubble
+# layout is computed when its text or the sprite position changes, not per
+# paint, and the bubble itself is rendered once into a pixmap per (text,
+# placement, DPR) and kept in a small LRU — painting it is one drawPixmap.
+# Set config.DEBUG_REPAINT_OVERLAY to see the repainted pixels/second.
 # ---------------------------------------------------------------------------
 
-from PyQt6.QtWidgets import QWidget, QApplication
-from PyQt6.QtGui import QPainter, QColor, QFont, QFontMetrics
-from PyQt6.QtCore import Qt, QPoint, QRect
+from collections import OrderedDict
+from typing import NamedTuple
+
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtGui import QPainter, QPainterPath, QColor, QFont, QFontMetrics, QRegion, QPixmap, QImage
+from PyQt6.QtCore import Qt, QPoint, QRect, QRectF, QTimer
 
 import config
 from character import Character
+from perf_stats import RepaintStats
+from screen_geometry import get_screen_geometry
+
+
+class BubbleLayout(NamedTuple):
+    """Where the speech bubble goes, in screen coordinates."""
+    text: str
+    rect: QRect             # the bubble body
+    tail_x: int             # where the tail meets the bubble
+    tail_y: int
+    tail_direction: str     # "down", "up", "left" or "right" — towards the character
+    bounds: QRect           # everything the bubble paints, tail and puffs included
 
 
 class PetWindow(QWidget):
     """The transparent, frameless, always-on-top window for the desktop pet."""
 
+    # Sprite masks are shared by every window (swarm mode shows the same frames many times over)
+    _sprite_masks = OrderedDict()           # (pixmap cacheKey, source rect) -> QRegion in sprite coordinates, LRU order
+
     def __init__(self, character: Character):
         super().__init__()
         self.character = character
 
+        # --- Geometry: the sprite's screen position drives everything else ---
+        self._sprite_pos = QPoint(0, 0)     # sprite top-left, in screen coordinates
+        self._content_rect = QRect()        # sprite + bubble, in screen coordinates = window geometry
+        self._laid_out_sprite = QRect()     # the sprite's rect in window coordinates, as of the last layout
+
+        # --- Input/shape mask: coarse alpha region per sprite, computed once (see _sprite_masks) ---
+        self._mask = None                   # the mask currently applied to the window
+
+        # --- Screens: bubble placement depends on which one the sprite is on ---
+        self._screens = get_screen_geometry()
+        self._screens.changed.connect(self._on_screens_changed)
+
         # --- Drag state ---
-        self._drag_offset = QPoint(0, 0)
+        self._drag_offset = QPoint(0, 0)    # cursor position relative to the sprite's top-left
         self._is_dragging = False
 
         # --- Speech bubble state ---
         self._bubble_text = None    # None = bubble is hidden, string = bubble is showing
+        self._bubble_layout = None  # BubbleLayout while showing, recomputed only when it can change
+        self._bubble_font = QFont("Comic Sans MS", 12, QFont.Weight.Bold)
+        self._bubble_metrics = QFontMetrics(self._bubble_font)
+        self._bubble_size = None    # (width, height) of the bubble body for the current text
+        self._bubble_pixmaps = OrderedDict()   # (text, tail_direction, dpr) -> pre-rendered QPixmap, LRU order
+
+        # --- Repaint accounting (see config.DEBUG_REPAINT_OVERLAY) ---
+        self.repaint_stats = RepaintStats()
+        self._overlay_rect = QRect(4, 4, 160, 16)
         
         # --- Callbacks for drag events ---
         self.on_drag_start = None   # Called when drag begins
         self.on_dragged = None      # Called when drag ends (release)
 
-        # Connect to character's animation — repaint every time a new frame arrives
-        self.character.on_frame_changed = self.update
+        # Connect to character's animation — repaint the sprite every time a new frame arrives
+        self.character.on_frame_changed = self._on_frame_changed
 
         self._setup_window()
         self._set_starting_position()
 
+        # The overlay is the one thing that changes without anything else changing,
+        # so it gets its own small once-a-second repaint.
+        if config.DEBUG_REPAINT_OVERLAY:
+            self._overlay_timer = QTimer(self)
+            self._overlay_timer.timeout.connect(lambda: self.update(self._overlay_rect))
+            self._overlay_timer.start(1000)
+
     # ------------------------------------------------------------------
     # Window setup
     # ------------------------------------------------------------------
@@ -75,92 +136,256 @@ class PetWindow(QWidget):
                 pass  # AppKit not available — default flags still work fine
 
         self.setWindowTitle("Desktop Pet")
-        self.setFixedSize(900, 900)
 
     def _set_starting_position(self):
-        """Place the window at the configured starting position, or centre it."""
+        """Place the sprite at the configured starting position, or centre it."""
         if config.WINDOW_START_X is not None and config.WINDOW_START_Y is not None:
-            self.move(config.WINDOW_START_X, config.WINDOW_START_Y)
+            self.move_sprite(QPoint(config.WINDOW_START_X, config.WINDOW_START_Y))
         else:
-            screen_geom = QApplication.primaryScreen().geometry()
-            x = (screen_geom.width() - config.WINDOW_WIDTH) // 2
-            y = (screen_geom.height() - config.WINDOW_HEIGHT) // 2
-            self.move(x, y)
+            screen_geom = self._screens.primary()
+            x = screen_geom.x() + (screen_geom.width() - config.WINDOW_WIDTH) // 2
+            y = screen_geom.y() + (screen_geom.height() - config.WINDOW_HEIGHT) // 2
+            self.move_sprite(QPoint(x, y))
+
+    # ------------------------------------------------------------------
+    # Position — public interface for mode_manager
+    # ------------------------------------------------------------------
+    def sprite_pos(self) -> QPoint:
+        """Screen position of the sprite's top-left corner."""
+        return QPoint(self._sprite_pos)
+
+    def move_sprite(self, pos: QPoint):
+        """Move the character so its sprite's top-left corner is at pos (screen coordinates)."""
+        if pos == self._sprite_pos and self._content_rect.isValid():
+            return
+        self._sprite_pos = QPoint(pos)
+        self._relayout_bubble()
 
     # ------------------------------------------------------------------
     # Speech bubble — public interface for mode_manager
     # ------------------------------------------------------------------
     def show_speech_bubble(self, text: str):
         """Show a speech bubble with the given text above the character."""
+        if text == self._bubble_text:
+            return  # already showing exactly this — nothing to repaint
         self._bubble_text = text
-        self.update()
+        self._bubble_size = self._measure_bubble(text)
+        self._relayout_bubble()
 
     def hide_speech_bubble(self):
         """Hide the speech bubble."""
+        if self._bubble_text is None:
+            return
         self._bubble_text = None
-        self.update()
+        self._relayout_bubble()
+
+    # ------------------------------------------------------------------
+    # Damage tracking — only repaint what changed
+    # ------------------------------------------------------------------
+    def _sprite_screen_rect(self) -> QRect:
+        """Where the character is drawn, in screen coordinates."""
+        return QRect(self._sprite_pos.x(), self._sprite_pos.y(), config.WINDOW_WIDTH, config.WINDOW_HEIGHT)
+
+    def _sprite_rect(self) -> QRect:
+        """Where the character is drawn, in window coordinates."""
+        return self._sprite_screen_rect().translated(-self._content_rect.topLeft())
+
+    def _on_frame_changed(self):
+        """The character's frame changed — the sprite is the only thing that moved."""
+        self.update(self._sprite_rect())
+        self._update_mask()
+
+    def _relayout_bubble(self):
+        """
+        Recompute where the bubble goes, resize the window around the sprite and
+        bubble, and repaint whatever changed. Called when the text changes and when
+        the sprite moves (placement depends on where the character is on screen).
+
+        A plain move with the same layout only moves the window — no repaint,
+        and the mask (in window coordinates) is left alone. A resize repaints the
+        (small) window anyway; otherwise only the old and new bubble areas are
+        repainted.
+        """
+        old_origin = self._content_rect.topLeft()
+        old_bubble = self._local_bubble_bounds(self._bubble_layout, old_origin)
+        old_sprite = self._laid_out_sprite   # _sprite_pos may already be the new position
+
+        self._bubble_layout = self._layout_bubble() if self._bubble_text else None
+        content = self._sprite_screen_rect()
+        if self._bubble_layout is not None:
+            content = content.united(self._bubble_layout.bounds)
+
+        resized = content.size() != self._content_rect.size()
+        self._content_rect = content
+        if content != self.geometry():
+            self.setGeometry(content)
+
+        new_bubble = self._local_bubble_bounds(self._bubble_layout, content.topLeft())
+        new_sprite = self._laid_out_sprite = self._sprite_rect()
+        if new_bubble != old_bubble or new_sprite != old_sprite:
+            self._update_mask()
+        if resized:
+            return
+
+        damage = QRegion()
+        if new_bubble != old_bubble:
+            damage += QRegion(old_bubble) + QRegion(new_bubble)
+        if new_sprite != old_sprite:
+            damage += QRegion(old_sprite) + QRegion(new_sprite)
+        if not damage.isEmpty():
+            self.update(damage)
+
+    def _on_screens_changed(self):
+        """A screen was plugged, unplugged or resized — the bubble may need to flip sides."""
+        if self._bubble_text:
+            self._relayout_bubble()
+
+    @staticmethod
+    def _local_bubble_bounds(layout: BubbleLayout | None, origin: QPoint) -> QRect:
+        """A bubble layout's bounds in window coordinates (empty if there's no bubble)."""
+        return layout.bounds.translated(-origin) if layout is not None else QRect()
+
+    # ------------------------------------------------------------------
+    # Input/shape mask — clicks pass through transparent pixels
+    # ------------------------------------------------------------------
+    def _update_mask(self):
+        """Mask the window to the current frame's opaque area plus the bubble."""
+        if not config.WINDOW_MASK_ENABLED:
+            return
+
+        pixmap, source = self.character.get_frame()
+        mask = self._sprite_mask(pixmap, source).translated(self._sprite_rect().topLeft())
+        if self._bubble_layout is not None:
+            mask += QRegion(self._local_bubble_bounds(self._bubble_layout, self._content_rect.topLeft()))
+
+        if mask != self._mask:
+            self._mask = mask
+            self.setMask(mask)
+
+    def _sprite_mask(self, pixmap: QPixmap, source: QRect) -> QRegion:
+        """
+        Coarse alpha region of one sprite, in sprite (logical) coordinates.
+        The sprite is shrunk so each pixel covers a WINDOW_MASK_CELL square;
+        any cell with visible pixels is included, so the region is conservative
+        (never clips anything drawn). Computed once per sprite and cached — the
+        last WINDOW_MASK_CACHE_SIZE, since a reloaded atlas brings new cacheKeys.
+        """
+        key = (pixmap.cacheKey(), source.x(), source.y(), source.width(), source.height())
+        region = self._sprite_masks.get(key)
+        if region is not None:
+            self._sprite_masks.move_to_end(key)
+            return region
+
+        cell = config.WINDOW_MASK_CELL
+        cols = -(-config.WINDOW_WIDTH // cell)
+        rows = -(-config.WINDOW_HEIGHT // cell)
+        # Smooth downscaling averages each cell, so a cell with any visible pixel stays non-zero
+        small = pixmap.copy(source).toImage().scaled(
+            cols, rows, Qt.AspectRatioMode.IgnoreAspectRatio,
+            Qt.TransformationMode.SmoothTransformation,
+        ).convertToFormat(QImage.Format.Format_Alpha8)
+
+        region = QRegion()
+        bits = small.constBits()
+        bits.setsize(small.sizeInBytes())
+        data = bytes(bits)
+        for row in range(rows):
+            line = data[row * small.bytesPerLine():row * small.bytesPerLine() + cols]
+            col = 0
+            while col < cols:
+                if not line[col]:
+                    col += 1
+                    continue
+                start = col
+                while col < cols and line[col]:
+                    col += 1
+                region += QRegion(start * cell, row * cell, (col - start) * cell, cell)
+
+        self._sprite_masks[key] = region
+        while len(self._sprite_masks) > config.WINDOW_MASK_CACHE_SIZE:
+            self._sprite_masks.popitem(last=False)
+        return region
 
     # ------------------------------------------------------------------
     # Painting
     # ------------------------------------------------------------------
+    @staticmethod
+    def _region_area(region: QRegion) -> int:
+        """
+        Pixels in a region — the sum of its rects, not its bounding rect (a sprite
+        and a bubble on opposite corners aren't the whole window). PyQt6 doesn't
+        expose QRegion's rects, but QPainterPath.addRegion() adds each one as a
+        five-element closed subpath, starting at its top-left corner.
+        """
+        if region.rectCount() <= 1:
+            bounds = region.boundingRect()
+            return bounds.width() * bounds.height()
+        path = QPainterPath()
+        path.addRegion(region)
+        area = 0
+        for index in range(0, path.elementCount(), 5):
+            top_left, bottom_right = path.elementAt(index), path.elementAt(index + 2)
+            area += int((bottom_right.x - top_left.x) * (bottom_right.y - top_left.y))
+        return area
+
     def paintEvent(self, event):
-        """Draw the character and optionally the speech bubble."""
+        """Draw the character and optionally the speech bubble — only where damaged."""
         painter = QPainter(self)
-
-        # Character draws at the center of the window
-        char_x = (self.width() - config.WINDOW_WIDTH) // 2
-        char_y = (self.height() - config.WINDOW_HEIGHT) // 2
-        painter.drawPixmap(char_x, char_y, self.character.get_pixmap())
+        damaged = event.region()
+        self.repaint_stats.record(self._region_area(damaged))
+
+        # The frame may be a sub-rect of an atlas sheet, so draw just that part.
+        sprite_rect = self._sprite_rect()
+        if damaged.intersects(sprite_rect):
+            pixmap, source = self.character.get_frame()
+            dpr = pixmap.devicePixelRatio()
+            target = QRectF(sprite_rect.x(), sprite_rect.y(),
+                            source.width() / dpr, source.height() / dpr)
+            painter.drawPixmap(target, pixmap, QRectF(source))
 
         # Draw speech bubble around the character if visible
-        if self._bubble_text:
-            self._paint_bubble(painter, char_x, char_y)
+        origin = self._content_rect.topLeft()
+        bubble_bounds = self._local_bubble_bounds(self._bubble_layout, origin)
+        if damaged.intersects(bubble_bounds):
+            painter.drawPixmap(bubble_bounds.topLeft(), self._bubble_pixmap(self._bubble_layout))
+
+        if config.DEBUG_REPAINT_OVERLAY:
+            self._paint_repaint_overlay(painter)
 
         painter.end()
 
-    def _paint_bubble(self, painter: QPainter, char_x: int, char_y: int):
+    def _layout_bubble(self) -> BubbleLayout:
         """
-        Draw a white speech bubble with a tail pointing to the character.
+        Work out where the speech bubble goes, in screen coordinates — computed
+        when the text or the sprite position changes, not on every paint.
         The bubble auto-sizes based on text length.
         Places bubble around the character using priority: above > left > right > below.
         """
-        # --- Measure the text so we can size the bubble ---
-        font = QFont("Comic Sans MS", 12, QFont.Weight.Bold)
-        painter.setFont(font)
-        metrics = QFontMetrics(font)
-        # Use 350px max width - wide enough for longest messages on one line
-        text_rect = metrics.boundingRect(0, 0, 350, 200,
-                                         Qt.TextFlag.TextWordWrap, self._bubble_text)
-        bubble_w = text_rect.width() + 40  # padding for cloud puffs
-        bubble_h = text_rect.height() + 28
+        char_x, char_y = self._sprite_pos.x(), self._sprite_pos.y()
 
-        # --- Calculate character's center in screen coordinates ---
-        char_center_screen_x = self.x() + char_x + config.WINDOW_WIDTH // 2
-        char_center_screen_y = self.y() + char_y + config.WINDOW_HEIGHT // 2
+        bubble_w, bubble_h = self._bubble_size
 
-        # --- Get screen bounds ---
-        screen = QApplication.primaryScreen().geometry()
-        screen_w = screen.width()
-        screen_h = screen.height()
+        # --- Get bounds of the screen the character is on ---
+        screen = self._screens.nearest(self._sprite_screen_rect().center())
 
         # --- Calculate where bubble WOULD be placed in each direction ---
         # Then check if that placement would stay on-screen
         
         # Above: bubble top would be at char_y - bubble_h - 15
-        bubble_top_if_above = self.y() + char_y - bubble_h - 15
-        can_fit_above = bubble_top_if_above >= 0
+        bubble_top_if_above = char_y - bubble_h - 15
+        can_fit_above = bubble_top_if_above >= screen.top()
         
         # Left: bubble left edge would be at char_x - bubble_w - 15
-        bubble_left_if_left = self.x() + char_x - bubble_w - 15
-        can_fit_left = bubble_left_if_left >= 0
+        bubble_left_if_left = char_x - bubble_w - 15
+        can_fit_left = bubble_left_if_left >= screen.left()
         
         # Right: bubble right edge would be at char_x + WINDOW_WIDTH + 15 + bubble_w
-        bubble_right_if_right = self.x() + char_x + config.WINDOW_WIDTH + 15 + bubble_w
-        can_fit_right = bubble_right_if_right <= screen_w
+        bubble_right_if_right = char_x + config.WINDOW_WIDTH + 15 + bubble_w
+        can_fit_right = bubble_right_if_right <= screen.right() + 1
         
         # Below: bubble bottom would be at char_y + WINDOW_HEIGHT + 15 + bubble_h
-        bubble_bottom_if_below = self.y() + char_y + config.WINDOW_HEIGHT + 15 + bubble_h
-        can_fit_below = bubble_bottom_if_below <= screen_h
+        bubble_bottom_if_below = char_y + config.WINDOW_HEIGHT + 15 + bubble_h
+        can_fit_below = bubble_bottom_if_below <= screen.bottom() + 1
 
         # --- Decide placement using priority order: above > left > right > below ---
         
@@ -193,6 +418,59 @@ class PetWindow(QWidget):
             tail_y = bubble_y
             tail_direction = "up"
 
+        # Everything _paint_bubble touches: the body plus its edge puffs
+        # (up to half a puff outside), plus the tail puffs (within 25px of the tail point).
+        bubble_rect = QRect(bubble_x, bubble_y, bubble_w, bubble_h)
+        puff_margin = bubble_h // 6 + 2
+        bounds = bubble_rect.adjusted(-puff_margin, -puff_margin, puff_margin, puff_margin)
+        bounds = bounds.united(QRect(tail_x - 25, tail_y - 25, 50, 50))
+
+        return BubbleLayout(self._bubble_text, bubble_rect, tail_x, tail_y, tail_direction, bounds)
+
+    def _measure_bubble(self, text: str) -> tuple:
+        """Size (width, height) of the bubble body for some text. Done once per text shown."""
+        # Use 350px max width - wide enough for longest messages on one line
+        text_rect = self._bubble_metrics.boundingRect(0, 0, 350, 200,
+                                                      Qt.TextFlag.TextWordWrap, text)
+        bubble_w = text_rect.width() + 40  # padding for cloud puffs
+        bubble_h = text_rect.height() + 28
+        return bubble_w, bubble_h
+
+    def _bubble_pixmap(self, layout: BubbleLayout) -> QPixmap:
+        """
+        The bubble rendered into a transparent pixmap covering layout.bounds.
+        The drawing only depends on the text and which way the tail points
+        (not where on screen it is), so renders are cached under those plus the DPR.
+        """
+        dpr = self.devicePixelRatioF()
+        key = (layout.text, layout.tail_direction, dpr)
+        pixmap = self._bubble_pixmaps.get(key)
+        if pixmap is not None:
+            self._bubble_pixmaps.move_to_end(key)
+            return pixmap
+
+        bounds = layout.bounds
+        pixmap = QPixmap(round(bounds.width() * dpr), round(bounds.height() * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(pixmap)
+        painter.translate(-bounds.topLeft())
+        self._paint_bubble(painter, layout)
+        painter.end()
+
+        self._bubble_pixmaps[key] = pixmap
+        while len(self._bubble_pixmaps) > config.BUBBLE_CACHE_SIZE:
+            self._bubble_pixmaps.popitem(last=False)
+        return pixmap
+
+    def _paint_bubble(self, painter: QPainter, layout: BubbleLayout):
+        """Draw a white speech bubble with a tail pointing to the character."""
+        bubble_x, bubble_y = layout.rect.x(), layout.rect.y()
+        bubble_w, bubble_h = layout.rect.width(), layout.rect.height()
+        tail_x, tail_y = layout.tail_x, layout.tail_y
+        tail_direction = layout.tail_direction
+        painter.setFont(self._bubble_font)
+
         # --- Draw cute fluffy cloud bubble ---
         # Cloud made of overlapping circles in soft pastel color
         cloud_color = QColor(255, 240, 245, 240)  # soft pink tint
@@ -214,8 +492,6 @@ class PetWindow(QWidget):
         painter.drawEllipse(bubble_x + bubble_w - circle_size * 3 // 4, bubble_y + bubble_h - circle_size * 3 // 4, circle_size, circle_size)
 
         # --- Draw cute fluffy tail (cloud puffs creating path to character) ---
-        from PyQt6.QtGui import QPolygon
-        
         if tail_direction == "down":
             # Cloud puffs descending from bubble to character
             puff1_x, puff1_y = tail_x, tail_y + 2
@@ -254,15 +530,22 @@ class PetWindow(QWidget):
         painter.drawText(
             QRect(bubble_x + 15, bubble_y + 12, bubble_w - 30, bubble_h - 24),
             Qt.TextFlag.TextWordWrap | Qt.AlignmentFlag.AlignCenter,
-            self._bubble_text
+            layout.text
         )
 
+    def _paint_repaint_overlay(self, painter: QPainter):
+        """Debug: repainted pixels per second, in the top-left corner."""
+        painter.setPen(QColor(255, 0, 0))
+        painter.setFont(QFont("monospace", 9))
+        painter.drawText(self._overlay_rect, Qt.AlignmentFlag.AlignLeft,
+                         f"{self.repaint_stats.pixels_per_second:,.0f} px/s")
+
     # ------------------------------------------------------------------
     # Dragging
     # ------------------------------------------------------------------
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
-            self._drag_offset = event.position().toPoint()
+            self._drag_offset = event.globalPosition().toPoint() - self._sprite_pos
             self._is_dragging = True
             
             # Notify drag start - show dragged_by_ear animation
@@ -276,7 +559,7 @@ class PetWindow(QWidget):
     def mouseMoveEvent(self, event):
         if event.buttons() & Qt.MouseButton.LeftButton and self._is_dragging:
             new_pos = event.globalPosition().toPoint() - self._drag_offset
-            self.move(new_pos)
+            self.move_sprite(new_pos)
             # Keep dragged animation playing during entire drag
             event.accept()
         else:
@@ -287,7 +570,7 @@ class PetWindow(QWidget):
             # Only call on_dragged callback when drag ENDS (mouse released)
             # This triggers the return-to-edge behavior
             if self._is_dragging and self.on_dragged:
-                self.on_dragged(self.pos())
+                self.on_dragged(self.sprite_pos())
             
             self._is_dragging = False
             event.accept()
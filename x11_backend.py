@@ -0,0 +1,238 @@
+# x11_backend.py
+# ---------------------------------------------------------------------------
+# Linux (X11) side of the app monitor, via python-xlib.
+#
+# X11ActiveWindow answers "what's in front?" the way a window manager
+# publishes it (EWMH): _NET_ACTIVE_WINDOW on the root window, then the
+# window's _NET_WM_NAME (UTF-8, falling back to WM_NAME), WM_CLASS and
+# _NET_WM_PID (the owning process, for process_identity.py).
+#   - One display connection is opened and kept, not one per query (and no
+#     xprop/xdotool subprocesses). Xlib connections aren't thread-safe, so
+#     get_active_window() keeps one per thread.
+#   - Atoms are interned once per connection.
+#   - A window can close between reading _NET_ACTIVE_WINDOW and reading its
+#     title: that BadWindow just means "nothing in front right now". A lost
+#     connection is dropped and reopened on the next query.
+#
+# X11FocusEvents listens for focus changes instead of polling: it selects
+# PropertyNotify on the root window and reports when the window manager
+# updates _NET_ACTIVE_WINDOW (EWMH), or when the active window retitles
+# itself (_NET_WM_NAME / WM_NAME — e.g. switching browser tabs). Events are
+# read when the display socket becomes readable (a QSocketNotifier), so
+# nothing runs while the user isn't switching windows.
+#
+# Works on any EWMH window manager, and under Xvfb when a test client sets
+# _NET_SUPPORTED and _NET_ACTIVE_WINDOW on the root window itself.
+# ---------------------------------------------------------------------------
+
+import os
+import threading
+from typing import NamedTuple
+
+from PyQt6.QtCore import QSocketNotifier
+
+try:
+    from Xlib import X, Xatom
+    from Xlib import display as xdisplay
+    from Xlib.error import BadDrawable, BadWindow, ConnectionClosedError, DisplayError
+except ImportError:   # python-xlib not installed — the app monitor polls instead
+    X = None
+
+
+def available() -> bool:
+    """True if python-xlib is installed and there is an X display to talk to."""
+    return X is not None and bool(os.environ.get("DISPLAY"))
+
+
+class ActiveWindow(NamedTuple):
+    window_id: int
+    title: str          # _NET_WM_NAME, or WM_NAME for old clients ("" if neither)
+    wm_class: tuple     # (instance, class), e.g. ("code", "Code"), or () if unset
+    pid: int = 0        # _NET_WM_PID, 0 if the client doesn't set it
+
+
+class X11ActiveWindow:
+    """Reads the active window over one persistent display connection."""
+
+    def __init__(self, display_name: str = None):
+        self._display_name = display_name
+        self._display = None
+        self._atoms = {}
+
+    def query(self) -> ActiveWindow | None:
+        """The active window, or None if nothing is active (or it closed mid-query)."""
+        try:
+            display = self._connect()
+            root = display.screen().root
+            prop = root.get_full_property(self._atom("_NET_ACTIVE_WINDOW"), Xatom.WINDOW)
+            if prop is None or not len(prop.value) or not prop.value[0]:
+                return None
+            window = display.create_resource_object("window", prop.value[0])
+            title = (window.get_full_text_property(self._atom("_NET_WM_NAME"), self._atom("UTF8_STRING"))
+                     or window.get_wm_name() or "")
+            pid = window.get_full_property(self._atom("_NET_WM_PID"), Xatom.CARDINAL)
+            pid = int(pid.value[0]) if pid is not None and len(pid.value) else 0
+            return ActiveWindow(window.id, title, window.get_wm_class() or (), pid)
+        except (BadWindow, BadDrawable):
+            return None   # closed between reading _NET_ACTIVE_WINDOW and reading its properties
+        except (ConnectionClosedError, DisplayError, OSError) as error:
+            print(f"[x11_backend] Display connection lost ({error}) — reconnecting on next query.")
+            self.close()
+            return None
+
+    def close(self):
+        if self._display is not None:
+            try:
+                self._display.close()
+            except Exception:
+                pass
+        self._display = None
+        self._atoms = {}
+
+    def _connect(self):
+        if self._display is None:
+            self._display = xdisplay.Display(self._display_name)
+        return self._display
+
+    def _atom(self, name: str) -> int:
+        atom = self._atoms.get(name)
+        if atom is None:
+            atom = self._atoms[name] = self._display.intern_atom(name)
+        return atom
+
+
+_local = threading.local()
+
+
+def get_active_window() -> ActiveWindow | None:
+    """The active window, over this thread's persistent connection (None if unavailable)."""
+    if not available():
+        return None
+    reader = getattr(_local, "reader", None)
+    if reader is None:
+        reader = _local.reader = X11ActiveWindow()
+    return reader.query()
+
+
+class X11FocusEvents:
+    """Calls on_change() when the active window (or its title) changes. Needs a Qt event loop."""
+
+    def __init__(self, on_change):
+        self._on_change = on_change
+        self._display = xdisplay.Display()
+        self._root = self._display.screen().root
+        self._atom_active = self._display.intern_atom("_NET_ACTIVE_WINDOW")
+        self._title_atoms = {
+            self._display.intern_atom("_NET_WM_NAME"),
+            self._display.intern_atom("WM_NAME"),
+        }
+        self._active = None   # window whose title we're watching
+
+        self._root.change_attributes(event_mask=X.PropertyChangeMask)
+        self._watch_active_window()
+        self._display.flush()
+
+        self._notifier = QSocketNotifier(self._display.fileno(), QSocketNotifier.Type.Read)
+        self._notifier.activated.connect(self._on_readable)
+
+    @classmethod
+    def create(cls, on_change) -> "X11FocusEvents | None":
+        """An event source, or None if there's no display or the window manager doesn't publish focus."""
+        if not available():
+            return None
+        try:
+            events = cls(on_change)
+        except (DisplayError, OSError) as error:
+            print(f"[x11_backend] Can't open display: {error}")
+            return None
+        if not events.supported():
+            print("[x11_backend] Window manager doesn't publish _NET_ACTIVE_WINDOW.")
+            events.close()
+            return None
+        return events
+
+    def supported(self) -> bool:
+        """Whether the window manager lists _NET_ACTIVE_WINDOW in _NET_SUPPORTED."""
+        prop = self._root.get_full_property(self._display.intern_atom("_NET_SUPPORTED"), X.AnyPropertyType)
+        return prop is not None and self._atom_active in prop.value
+
+    def close(self):
+        self._notifier.setEnabled(False)
+        self._display.close()
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+    def _watch_active_window(self):
+        """Follow title changes on the (new) active window."""
+        prop = self._root.get_full_property(self._atom_active, X.AnyPropertyType)
+        window_id = prop.value[0] if prop is not None and len(prop.value) else 0
+        if self._active is not None and self._active.id == window_id:
+            return
+        if self._active is not None:
+            # It may already be gone — ignore BadWindow
+            self._active.change_attributes(event_mask=X.NoEventMask, onerror=lambda *args: None)
+        self._active = None
+        if window_id:
+            self._active = self._display.create_resource_object("window", window_id)
+            self._active.change_attributes(event_mask=X.PropertyChangeMask, onerror=lambda *args: None)
+
+    def _on_readable(self):
+        """Drain everything queued on the socket; report at most one change per batch."""
+        changed = False
+        while self._display.pending_events():
+            event = self._display.next_event()
+            if event.type != X.PropertyNotify:
+                continue
+            if event.window.id == self._root.id and event.atom == self._atom_active:
+                self._watch_active_window()
+                changed = True
+            elif event.atom in self._title_atoms:
+                changed = True
+        self._display.flush()
+        if changed:
+            self._on_change()
+
+
+# ---------------------------------------------------------------------------
+# Self-test against a bare X server (e.g. Xvfb :99 & DISPLAY=:99 python x11_backend.py)
+# ---------------------------------------------------------------------------
+def _self_test():
+    """Play window manager with stub windows and check what X11ActiveWindow reports."""
+    display = xdisplay.Display()
+    root = display.screen().root
+    atom = display.intern_atom
+
+    def stub(title: str, wm_class: tuple, pid: int):
+        window = root.create_window(0, 0, 10, 10, 0, X.CopyFromParent)
+        window.change_property(atom("_NET_WM_NAME"), atom("UTF8_STRING"), 8, title.encode("utf-8"))
+        window.change_property(atom("_NET_WM_PID"), Xatom.CARDINAL, 32, [pid])
+        window.set_wm_class(*wm_class)
+        return window
+
+    def activate(window_id: int):
+        root.change_property(atom("_NET_ACTIVE_WINDOW"), Xatom.WINDOW, 32, [window_id])
+        display.sync()
+
+    root.change_property(atom("_NET_SUPPORTED"), Xatom.ATOM, 32, [atom("_NET_ACTIVE_WINDOW")])
+    editor = stub("main.py — Visual Studio Code", ("code", "Code"), 4242)
+    video = stub("哔哩哔哩 — Firefox", ("navigator", "firefox"), 4343)
+    reader = X11ActiveWindow()
+
+    activate(editor.id)
+    assert reader.query() == ActiveWindow(editor.id, "main.py — Visual Studio Code", ("code", "Code"), 4242)
+    activate(video.id)
+    assert reader.query().title == "哔哩哔哩 — Firefox"
+
+    video.destroy()            # closes while still "active"
+    display.sync()
+    assert reader.query() is None
+    activate(0)
+    assert reader.query() is None
+    activate(editor.id)
+    assert reader.query().wm_class == ("code", "Code")
+    print("[x11_backend] Self-test passed.")
+
+
+if __name__ == "__main__":
+    _self_test()